@@ -1,10 +1,16 @@
+import base64
 import json
 import logging
+import time
 from urllib.parse import urlparse
 
 from django.conf import settings as django_settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
 from django.http import JsonResponse
+from django.utils.dateparse import parse_datetime
 
+from . import audit_writer
 from .models import AuditLog, Company, ProjectAccess, UserCompanyProfile
 
 logger = logging.getLogger(__name__)
@@ -70,13 +76,86 @@ ROLE_ORDER = {
 }
 
 
+_ACTOR_MEMO_ATTR = '_rfq_actor_memo'
+_ACTOR_GEN_KEY = 'rfq:actor:gen'
+
+
+def _actor_cache_ttl():
+    try:
+        return max(0, int(getattr(django_settings, 'RFQ_ACTOR_CACHE_TTL', 0) or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _actor_generation():
+    gen = cache.get(_ACTOR_GEN_KEY)
+    if gen is None:
+        cache.add(_ACTOR_GEN_KEY, time.time_ns(), None)
+        gen = cache.get(_ACTOR_GEN_KEY)
+    return gen
+
+
+def invalidate_actor_cache(user_id=None):
+    """Drop cached actor profiles: one user's, or everybody's when ``user_id`` is None."""
+    if user_id is None:
+        cache.set(_ACTOR_GEN_KEY, time.time_ns(), None)
+        return
+    cache.delete(f'rfq:actor:{_actor_generation()}:{user_id}')
+
+
+def _cached_or_query(key, stamp, query):
+    ttl = _actor_cache_ttl()
+    if ttl <= 0:
+        return query()
+    key = f'rfq:actor:{_actor_generation()}:{key}'
+    hit = cache.get(key)
+    # The stamp guards against a reused primary key (e.g. a user recreated with the same id).
+    if isinstance(hit, dict) and hit.get('stamp') == stamp:
+        return hit['value']
+    value = query()
+    cache.set(key, {'stamp': stamp, 'value': value}, ttl)
+    return value
+
+
+def _load_profile(user):
+    joined = getattr(user, 'date_joined', None)
+    return _cached_or_query(
+        user.pk,
+        joined.isoformat() if joined else '',
+        lambda: UserCompanyProfile.objects.filter(user=user, is_active=True).select_related('company').first(),
+    )
+
+
+def _load_scope_company(company_id):
+    return _cached_or_query(
+        f'company:{company_id}',
+        '',
+        lambda: Company.objects.filter(id=company_id, is_active=True).first(),
+    )
+
+
 def get_request_actor(request):
-    """Resolve authenticated actor + RFQ profile. Returns dict or None."""
+    """Resolve authenticated actor + RFQ profile. Returns dict or None.
+
+    Memoized on the request; the profile (and a superadmin's scope company) is
+    also cached across requests for ``RFQ_ACTOR_CACHE_TTL`` seconds and dropped
+    by ``invalidate_actor_cache`` when profiles or companies change.
+    """
     user = getattr(request, 'user', None)
     if not user or not user.is_authenticated:
         return None
 
-    profile = UserCompanyProfile.objects.filter(user=user, is_active=True).select_related('company').first()
+    memo = getattr(request, _ACTOR_MEMO_ATTR, None)
+    scope_id = request.session.get('rfq_active_company_id') if hasattr(request, 'session') else None
+    if memo and memo[0] == (user.pk, scope_id):
+        return memo[1]
+    actor = _resolve_actor(request, user)
+    setattr(request, _ACTOR_MEMO_ATTR, ((user.pk, scope_id), actor))
+    return actor
+
+
+def _resolve_actor(request, user):
+    profile = _load_profile(user)
     if not profile:
         return {
             'user': user,
@@ -102,7 +181,7 @@ def get_request_actor(request):
         selected_company_id = request.session.get('rfq_active_company_id')
         if selected_company_id not in (None, '', 'all'):
             try:
-                c = Company.objects.filter(id=selected_company_id, is_active=True).first()
+                c = _load_scope_company(selected_company_id)
             except Exception:
                 c = None
             if c:
@@ -150,6 +229,49 @@ def company_qs(model, actor):
     return qs.filter(company=company)
 
 
+def encode_keyset_cursor(timestamp, pk):
+    """Opaque pagination cursor for ``ORDER BY <timestamp> DESC, <pk> DESC`` lists."""
+    raw = json.dumps([timestamp.isoformat(), pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_keyset_cursor(raw):
+    """Inverse of ``encode_keyset_cursor``: ``(datetime, pk)`` or None when malformed."""
+    try:
+        padded = raw + '=' * (-len(raw) % 4)
+        ts, pk = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        timestamp = parse_datetime(str(ts))
+    except (TypeError, ValueError, UnicodeError):
+        return None
+    if timestamp is None:
+        return None
+    return timestamp, pk
+
+
+def annotate_project_permissions(qs, actor):
+    """Annotate a Project queryset with the ProjectAccess facts the ACL checks need.
+
+    ``can_view_project`` / ``can_edit_project`` read these annotations when
+    present, so checking a whole list costs one query instead of up to three
+    per project.
+    """
+    user = (actor or {}).get('user')
+    user_id = getattr(user, 'id', None)
+    acl = ProjectAccess.objects.filter(project_id=OuterRef('pk'))
+    return qs.annotate(
+        acl_exists=Exists(acl),
+        acl_user_can_view=Exists(acl.filter(user_id=user_id, can_view=True)),
+        acl_user_can_edit=Exists(acl.filter(user_id=user_id, can_edit=True)),
+    )
+
+
+def _acl_fact(project, attr, fallback_qs):
+    value = getattr(project, attr, None)
+    if value is None:
+        return fallback_qs.exists()
+    return bool(value)
+
+
 def can_view_project(actor, project):
     if actor is None or project is None:
         return False
@@ -167,7 +289,7 @@ def can_view_project(actor, project):
     # NOTE: ProjectAccess is open-by-default: if no ACL rows exist, project is viewable
     # to company users with baseline role access. Restrictions apply only when ACL rows exist.
     qs = ProjectAccess.objects.filter(project_id=project.id)
-    if not qs.exists():
+    if not _acl_fact(project, 'acl_exists', qs):
         return True
 
     if actor.get('is_management'):
@@ -177,7 +299,7 @@ def can_view_project(actor, project):
     if not user or not getattr(user, 'id', None):
         return False
 
-    return qs.filter(user_id=user.id, can_view=True).exists()
+    return _acl_fact(project, 'acl_user_can_view', qs.filter(user_id=user.id, can_view=True))
 
 
 def can_edit_project(actor, project):
@@ -190,36 +312,39 @@ def can_edit_project(actor, project):
         if role in ('superadmin', 'admin'):
             return True
         qs = ProjectAccess.objects.filter(project_id=project.id)
-        if not qs.exists():
+        if not _acl_fact(project, 'acl_exists', qs):
             return True
         user = actor.get('user')
         if not user or not getattr(user, 'id', None):
             return False
-        return qs.filter(user_id=user.id, can_edit=True).exists()
+        return _acl_fact(project, 'acl_user_can_edit', qs.filter(user_id=user.id, can_edit=True))
 
     return False
 
 
 def audit_log(request, actor, action, entity_type='', entity_id='', project=None, metadata=None):
-    """Best-effort audit log writer (never raises)."""
+    """Best-effort audit log writer (never raises); see ``audit_writer`` for batching."""
     try:
+        action = str(action or '')[:64]
+        if not audit_writer.should_record(action):
+            return
         user = (actor or {}).get('user')
         role = (actor or {}).get('role') or ''
         company = (actor or {}).get('company')
         ip = (request.META.get('HTTP_X_FORWARDED_FOR') or request.META.get('REMOTE_ADDR') or '').split(',')[0].strip()
         ua = (request.META.get('HTTP_USER_AGENT') or '')[:255]
 
-        AuditLog.objects.create(
-            company=company,
-            actor=user if getattr(user, 'is_authenticated', False) else None,
+        audit_writer.write(AuditLog(
+            company_id=getattr(company, 'id', None),
+            actor_id=user.id if getattr(user, 'is_authenticated', False) else None,
             actor_role=role,
-            action=str(action or '')[:64],
+            action=action,
             entity_type=str(entity_type or '')[:64],
             entity_id=str(entity_id or '')[:128],
-            project=project,
+            project_id=getattr(project, 'id', None),
             metadata_json=metadata or {},
             ip=ip,
             user_agent=ua,
-        )
+        ))
     except Exception:
         pass
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from .api_common import require_auth_and_profile
+from .change_events import events_after, events_gap, latest_event_id
+_KEEPALIVE_SEC = 15
+_RETRY_MS = 3000
+def _after_id(request):
+    raw = request.META.get('HTTP_LAST_EVENT_ID') or request.GET.get('after') or request.GET.get('last_event_id')
+    if raw in (None, ''):
+        return None
+    try:
+        return max(0, int(raw))
+    except (TypeError, ValueError):
+        return None
+def _sse(ev):
+    return f'id: {ev.id}\nevent: {ev.kind}\ndata: {json.dumps(ev.as_dict(), separators=(",", ":"))}\n\n'
+def _stream_seconds(request):
+    if isinstance(request, ASGIRequest):
+        return float(getattr(settings, 'RFQ_EVENTS_STREAM_SECONDS', 300))
+    # A WSGI worker is pinned for the whole stream: keep it short, EventSource reconnects.
+    return float(getattr(settings, 'RFQ_EVENTS_WSGI_STREAM_SECONDS', 25))
+def events_poll(request):
+    actor, auth_err = require_auth_and_profile(request)
+    if auth_err:
+        return auth_err
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    after = _after_id(request)
+    if after is None:
+        return JsonResponse({'events': [], 'last_id': latest_event_id()})
+    events, last_id = events_after(actor, after)
+    return JsonResponse({'events': [e.as_dict() for e in events], 'last_id': last_id, 'resync': events_gap(after)})
+def _sync_stream(actor, after, seconds):
+    interval = float(getattr(settings, 'RFQ_EVENTS_POLL_SECONDS', 1.0))
+    deadline = time.monotonic() + seconds
+    yield f'retry: {_RETRY_MS}\n\n'
+    if events_gap(after):
+        yield 'event: resync\ndata: {}\n\n'
+    last_keepalive = time.monotonic()
+    while True:
+        events, after = events_after(actor, after)
+        for ev in events:
+            yield _sse(ev)
+        now = time.monotonic()
+        if now >= deadline:
+            return
+        if now - last_keepalive >= _KEEPALIVE_SEC:
+            last_keepalive = now
+            yield ': keepalive\n\n'
+        time.sleep(interval)
+async def _async_stream(actor, after, seconds):
+    interval = float(getattr(settings, 'RFQ_EVENTS_POLL_SECONDS', 1.0))
+    deadline = time.monotonic() + seconds
+    fetch = sync_to_async(events_after)
+    yield f'retry: {_RETRY_MS}\n\n'
+    if await sync_to_async(events_gap)(after):
+        yield 'event: resync\ndata: {}\n\n'
+    last_keepalive = time.monotonic()
+    while True:
+        events, after = await fetch(actor, after)
+        for ev in events:
+            yield _sse(ev)
+        now = time.monotonic()
+        if now >= deadline:
+            return
+        if now - last_keepalive >= _KEEPALIVE_SEC:
+            last_keepalive = now
+            yield ': keepalive\n\n'
+        await asyncio.sleep(interval)
+def events_stream(request):
+    actor, auth_err = require_auth_and_profile(request)
+    if auth_err:
+        return auth_err
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    after = _after_id(request)
+    if after is None:
+        # Fresh subscription: only changes from now on.
+        after = latest_event_id()
+    seconds = _stream_seconds(request)
+    if isinstance(request, ASGIRequest):
+        chunks = _async_stream(actor, after, seconds)
+    else:
+        chunks = _sync_stream(actor, after, seconds)
+    resp = StreamingHttpResponse(chunks, content_type='text/event-stream')
+    resp['Cache-Control'] = 'no-cache'
+    resp['X-Accel-Buffering'] = 'no'
+    return resp
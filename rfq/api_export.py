@@ -0,0 +1,533 @@
+"""Streaming export engine behind ``POST /api/export``.
+
+Rows are produced one project at a time by generators, so memory stays
+bounded by the largest single project rather than by the whole selection:
+
+- CSV streams through ``StreamingHttpResponse`` and starts sending bytes as
+  soon as the first project is flattened.
+- XLSX uses openpyxl write-only mode and is spooled to a temporary file that
+  is handed to ``FileResponse`` (the zip container has to be complete before
+  the first byte can go out).
+- PDF is a short summary and is still rendered in memory.
+
+The ``write_*`` functions render into any binary file object and report
+per-project progress; background export jobs (``rfq.export_jobs``) use them.
+
+Column layout and values match the previous in-memory implementation.
+"""
+import csv
+import io
+import tempfile
+
+from django.db.models import Case, IntegerField, Value, When
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+
+from .models import Attachment, Project
+
+MAX_TIERS = 10  # standard export tiers (Qty/Price 1..10)
+
+# Projects are loaded with their full JSON blob, so keep fetch chunks small.
+PROJECT_CHUNK_SIZE = 20
+
+TIER_Q_HEADERS = [f'qty_{i}' for i in range(1, MAX_TIERS + 1)] + ['qty_next']
+TIER_P_HEADERS = [f'price_{i}' for i in range(1, MAX_TIERS + 1)] + ['price_next']
+ITEM_HEADERS = [
+    'project_id', 'project_name', 'drawing_no', 'description', 'manufacturer', 'mpn', 'status',
+    'main_supplier', 'currency', 'suppliers_count', 'lead_time', 'shipping_cost',
+] + TIER_Q_HEADERS + TIER_P_HEADERS
+ITEM_SUP_HEADERS = [
+    'project_id', 'project_name', 'drawing_no', 'supplier', 'is_main', 'status', 'currency',
+    'price_raw', 'moq', 'mov', 'lead_time', 'shipping_cost', 'payment_terms', 'incoterms', 'valid_until', 'notes',
+] + TIER_Q_HEADERS + TIER_P_HEADERS
+# Sheets without a preset used the sorted union of row keys; the row shapes
+# are fixed, so the same headers can be known up front.
+PROJECT_HEADERS = sorted([
+    'project_id', 'project_name', 'project_status', 'created_at', 'updated_at', 'deadline',
+    'sent_to', 'notes_count', 'items_count', 'rfq_bundles',
+])
+RFQ_HEADERS = sorted([
+    'project_id', 'project_name', 'bundle_id', 'supplier', 'status', 'created_at',
+    'due_date', 'items_count', 'currency', 'note',
+])
+SUPPLIER_HEADERS = sorted([
+    'project_id', 'project_name', 'supplier', 'items_count', 'main_items', 'quoted_items', 'avg_price',
+])
+ATTACHMENT_HEADERS = sorted([
+    'project_id', 'project_name', 'attachment_id', 'kind', 'file', 'uploaded_at',
+])
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CONTENT_TYPES = {'csv': 'text/csv; charset=utf-8', 'xlsx': XLSX_CONTENT_TYPE, 'pdf': 'application/pdf'}
+EXPORT_FILENAMES = {'csv': 'rfq_export.csv', 'xlsx': 'rfq_export.xlsx', 'pdf': 'rfq_export.pdf'}
+
+
+def parse_export_options(payload):
+    """Normalize the export request body; returns ``(options, error_response)``."""
+    if not isinstance(payload, dict):
+        return None, JsonResponse({'error': 'Invalid JSON body'}, status=400)
+    project_ids = payload.get('project_ids') or []
+    if not isinstance(project_ids, list) or not project_ids:
+        return None, JsonResponse({'error': 'project_ids is required'}, status=400)
+    fmt = str(payload.get('format') or 'xlsx').strip().lower()
+    if fmt not in ('xlsx', 'pdf', 'csv'):
+        fmt = 'xlsx'
+    suppliers_mode = str(payload.get('suppliers_mode') or 'all').strip().lower()
+    if suppliers_mode not in ('all', 'main'):
+        suppliers_mode = 'all'
+    return {
+        'project_ids': [str(x) for x in project_ids],
+        'format': fmt,
+        'include_items': bool(payload.get('include_items', True)),
+        'include_item_suppliers': bool(payload.get('include_item_suppliers', True)),
+        'include_price_breaks': bool(payload.get('include_price_breaks', True)),
+        'include_rfqs': bool(payload.get('include_rfqs', True)),
+        'include_attachments': bool(payload.get('include_attachments', False)),
+        'suppliers_mode': suppliers_mode,
+    }, None
+
+
+def _safe_num(v):
+    try:
+        s = str(v).replace(',', '.').strip()
+        if not s:
+            return 0.0
+        return float(s)
+    except Exception:
+        return 0.0
+
+
+def _as_date(v):
+    s = str(v or '').strip()
+    return s.split('T')[0] if s else ''
+
+
+def _qty_cols(it):
+    cols = {}
+    for i in range(1, MAX_TIERS + 1):
+        cols[f'qty_{i}'] = it.get(f'qty_{i}') or ''
+    extra = []
+    for k, v in (it or {}).items():
+        if not isinstance(k, str) or not k.startswith('qty_'):
+            continue
+        try:
+            idx = int(k.split('_')[1])
+        except Exception:
+            continue
+        if idx > MAX_TIERS:
+            sv = str(v).strip()
+            if sv:
+                extra.append((idx, sv))
+    extra.sort(key=lambda t: t[0])
+    cols['qty_next'] = " | ".join([f"qty_{i}={v}" for i, v in extra])
+    return cols
+
+
+def _pick_main_supplier(it, main_name):
+    sups = it.get('suppliers') or []
+    if not isinstance(sups, list):
+        return None
+    for s in sups:
+        if isinstance(s, dict) and (s.get('isMain') or s.get('is_main')):
+            return s
+    if main_name:
+        mn = str(main_name).strip().lower()
+        for s in sups:
+            if not isinstance(s, dict):
+                continue
+            sname = (s.get('name') or s.get('supplier_name') or s.get('supplier') or '')
+            if str(sname).strip().lower() == mn:
+                return s
+    for s in sups:
+        if isinstance(s, dict):
+            return s
+    return None
+
+
+def _supplier_price_list(s):
+    if not isinstance(s, dict):
+        return []
+    prices = s.get('prices')
+    if isinstance(prices, list) and prices:
+        tmp = []
+        for x in prices:
+            if not isinstance(x, dict):
+                continue
+            q = _safe_num(x.get('qty') or x.get('quantity') or x.get('break') or x.get('qty_break') or '')
+            pv = x.get('price') or x.get('unit_price') or x.get('unit') or x.get('value') or ''
+            tmp.append((q, pv))
+        tmp.sort(key=lambda t: (t[0] == 0, t[0]))
+        return [pv for _, pv in tmp]
+    out = [s.get('price_1') or s.get('price') or '']
+    for i in range(2, 31):
+        out.append(s.get(f'price_{i}') or '')
+    while out and str(out[-1]).strip() == '':
+        out.pop()
+    return out
+
+
+def _price_cols(it, s):
+    cols = {}
+    plist = _supplier_price_list(s)
+    for i in range(1, MAX_TIERS + 1):
+        v = ''
+        if i - 1 < len(plist):
+            v = plist[i - 1]
+        if not str(v).strip():
+            v = (it.get('price_1') or it.get('price') or '') if i == 1 else (it.get(f'price_{i}') or '')
+        cols[f'price_{i}'] = v or ''
+    extra = []
+    for idx in range(MAX_TIERS + 1, len(plist) + 1):
+        v = plist[idx - 1]
+        if str(v).strip():
+            extra.append((idx, str(v).strip()))
+    cols['price_next'] = " | ".join([f"price_{i}={v}" for i, v in extra])
+    return cols
+
+
+def iter_projects(project_ids, progress=None):
+    """Yield requested projects one at a time, in request order.
+
+    ``progress(done)`` is called after the consumer has finished with each project.
+    """
+    order = Case(
+        *[When(id=pid, then=Value(pos)) for pos, pid in enumerate(dict.fromkeys(project_ids))],
+        output_field=IntegerField(),
+    )
+    qs = Project.objects.filter(id__in=project_ids).order_by(order)
+    for done, p in enumerate(qs.iterator(chunk_size=PROJECT_CHUNK_SIZE), start=1):
+        yield p
+        if progress:
+            progress(done)
+
+
+def project_row(p):
+    pdata = p.data or {}
+    return {
+        'project_id': p.id,
+        'project_name': p.name,
+        'project_status': pdata.get('project_status') or pdata.get('status') or '',
+        'created_at': _as_date(pdata.get('created_at') or p.created_at),
+        'updated_at': _as_date(pdata.get('updated_at') or p.updated_at),
+        'deadline': (pdata.get('dates') or {}).get('deadline') or pdata.get('deadline') or '',
+        'sent_to': pdata.get('sent_to') or '',
+        'notes_count': len(pdata.get('notes') or []),
+        'items_count': len(pdata.get('items') or []),
+        'rfq_bundles': len(pdata.get('rfqBatches') or pdata.get('rfq_batches') or []),
+    }
+
+
+def iter_rfq_rows(p):
+    pdata = p.data or {}
+    for b in pdata.get('rfqBatches') or pdata.get('rfq_batches') or []:
+        if not isinstance(b, dict):
+            continue
+        yield {
+            'project_id': p.id,
+            'project_name': p.name,
+            'bundle_id': b.get('id') or '',
+            'supplier': b.get('supplier_name') or b.get('supplier') or '',
+            'status': b.get('status') or '',
+            'created_at': _as_date(b.get('created_at')),
+            'due_date': b.get('due_date') or '',
+            'items_count': len(b.get('items') or []),
+            'currency': b.get('currency') or '',
+            'note': b.get('note') or '',
+        }
+
+
+def _item_row(p, it):
+    main_sup = it.get('supplier') or ''
+    row = {
+        'project_id': p.id,
+        'project_name': p.name,
+        'drawing_no': it.get('item_drawing_no') or it.get('drawing_no') or it.get('line') or '',
+        'description': it.get('description') or '',
+        'manufacturer': it.get('manufacturer') or '',
+        'mpn': it.get('mpn') or it.get('MPN') or it.get('manufacturer_part_no') or it.get('mfr_part_no') or it.get('part_no') or '',
+        'status': it.get('status') or '',
+        'main_supplier': main_sup,
+        'currency': it.get('currency') or 'EUR',
+        'suppliers_count': len(it.get('suppliers') or []) if isinstance(it.get('suppliers'), list) else 0,
+        'lead_time': it.get('lead_time') or '',
+        'shipping_cost': it.get('shipping_cost') or '',
+    }
+    # Expand Items sheet with Qty/Price tiers (1..10 + next)
+    try:
+        row.update(_qty_cols(it))
+        row.update(_price_cols(it, _pick_main_supplier(it, main_sup)))
+    except Exception:
+        pass
+    return row
+
+
+def _item_supplier_rows(p, it, row, opts):
+    """Yield ``(is_main, supplier, row)`` for the suppliers of one item."""
+    main_sup = row['main_supplier']
+    sups = it.get('suppliers') or []
+    if not isinstance(sups, list):
+        sups = []
+    for s in sups:
+        if not isinstance(s, dict):
+            continue
+        sname = s.get('name') or s.get('supplier_name') or s.get('supplier') or ''
+        if not sname:
+            continue
+        is_main = bool(s.get('isMain') or (main_sup and str(main_sup).strip().lower() == str(sname).strip().lower()))
+        if opts['suppliers_mode'] == 'main' and not is_main:
+            continue
+        sup_row = {
+            'project_id': p.id,
+            'project_name': p.name,
+            'drawing_no': row['drawing_no'],
+            'supplier': sname,
+            'is_main': 'YES' if is_main else '',
+            'status': s.get('status') or '',
+            'currency': s.get('currency') or row['currency'],
+            'price_raw': s.get('price') or '',
+            'moq': s.get('moq') or '',
+            'mov': s.get('mov') or '',
+            'lead_time': s.get('lead_time') or '',
+            'shipping_cost': s.get('shipping_cost') or s.get('shipping') or '',
+            'payment_terms': s.get('payment_terms') or '',
+            'incoterms': s.get('incoterms') or '',
+            'valid_until': s.get('valid_until') or s.get('quote_valid_until') or '',
+            'notes': s.get('notes') or '',
+        }
+        # Standardize Qty/Price tiers in export (1..10 + next)
+        try:
+            sup_row.update(_qty_cols(it))
+            if opts['include_price_breaks']:
+                sup_row.update(_price_cols(it, s))
+            else:
+                base_prices = {f'price_{i}': '' for i in range(1, MAX_TIERS + 1)}
+                base_prices['price_1'] = s.get('price_1') or s.get('price') or ''
+                base_prices['price_next'] = ''
+                sup_row.update(base_prices)
+        except Exception:
+            pass
+        yield is_main, s, sup_row
+
+
+def iter_item_rows(p, opts):
+    """Yield ``('items', row)`` / ``('item_suppliers', row)`` / ``('suppliers', row)`` for one project.
+
+    Supplier aggregates are keyed per project, so they are complete (and
+    emitted) once the project's items have been walked.
+    """
+    items = (p.data or {}).get('items') or []
+    supplier_agg = {}
+    for it in items:
+        if not isinstance(it, dict):
+            continue
+        row = _item_row(p, it)
+        yield 'items', row
+        if not opts['include_item_suppliers']:
+            continue
+        dn = row['drawing_no']
+        for is_main, s, sup_row in _item_supplier_rows(p, it, row, opts):
+            yield 'item_suppliers', sup_row
+            sname = str(sup_row['supplier']).strip()
+            agg = supplier_agg.get(sname)
+            if not agg:
+                agg = supplier_agg[sname] = {
+                    'items': set(), 'main_items': set(), 'quoted_items': set(), 'price_sum': 0.0, 'price_cnt': 0,
+                }
+            if dn:
+                agg['items'].add(str(dn))
+                if is_main:
+                    agg['main_items'].add(str(dn))
+                price_val = _safe_num(s.get('price_1') or s.get('price') or 0)
+                if price_val > 0:
+                    agg['quoted_items'].add(str(dn))
+                    agg['price_sum'] += price_val
+                    agg['price_cnt'] += 1
+    for sname, agg in supplier_agg.items():
+        yield 'suppliers', {
+            'project_id': p.id,
+            'project_name': p.name,
+            'supplier': sname,
+            'items_count': len(agg['items']),
+            'main_items': len(agg['main_items']),
+            'quoted_items': len(agg['quoted_items']),
+            'avg_price': (agg['price_sum'] / agg['price_cnt']) if agg['price_cnt'] else '',
+        }
+
+
+def iter_attachment_rows(p):
+    for a in Attachment.objects.filter(project=p).order_by('-uploaded_at').iterator():
+        yield {
+            'project_id': p.id,
+            'project_name': p.name,
+            'attachment_id': a.id,
+            'kind': a.kind,
+            'file': a.file.name if a.file else '',
+            'uploaded_at': _as_date(a.uploaded_at),
+        }
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_stream(opts, progress=None):
+    if not opts['include_items']:
+        yield "Nothing selected for export\n"
+        return
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(ITEM_HEADERS)
+    item_opts = dict(opts, include_item_suppliers=False)
+    for p in iter_projects(opts['project_ids'], progress):
+        for _kind, row in iter_item_rows(p, item_opts):
+            yield writer.writerow([row.get(h, '') for h in ITEM_HEADERS])
+
+
+def csv_response(opts):
+    resp = StreamingHttpResponse(_csv_stream(opts), content_type=CONTENT_TYPES['csv'])
+    resp['Content-Disposition'] = 'attachment; filename="rfq_export.csv"'
+    return resp
+
+
+def write_xlsx(opts, out, progress=None):
+    """Write the XLSX workbook for ``opts`` into the binary file ``out``."""
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    sheets = {}
+    written = {}
+
+    def add_sheet(key, title, headers):
+        ws = wb.create_sheet(title=title[:31])
+        # Write-only sheets need column widths before the first row.
+        for i, h in enumerate(headers, start=1):
+            ws.column_dimensions[get_column_letter(i)].width = min(42, max(10, len(str(h)) + 2))
+        sheets[key] = (ws, headers)
+        written[key] = False
+
+    def append(key, row):
+        ws, headers = sheets[key]
+        if not written[key]:
+            ws.append(headers)
+            written[key] = True
+        ws.append([row.get(h, '') for h in headers])
+
+    add_sheet('projects', 'Projects', PROJECT_HEADERS)
+    if opts['include_items']:
+        add_sheet('items', 'Items', ITEM_HEADERS)
+    if opts['include_item_suppliers']:
+        add_sheet('item_suppliers', 'ItemSuppliers', ITEM_SUP_HEADERS)
+    if opts['include_rfqs']:
+        add_sheet('rfqs', 'RFQs', RFQ_HEADERS)
+    add_sheet('suppliers', 'Suppliers', SUPPLIER_HEADERS)
+    if opts['include_attachments']:
+        add_sheet('attachments', 'Attachments', ATTACHMENT_HEADERS)
+
+    for p in iter_projects(opts['project_ids'], progress):
+        append('projects', project_row(p))
+        if opts['include_rfqs']:
+            for row in iter_rfq_rows(p):
+                append('rfqs', row)
+        if opts['include_items']:
+            for kind, row in iter_item_rows(p, opts):
+                append(kind, row)
+        if opts['include_attachments']:
+            for row in iter_attachment_rows(p):
+                append('attachments', row)
+    for key, (ws, _headers) in sheets.items():
+        if not written[key]:
+            ws.append(["(no data)"])
+
+    wb.save(out)
+
+
+def xlsx_response(opts):
+    try:
+        import openpyxl  # noqa: F401
+    except Exception as e:
+        return JsonResponse({'error': f'openpyxl not available: {e}'}, status=500)
+    tmp = tempfile.TemporaryFile(suffix='.xlsx')
+    try:
+        write_xlsx(opts, tmp)
+        tmp.seek(0)
+    except Exception:
+        tmp.close()
+        raise
+    return FileResponse(tmp, as_attachment=True, filename=EXPORT_FILENAMES['xlsx'], content_type=XLSX_CONTENT_TYPE)
+
+
+def write_pdf(opts, out, progress=None):
+    """Write the PDF summary for ``opts`` into the binary file ``out``."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.units import mm
+
+    c = canvas.Canvas(out, pagesize=A4)
+    width, height = A4
+    y = height - 18*mm
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(18*mm, y, "RFQ Export Summary")
+    y -= 10*mm
+    c.setFont("Helvetica", 10)
+    supplier_rows = []
+    for p in iter_projects(opts['project_ids'], progress):
+        rp = project_row(p)
+        line = f"{rp['project_name']} ({rp['project_id']}) — Status: {rp.get('project_status','')} — Items: {rp.get('items_count','')} — Bundles: {rp.get('rfq_bundles','')}"
+        c.drawString(18*mm, y, line[:120])
+        y -= 6*mm
+        if y < 20*mm:
+            c.showPage()
+            y = height - 18*mm
+            c.setFont("Helvetica", 10)
+        if opts['include_items'] and opts['include_item_suppliers']:
+            supplier_rows.extend(row for kind, row in iter_item_rows(p, opts) if kind == 'suppliers')
+    y -= 4*mm
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(18*mm, y, "Top suppliers (by quoted items)")
+    y -= 8*mm
+    c.setFont("Helvetica", 10)
+    top = sorted(supplier_rows, key=lambda x: (x.get('quoted_items') or 0, x.get('items_count') or 0), reverse=True)[:20]
+    for s in top:
+        line = f"{s['project_name']} — {s['supplier']} — Items: {s['items_count']} — Quoted: {s['quoted_items']} — Main: {s['main_items']}"
+        c.drawString(18*mm, y, line[:120])
+        y -= 6*mm
+        if y < 20*mm:
+            c.showPage()
+            y = height - 18*mm
+            c.setFont("Helvetica", 10)
+    c.save()
+
+
+def pdf_response(opts):
+    # PDF summary (ReportLab)
+    try:
+        import reportlab  # noqa: F401
+    except Exception as e:
+        return JsonResponse({'error': f'ReportLab not available: {e}'}, status=500)
+    buf = io.BytesIO()
+    write_pdf(opts, buf)
+    resp = HttpResponse(buf.getvalue(), content_type=CONTENT_TYPES['pdf'])
+    resp['Content-Disposition'] = 'attachment; filename="rfq_export.pdf"'
+    return resp
+
+
+def write_csv(opts, out, progress=None):
+    """Write the CSV export for ``opts`` into the binary file ``out``."""
+    for chunk in _csv_stream(opts, progress):
+        out.write(chunk.encode('utf-8'))
+
+
+EXPORT_WRITERS = {'csv': write_csv, 'xlsx': write_xlsx, 'pdf': write_pdf}
+
+
+def export_response(opts):
+    """Render the export described by ``opts`` (see ``parse_export_options``)."""
+    if not Project.objects.filter(id__in=opts['project_ids']).exists():
+        return JsonResponse({'error': 'No projects found for given IDs'}, status=404)
+    if opts['format'] == 'csv':
+        return csv_response(opts)
+    if opts['format'] == 'pdf':
+        return pdf_response(opts)
+    return xlsx_response(opts)
@@ -1,64 +1,65 @@
+import hashlib
+import json
 import logging
 import uuid
 from datetime import timedelta
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.http import JsonResponse, HttpResponseNotAllowed
+from django.db.models import Count, Q
+from django.db.models.fields.json import KT
+from django.http import HttpResponse, JsonResponse, HttpResponseNotAllowed, StreamingHttpResponse
 from django.utils import timezone
 from .api_common import (
+    annotate_project_permissions,
     audit_log,
     can_edit_project,
     can_view_project,
+    decode_keyset_cursor,
+    encode_keyset_cursor,
+    invalidate_actor_cache,
     require_auth_and_profile,
     require_role,
     require_same_origin_for_unsafe,
     json_body,
 )
-from .models import Company, Project, Attachment, EditLock, ProjectAccess, UserCompanyProfile
-from . import views_api as _v
+from . import audit_query
+from .api_export import CONTENT_TYPES as EXPORT_CONTENT_TYPES, EXPORT_FILENAMES, export_response, parse_export_options
+from .export_jobs import create_job as create_export_job
+from .file_delivery import serve_file
+from .item_index import index_norm, is_quoted as _is_meaningful_quote, item_key as _item_key, quoted_item_positions
+from .item_matching import supplier_name as _supplier_name
+from .json_patch import JsonPatchError, apply_patch
+from .locks import MAX_BATCH_KEYS, get_backend as lock_backend, lease_expiry
+from .models import Company, Project, ProjectItem, ItemSupplierQuote, Attachment, ExportJob, ProjectAccess, SyncSession, UserCompanyProfile
 
 logger = logging.getLogger(__name__)
 
-def _norm(v):
-    return ' '.join(str(v or '').split()).strip().lower()
+# Keys injected by Project.as_dict() / the sync client; never persisted from a patch.
+_SERVER_ONLY_KEYS = ('server_updated_at', 'data_version', 'server_created_at', 'base_version')
+
+_SUMMARY_PAGE_DEFAULT = 200
+_SUMMARY_PAGE_MAX = 1000
+
 def _num(v):
     try:
         s = str(v or '').replace(',', '.').strip()
         return float(s) if s else 0.0
     except (ValueError, TypeError):
         return 0.0
-def _item_key(it):
-    if not isinstance(it, dict):
-        return ''
-    iid = _norm(it.get('id'))
-    if iid and iid not in {'none', 'null', 'undefined', 'nan'}:
-        return f'id:{iid}'
-    dn = _norm(it.get('item_drawing_no') or it.get('drawing_no'))
-    if dn:
-        return f'dn:{dn}'
-    mpn = _norm(it.get('mpn'))
-    if mpn:
-        return f'mpn:{mpn}'
-    return ''
-def _supplier_name(s):
-    return _norm((s or {}).get('supplier_name') or (s or {}).get('name') or (s or {}).get('supplier'))
-def _is_meaningful_quote(s):
-    if not isinstance(s, dict):
-        return False
-    if _num(s.get('price_1') or s.get('price')) > 0:
-        return True
-    if str(s.get('status') or '').strip().lower() == 'quoted':
-        return True
-    if str(s.get('quote_status') or '').strip().lower() == 'quoted':
-        return True
-    return False
-def _merge_preserve_supplier_quotes(existing_data, incoming_data):
+def _merge_preserve_supplier_quotes(existing_data, incoming_data, quoted_positions=None):
+    # quoted_positions: existing item positions that carry quotes (from the item
+    # index); when given, only those items are keyed instead of the whole list.
     if not isinstance(existing_data, dict) or not isinstance(incoming_data, dict):
         return incoming_data
     ex_items = existing_data.get('items') or []
     in_items = incoming_data.get('items') or []
     if not isinstance(ex_items, list) or not isinstance(in_items, list):
         return incoming_data
+    if quoted_positions is not None:
+        if not quoted_positions:
+            return incoming_data
+        ex_items = [ex_items[pos] for pos in quoted_positions if pos < len(ex_items)]
     ex_map = {}
     for it in ex_items:
         k = _item_key(it)
@@ -77,16 +78,22 @@ def _merge_preserve_supplier_quotes(existing_data, incoming_data):
             ex_sups = []
         if not isinstance(in_sups, list):
             in_sups = []
-        in_by_name = {_supplier_name(s): s for s in in_sups if _supplier_name(s)}
+        # name -> position in in_sups (last entry per name wins)
+        in_by_name = {}
+        for pos, s in enumerate(in_sups):
+            nm = _supplier_name(s)
+            if nm:
+                in_by_name[nm] = pos
         for ex_s in ex_sups:
             nm = _supplier_name(ex_s)
             if not nm or not _is_meaningful_quote(ex_s):
                 continue
-            cur = in_by_name.get(nm)
-            if not cur:
+            cur_pos = in_by_name.get(nm)
+            if cur_pos is None:
                 in_sups.append(dict(ex_s))
-                in_by_name[nm] = in_sups[-1]
+                in_by_name[nm] = len(in_sups) - 1
                 continue
+            cur = in_sups[cur_pos]
             if not _is_meaningful_quote(cur):
                 merged = dict(ex_s)
                 merged.update(cur)
@@ -102,9 +109,7 @@ def _merge_preserve_supplier_quotes(existing_data, incoming_data):
                     elif fld in ['quote_id', 'quote_number', 'prices']:
                         if not cur.get(fld):
                             merged[fld] = ex_s.get(fld)
-                idx = in_sups.index(cur)
-                in_sups[idx] = merged
-                in_by_name[nm] = merged
+                in_sups[cur_pos] = merged
         it['suppliers'] = in_sups
     incoming_data['items'] = in_items
     return incoming_data
@@ -133,12 +138,8 @@ def _active_foreign_lock(project, actor):
     """Return active lock held by another user for this project (if any)."""
     if not project:
         return None
-    now = timezone.now()
     user_id = getattr((actor or {}).get('user'), 'id', None)
-    q = EditLock.objects.filter(project=project, expires_at__gt=now)
-    if user_id:
-        q = q.exclude(locked_by_id=user_id)
-    return q.order_by('expires_at').first()
+    return lock_backend().foreign_project_lock(project.id, user_id)
 def _lock_conflict_response(project, lock):
     owner = ''
     owner_id = None
@@ -244,6 +245,83 @@ def session_switch_company(request):
     request.session.modified = True
     audit_log(request, actor, action='session.company_scope', entity_type='session', entity_id=str(c.id), metadata={'scope': c.name})
     return JsonResponse({'ok': True, 'scope': 'company', 'company_id': c.id, 'company_name': c.name})
+def _weak_etag(payload):
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    return f'W/"{digest}"'
+def _etag_matches(request, etag):
+    header = request.headers.get('If-None-Match') or ''
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    bare = etag[2:] if etag.startswith('W/') else etag
+    for tag in header.split(','):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith('W/') else tag) == bare:
+            return True
+    return False
+def _with_etag(response, etag):
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+def _not_modified(etag):
+    return _with_etag(HttpResponse(status=304), etag)
+def _projects_summary_response(request, actor):
+    try:
+        limit = int(request.GET.get('limit') or _SUMMARY_PAGE_DEFAULT)
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    limit = max(1, min(limit, _SUMMARY_PAGE_MAX))
+    qs = (
+        annotate_project_permissions(_projects_qs_for_actor(actor), actor)
+        .defer('data')
+        .annotate(project_status=KT('data__project_status'))
+        .order_by('-updated_at', '-id')
+    )
+    raw_cursor = request.GET.get('cursor')
+    if raw_cursor:
+        cursor = decode_keyset_cursor(raw_cursor)
+        if cursor is None:
+            return JsonResponse({'error': 'Invalid cursor'}, status=400)
+        updated_at, pid = cursor
+        qs = qs.filter(Q(updated_at__lt=updated_at) | Q(updated_at=updated_at, id__lt=str(pid)))
+    page = []
+    has_more = False
+    for p in qs.iterator(chunk_size=limit + 1):
+        if not can_view_project(actor, p):
+            continue
+        if len(page) == limit:
+            has_more = True
+            break
+        page.append(p)
+    ids = [p.id for p in page]
+    item_counts = dict(
+        ProjectItem.objects.filter(project_id__in=ids).order_by()
+        .values('project_id').annotate(n=Count('id')).values_list('project_id', 'n')
+    )
+    suppliers = {}
+    for pid, name in ItemSupplierQuote.objects.filter(project_id__in=ids).exclude(supplier_name_norm='').order_by().values_list('project_id', 'supplier_name_norm').distinct():
+        suppliers.setdefault(pid, set()).add(name)
+    for pid, name in ProjectItem.objects.filter(project_id__in=ids).exclude(main_supplier_norm='').order_by().values_list('project_id', 'main_supplier_norm').distinct():
+        suppliers.setdefault(pid, set()).add(name)
+    rows = []
+    for p in page:
+        version = _project_version(p)
+        rows.append({
+            'id': p.id,
+            'name': p.name,
+            'project_status': p.project_status or '',
+            'item_count': item_counts.get(p.id, 0),
+            'supplier_count': len(suppliers.get(p.id, ())),
+            'data_version': version,
+            'server_updated_at': version,
+            'server_created_at': p.created_at.isoformat(),
+        })
+    body = {'projects': rows, 'next_cursor': encode_keyset_cursor(page[-1].updated_at, page[-1].id) if has_more else None}
+    etag = _weak_etag(body)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    return _with_etag(JsonResponse(body), etag)
 def projects_collection(request):
     actor, auth_err = require_auth_and_profile(request)
     if auth_err:
@@ -252,8 +330,18 @@ def projects_collection(request):
     if csrf_err:
         return csrf_err
     if request.method == 'GET':
-        projects = [p.as_dict() for p in _projects_qs_for_actor(actor) if can_view_project(actor, p)]
-        return JsonResponse({'projects': projects})
+        if request.GET.get('view') == 'summary':
+            return _projects_summary_response(request, actor)
+        # Versions first: an unchanged list is answered with 304 before any blob is loaded.
+        visible = [
+            p for p in annotate_project_permissions(_projects_qs_for_actor(actor).only('id', 'company', 'updated_at'), actor)
+            if can_view_project(actor, p)
+        ]
+        etag = _weak_etag([(p.id, _project_version(p)) for p in visible])
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+        projects = [p.as_dict() for p in _projects_qs_for_actor(actor).filter(id__in=[p.id for p in visible])]
+        return _with_etag(JsonResponse({'projects': projects}), etag)
     if request.method == 'POST':
         if not require_role(actor, 'editor'):
             return JsonResponse({'error': 'Edit permission required'}, status=403)
@@ -343,6 +431,151 @@ def project_detail(request, project_id: str):
         audit_log(request, actor, action='project.delete', entity_type='project', entity_id=oid)
         return JsonResponse({'ok': True})
     return HttpResponseNotAllowed(['GET', 'PUT', 'PATCH', 'DELETE'])
+def project_patch(request, project_id: str):
+    """Apply an RFC 6902 JSON Patch to Project.data under the base_version check.
+    Body: {base_version, ops:[...]} or a bare ops list with the version in If-Match.
+    """
+    actor, auth_err = require_auth_and_profile(request)
+    if auth_err:
+        return auth_err
+    csrf_err = require_same_origin_for_unsafe(request)
+    if csrf_err:
+        return csrf_err
+    if request.method not in ('PATCH', 'POST'):
+        return HttpResponseNotAllowed(['PATCH', 'POST'])
+    if not require_role(actor, 'editor'):
+        return JsonResponse({'error': 'Edit permission required'}, status=403)
+    payload = json_body(request)
+    if isinstance(payload, list):
+        payload = {'ops': payload, 'base_version': str(request.META.get('HTTP_IF_MATCH') or '').strip().strip('"')}
+    if not isinstance(payload, dict) or not isinstance(payload.get('ops'), list):
+        return JsonResponse({'error': 'Invalid JSON body (expected {base_version, ops:[...]})'}, status=400)
+    ops = payload.get('ops')
+    pid = str(project_id)
+    with transaction.atomic():
+        obj = _projects_qs_for_actor(actor).select_for_update().filter(id=pid).first()
+        if not obj or not can_view_project(actor, obj):
+            return JsonResponse({'error': 'Not found'}, status=404)
+        if not can_edit_project(actor, obj):
+            return JsonResponse({'error': 'Access denied'}, status=403)
+        lock = _active_foreign_lock(obj, actor)
+        if lock:
+            return _lock_conflict_response(obj, lock)
+        conflict = _ensure_matching_base_version(obj, payload)
+        if conflict:
+            return conflict
+        data = obj.data if isinstance(obj.data, dict) else {}
+        try:
+            applied = apply_patch(data, ops)
+        except JsonPatchError as e:
+            return JsonResponse({'error': f'Invalid patch: {e}', 'code': 'invalid_patch'}, status=400)
+        if str(data.get('id') or obj.id) != obj.id:
+            return JsonResponse({'error': 'Project id cannot be changed', 'code': 'invalid_patch'}, status=400)
+        for k in _SERVER_ONLY_KEYS:
+            data.pop(k, None)
+        obj.data = data
+        obj.name = str(data.get('name') or obj.name or 'Untitled')[:255]
+        obj.save()
+    audit_log(request, actor, action='project.patch', entity_type='project', entity_id=obj.id, project=obj, metadata={'ops': applied})
+    version = _project_version(obj)
+    return JsonResponse({'ok': True, 'project_id': obj.id, 'applied': applied, 'server_updated_at': version, 'data_version': version})
+def items_lookup(request):
+    actor, auth_err = require_auth_and_profile(request)
+    if auth_err:
+        return auth_err
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    dn = index_norm(request.GET.get('drawing_no'))
+    mpn = index_norm(request.GET.get('mpn'))
+    if not dn and not mpn:
+        return JsonResponse({'error': 'drawing_no or mpn required'}, status=400)
+    try:
+        limit = max(1, min(int(request.GET.get('limit') or 100), 500))
+    except (TypeError, ValueError):
+        limit = 100
+    cond = Q()
+    if dn:
+        cond |= Q(drawing_no_norm=dn) | Q(drawing_no_alt_norm=dn)
+    if mpn:
+        cond |= Q(mpn_norm=mpn)
+    qs = ProjectItem.objects.filter(cond, project__in=_projects_qs_for_actor(actor).values('id'))
+    exclude_project = str(request.GET.get('exclude_project') or '')
+    if exclude_project:
+        qs = qs.exclude(project_id=exclude_project)
+    rows = qs.select_related('project').only(
+        'project__id', 'project__name',
+        'position', 'item_id', 'drawing_no', 'drawing_no_norm', 'drawing_no_alt_norm', 'mpn', 'mpn_norm', 'manufacturer', 'description',
+    ).order_by('project_id', 'position')
+    visible = {
+        p.id
+        for p in annotate_project_permissions(Project.objects.filter(id__in=qs.values('project_id')).only('id', 'company'), actor)
+        if can_view_project(actor, p)
+    }
+    matches = []
+    for row in rows.iterator():
+        if row.project_id not in visible:
+            continue
+        matches.append({
+            'project_id': row.project_id,
+            'project_name': row.project.name,
+            'position': row.position,
+            'item_id': row.item_id,
+            'drawing_no': row.drawing_no,
+            'mpn': row.mpn,
+            'manufacturer': row.manufacturer,
+            'description': row.description,
+            'match_type': 'drawing_no' if dn and dn in (row.drawing_no_norm, row.drawing_no_alt_norm) else 'mpn',
+        })
+        if len(matches) >= limit:
+            break
+    return JsonResponse({'items': matches, 'truncated': len(matches) >= limit})
+def _sync_project(actor, write_company, proj):
+    """Upsert one bulk-sync project; caller holds the transaction.
+
+    Returns ``(status, project_id, conflict_response)`` with status
+    ``upserted``, ``skipped`` or ``conflict``.
+    """
+    pid = str(proj.get('id') or uuid.uuid4().hex)
+    name = str(proj.get('name') or 'Untitled')[:255]
+    # Resolve globally first (important for superadmin scoped mode)
+    obj = annotate_project_permissions(Project.objects.select_for_update().filter(id=pid), actor).first()
+    if obj:
+        # Superadmin writes are always pinned to explicit scope company.
+        # Never allow scoped sync to mutate a project from a different company.
+        if actor.get('is_superadmin') and write_company and obj.company_id != write_company.id:
+            return 'skipped', pid, None
+        if not can_edit_project(actor, obj):
+            return 'skipped', pid, None
+    else:
+        obj = Project(id=pid, name=name, data=proj, company=write_company)
+    if not obj.company_id and write_company:
+        obj.company = write_company
+    if obj.company_id and not can_edit_project(actor, obj):
+        return 'skipped', pid, None
+    lock = _active_foreign_lock(obj, actor)
+    if lock:
+        return 'conflict', pid, _lock_conflict_response(obj, lock)
+    # Bulk sync should remain resilient in normal edit flow: enforce optimistic
+    # version checks only when client explicitly provides base_version fields.
+    # This avoids false 409 spikes from legacy payloads that omit version.
+    if _extract_base_version(proj):
+        conflict = _ensure_matching_base_version(obj, proj)
+        if conflict:
+            return 'conflict', pid, conflict
+    obj.name = name
+    quoted_positions = None if obj._state.adding else quoted_item_positions(obj)
+    obj.data = _merge_preserve_supplier_quotes(obj.data or {}, proj, quoted_positions)
+    obj.save()
+    return 'upserted', pid, None
+def _prune_unsynced_projects(actor, incoming_ids):
+    existing_ids = set(
+        p.id for p in annotate_project_permissions(_projects_qs_for_actor(actor).only('id', 'company'), actor)
+        if can_edit_project(actor, p)
+    )
+    ids_to_delete = existing_ids - set(incoming_ids)
+    if not ids_to_delete:
+        return 0
+    return _projects_qs_for_actor(actor).filter(id__in=ids_to_delete).delete()[0]
 def projects_bulk(request):
     actor, auth_err = require_auth_and_profile(request)
     if auth_err:
@@ -375,49 +608,148 @@ def projects_bulk(request):
         for proj in projects:
             if not isinstance(proj, dict):
                 continue
-            pid = str(proj.get('id') or uuid.uuid4().hex)
+            status, pid, conflict = _sync_project(actor, write_company, proj)
             incoming_ids.add(pid)
-            name = str(proj.get('name') or 'Untitled')[:255]
-            # Resolve globally first (important for superadmin scoped mode)
-            obj = Project.objects.select_for_update().filter(id=pid).first()
-            if obj:
-                # Superadmin writes are always pinned to explicit scope company.
-                # Never allow scoped sync to mutate a project from a different company.
-                if actor.get('is_superadmin') and write_company and obj.company_id != write_company.id:
-                    skipped += 1
-                    continue
-                if not can_edit_project(actor, obj):
-                    skipped += 1
-                    continue
-            else:
-                obj = Project(id=pid, name=name, data=proj, company=write_company)
-            if not obj.company_id and write_company:
-                obj.company = write_company
-            if obj.company_id and not can_edit_project(actor, obj):
+            if conflict:
+                return conflict
+            if status == 'skipped':
                 skipped += 1
-                continue
-            lock = _active_foreign_lock(obj, actor)
-            if lock:
-                return _lock_conflict_response(obj, lock)
-            # Bulk sync should remain resilient in normal edit flow: enforce optimistic
-            # version checks only when client explicitly provides base_version fields.
-            # This avoids false 409 spikes from legacy payloads that omit version.
-            if _extract_base_version(proj):
-                conflict = _ensure_matching_base_version(obj, proj)
-                if conflict:
-                    return conflict
-            obj.name = name
-            obj.data = _merge_preserve_supplier_quotes(obj.data or {}, proj)
-            obj.save()
-            upserted += 1
+            else:
+                upserted += 1
         # Safety: never prune server projects unless client explicitly requests full replacement.
         if allow_delete:
-            existing_ids = set(p.id for p in _projects_qs_for_actor(actor) if can_edit_project(actor, p))
-            ids_to_delete = existing_ids - incoming_ids
-            if ids_to_delete:
-                deleted = _projects_qs_for_actor(actor).filter(id__in=ids_to_delete).delete()[0]
+            deleted = _prune_unsynced_projects(actor, incoming_ids)
     audit_log(request, actor, action='project.bulk_sync', entity_type='project', entity_id='bulk', metadata={'upserted': upserted, 'deleted': deleted, 'skipped': skipped, 'full_replace': allow_delete})
     return JsonResponse({'ok': True, 'upserted': upserted, 'deleted': deleted, 'skipped': skipped, 'full_replace': allow_delete})
+def _sync_session_for_actor(actor, session_id):
+    user = actor.get('user')
+    return SyncSession.objects.filter(
+        id=str(session_id), created_by=user, company=_write_company_for_actor(actor), expires_at__gt=timezone.now(),
+    ).first()
+def _sync_guard(request, methods):
+    actor, auth_err = require_auth_and_profile(request)
+    if auth_err:
+        return None, auth_err
+    csrf_err = require_same_origin_for_unsafe(request)
+    if csrf_err:
+        return None, csrf_err
+    if request.method not in methods:
+        return None, HttpResponseNotAllowed(methods)
+    if not require_role(actor, 'editor'):
+        return None, JsonResponse({'error': 'Edit permission required'}, status=403)
+    if _write_company_for_actor(actor) is None:
+        return None, JsonResponse({'error': 'Select company scope before sync'}, status=400)
+    return actor, None
+def projects_sync_begin(request):
+    actor, err = _sync_guard(request, ['POST'])
+    if err:
+        return err
+    payload = json_body(request)
+    payload = payload if isinstance(payload, dict) else {}
+    total_chunks = payload.get('total_chunks')
+    now = timezone.now()
+    # Abandoned sessions are dropped here; no scheduler needed.
+    SyncSession.objects.filter(expires_at__lte=now).delete()
+    session = SyncSession.objects.create(
+        id=uuid.uuid4().hex,
+        company=_write_company_for_actor(actor),
+        created_by=actor.get('user'),
+        full_replace=payload.get('full_replace') is True,
+        total_chunks=total_chunks if isinstance(total_chunks, int) and total_chunks > 0 else None,
+        expires_at=now + timedelta(minutes=max(1, int(getattr(settings, 'RFQ_SYNC_SESSION_TTL_MINUTES', 60)))),
+    )
+    data = session.as_dict()
+    data['max_chunk_projects'] = int(getattr(settings, 'RFQ_SYNC_CHUNK_MAX_PROJECTS', 50))
+    return JsonResponse({'ok': True, 'session': data}, status=201)
+def projects_sync_status(request, session_id: str):
+    actor, err = _sync_guard(request, ['GET'])
+    if err:
+        return err
+    session = _sync_session_for_actor(actor, session_id)
+    if not session:
+        return JsonResponse({'error': 'Sync session not found or expired'}, status=404)
+    return JsonResponse({'ok': True, 'session': session.as_dict()})
+def projects_sync_chunk(request, session_id: str, seq: int):
+    actor, err = _sync_guard(request, ['POST'])
+    if err:
+        return err
+    max_bytes = int(getattr(settings, 'RFQ_SYNC_CHUNK_MAX_BYTES', 8 * 1024 * 1024))
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except (TypeError, ValueError):
+        content_length = 0
+    if content_length > max_bytes:
+        return JsonResponse({'error': f'Chunk too large (max {max_bytes} bytes)', 'code': 'chunk_too_large'}, status=413)
+    session = _sync_session_for_actor(actor, session_id)
+    if not session:
+        return JsonResponse({'error': 'Sync session not found or expired'}, status=404)
+    if session.status != SyncSession.STATUS_OPEN:
+        return JsonResponse({'error': 'Sync session already committed'}, status=409)
+    key = str(seq)
+    if key in session.chunks:
+        # Retried upload after a lost response: replay the recorded outcome.
+        return JsonResponse({'ok': True, 'seq': seq, 'replayed': True, **session.chunks[key]})
+    payload = json_body(request)
+    projects = payload.get('projects') if isinstance(payload, dict) else payload
+    if not isinstance(projects, list):
+        return JsonResponse({'error': 'Invalid payload (expected {projects:[...]})'}, status=400)
+    max_projects = int(getattr(settings, 'RFQ_SYNC_CHUNK_MAX_PROJECTS', 50))
+    if len(projects) > max_projects:
+        return JsonResponse({'error': f'Chunk too large (max {max_projects} projects)', 'code': 'chunk_too_large'}, status=413)
+    write_company = _write_company_for_actor(actor)
+    results = []
+    canonical = {}
+    counts = {'upserted': 0, 'skipped': 0, 'conflicts': 0}
+    for proj in projects:
+        if not isinstance(proj, dict):
+            continue
+        # One short transaction per project: a conflict only affects its own row.
+        with transaction.atomic():
+            status, pid, conflict = _sync_project(actor, write_company, proj)
+        row = {'id': pid, 'status': status}
+        if conflict:
+            body = json.loads(conflict.content)
+            row.update(code=body.get('code'), reason=body.get('reason', ''), server_version=body.get('server_version', ''))
+            canonical[pid] = body.get('project')
+            counts['conflicts'] += 1
+        else:
+            counts[status] += 1
+        results.append(row)
+    chunk = {'results': results, **counts}
+    with transaction.atomic():
+        locked = SyncSession.objects.select_for_update().get(pk=session.pk)
+        if key not in locked.chunks:
+            locked.chunks[key] = chunk
+            seen = set(locked.incoming_ids)
+            locked.incoming_ids.extend(r['id'] for r in results if r['id'] not in seen)
+            locked.save(update_fields=['chunks', 'incoming_ids', 'updated_at'])
+    # Canonical copies of conflicting projects go back to the client but are not kept on the session.
+    live_results = [dict(r, project=canonical[r['id']]) if r['id'] in canonical else r for r in results]
+    return JsonResponse({'ok': True, 'seq': seq, 'replayed': False, **chunk, 'results': live_results})
+def projects_sync_commit(request, session_id: str):
+    actor, err = _sync_guard(request, ['POST'])
+    if err:
+        return err
+    session = _sync_session_for_actor(actor, session_id)
+    if not session:
+        return JsonResponse({'error': 'Sync session not found or expired'}, status=404)
+    if session.status == SyncSession.STATUS_COMMITTED:
+        return JsonResponse({'ok': True, 'session': session.as_dict()})
+    if session.total_chunks:
+        missing = sorted(set(range(session.total_chunks)) - {int(k) for k in session.chunks})
+        if missing:
+            return JsonResponse({'error': 'Missing chunks', 'code': 'missing_chunks', 'missing': missing}, status=409)
+    with transaction.atomic():
+        if session.full_replace:
+            session.deleted = _prune_unsynced_projects(actor, session.incoming_ids)
+        session.status = SyncSession.STATUS_COMMITTED
+        session.save(update_fields=['status', 'deleted', 'updated_at'])
+    totals = session.totals()
+    audit_log(request, actor, action='project.bulk_sync', entity_type='project', entity_id='bulk', metadata={
+        'upserted': totals['upserted'], 'deleted': session.deleted, 'skipped': totals['skipped'],
+        'conflicts': totals['conflicts'], 'full_replace': session.full_replace, 'sync_session': session.id,
+    })
+    return JsonResponse({'ok': True, 'session': session.as_dict()})
 def projects_reset(request):
     actor, auth_err = require_auth_and_profile(request)
     if auth_err:
@@ -480,7 +812,18 @@ def project_attachment_detail(request, project_id: str, attachment_id: str):
             pass
         att.delete()
         return JsonResponse({'ok': True})
-    return HttpResponseNotAllowed(['DELETE'])
+    if request.method == 'GET':
+        if not att.file:
+            return JsonResponse({'error': 'Not found'}, status=404)
+        filename = att.file.name.split('/')[-1]
+        # Each upload gets a fresh id, so the id pins the content.
+        try:
+            resp = serve_file(request, att.file, filename=filename, etag=f'"{att.id}"', last_modified=att.uploaded_at, as_attachment=False)
+        except (FileNotFoundError, OSError, ValueError):
+            return JsonResponse({'error': 'File missing'}, status=404)
+        resp['Cache-Control'] = 'private, max-age=3600'
+        return resp
+    return HttpResponseNotAllowed(['GET', 'DELETE'])
 def project_access(request, project_id: str):
     actor, auth_err = require_auth_and_profile(request)
     if auth_err:
@@ -576,33 +919,25 @@ def locks_acquire(request):
     company = actor.get('company')
     if not actor.get('is_superadmin') and not company:
         return JsonResponse({'error': 'User has no company assigned'}, status=403)
-    now = timezone.now()
-    expires_at = now + timedelta(seconds=ttl_sec)
+    expires_at = lease_expiry(ttl_sec)
     user = actor.get('user')
     user_id = getattr(user, 'id', None)
     display = getattr(user, 'username', '') or 'user'
-    with transaction.atomic():
-        lock = EditLock.objects.select_for_update().filter(resource_key=resource_key).first()
-        if lock and lock.expires_at > now and lock.locked_by_id != user_id:
-            return JsonResponse({
-                'ok': True,
-                'acquired': False,
-                'owner': {
-                    'user_id': lock.locked_by_id,
-                    'display': lock.locked_by_display,
-                },
-                'expires_at': lock.expires_at.isoformat(),
-                'resource_key': resource_key,
-            })
-        if not lock:
-            lock = EditLock(resource_key=resource_key)
-        lock.company = company if company else lock.company
-        lock.project = project
-        lock.locked_by_id = user_id
-        lock.locked_by_display = display
-        lock.context = context
-        lock.expires_at = expires_at
-        lock.save()
+    lock, acquired = lock_backend().acquire(
+        resource_key, company_id=getattr(company, 'id', None), project_id=getattr(project, 'id', None),
+        user_id=user_id, display=display, context=context, expires_at=expires_at,
+    )
+    if not acquired:
+        return JsonResponse({
+            'ok': True,
+            'acquired': False,
+            'owner': {
+                'user_id': lock.locked_by_id,
+                'display': lock.locked_by_display,
+            },
+            'expires_at': lock.expires_at.isoformat(),
+            'resource_key': resource_key,
+        })
     audit_log(request, actor, action='lock.acquire', entity_type='lock', entity_id=resource_key, project=project, metadata={'context': context, 'ttl_sec': ttl_sec})
     return JsonResponse({
         'ok': True,
@@ -627,21 +962,34 @@ def locks_heartbeat(request):
         return JsonResponse({'error': 'resource_key required'}, status=400)
     ttl_sec = int(payload.get('ttl_sec') or 180)
     ttl_sec = max(30, min(ttl_sec, 600))
-    now = timezone.now()
-    expires_at = now + timedelta(seconds=ttl_sec)
     user_id = getattr(actor.get('user'), 'id', None)
-    with transaction.atomic():
-        lock = EditLock.objects.select_for_update().filter(resource_key=resource_key).first()
-        if not lock:
-            return JsonResponse({'ok': True, 'renewed': False, 'reason': 'missing'})
-        if lock.expires_at <= now:
-            return JsonResponse({'ok': True, 'renewed': False, 'reason': 'expired'})
-        if lock.locked_by_id != user_id:
-            return JsonResponse({'ok': True, 'renewed': False, 'reason': 'owner_mismatch'})
-        lock.expires_at = expires_at
-        lock.save(update_fields=['expires_at', 'updated_at'])
-    audit_log(request, actor, action='lock.heartbeat', entity_type='lock', entity_id=resource_key, project=lock.project, metadata={'ttl_sec': ttl_sec})
-    return JsonResponse({'ok': True, 'renewed': True, 'expires_at': expires_at.isoformat()})
+    # Heartbeats are not audited: acquire / release already bracket the lease.
+    result = lock_backend().renew([resource_key], user_id, lease_expiry(ttl_sec))[resource_key]
+    return JsonResponse({'ok': True, **result})
+def locks_heartbeat_batch(request):
+    """Renew every lease the caller holds in one request: {resource_keys: [...], ttl_sec}."""
+    actor, auth_err = require_auth_and_profile(request)
+    if auth_err:
+        return auth_err
+    csrf_err = require_same_origin_for_unsafe(request)
+    if csrf_err:
+        return csrf_err
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    payload = json_body(request)
+    if not isinstance(payload, dict):
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+    raw_keys = payload.get('resource_keys')
+    if not isinstance(raw_keys, list):
+        return JsonResponse({'error': 'resource_keys must be a list'}, status=400)
+    resource_keys = list(dict.fromkeys(str(k or '').strip() for k in raw_keys if str(k or '').strip()))
+    if len(resource_keys) > MAX_BATCH_KEYS:
+        return JsonResponse({'error': f'At most {MAX_BATCH_KEYS} resource_keys per request'}, status=400)
+    ttl_sec = int(payload.get('ttl_sec') or 180)
+    ttl_sec = max(30, min(ttl_sec, 600))
+    user_id = getattr(actor.get('user'), 'id', None)
+    results = lock_backend().renew(resource_keys, user_id, lease_expiry(ttl_sec)) if resource_keys else {}
+    return JsonResponse({'ok': True, 'results': results})
 def locks_release(request):
     actor, auth_err = require_auth_and_profile(request)
     if auth_err:
@@ -658,13 +1006,10 @@ def locks_release(request):
     if not resource_key:
         return JsonResponse({'error': 'resource_key required'}, status=400)
     user_id = getattr(actor.get('user'), 'id', None)
-    q = EditLock.objects.filter(resource_key=resource_key)
-    if not actor.get('is_superadmin'):
-        q = q.filter(locked_by_id=user_id)
-    deleted, _ = q.delete()
-    if deleted:
+    released = lock_backend().release(resource_key, user_id=None if actor.get('is_superadmin') else user_id)
+    if released:
         audit_log(request, actor, action='lock.release', entity_type='lock', entity_id=resource_key)
-    return JsonResponse({'ok': True, 'released': bool(deleted)})
+    return JsonResponse({'ok': True, 'released': released})
 def locks_status(request):
     actor, auth_err = require_auth_and_profile(request)
     if auth_err:
@@ -674,14 +1019,13 @@ def locks_status(request):
     resource_key = str(request.GET.get('resource_key') or '').strip()
     if not resource_key:
         return JsonResponse({'error': 'resource_key required'}, status=400)
-    now = timezone.now()
     # Deterministic active lock lookup avoids stale/expired rows causing false unlocks
     # or ghost owner values when multiple rows exist for the same resource key.
-    lock = EditLock.objects.filter(resource_key=resource_key, expires_at__gt=now).order_by('-expires_at', '-updated_at').first()
+    lock = lock_backend().active(resource_key)
     if not lock:
         return JsonResponse({'ok': True, 'locked': False, 'resource_key': resource_key})
     actor_user_id = getattr(actor.get('user'), 'id', None)
-    owner_display = (lock.locked_by_display or '').strip() or (getattr(lock.locked_by, 'username', '') if lock.locked_by_id else '')
+    owner_display = (lock.locked_by_display or '').strip() or (getattr(getattr(lock, 'locked_by', None), 'username', '') if lock.locked_by_id else '')
     return JsonResponse({
         'ok': True,
         'locked': True,
@@ -712,14 +1056,11 @@ def locks_force_unlock(request):
     resource_key = str(payload.get('resource_key') or '').strip()
     if not resource_key:
         return JsonResponse({'error': 'resource_key required'}, status=400)
-    q = EditLock.objects.filter(resource_key=resource_key)
-    if not actor.get('is_superadmin'):
-        company = actor.get('company')
-        q = q.filter(company=company)
-    deleted, _ = q.delete()
-    if deleted:
+    company_id = None if actor.get('is_superadmin') else getattr(actor.get('company'), 'id', None)
+    forced = lock_backend().release(resource_key, company_id=company_id)
+    if forced:
         audit_log(request, actor, action='lock.force_unlock', entity_type='lock', entity_id=resource_key)
-    return JsonResponse({'ok': True, 'forced': bool(deleted)})
+    return JsonResponse({'ok': True, 'forced': forced})
 def admin_users(request):
     actor, auth_err = require_auth_and_profile(request)
     if auth_err:
@@ -809,6 +1150,7 @@ def admin_users(request):
             if hasattr(u, 'is_active'):
                 u.is_active = False
                 u.save(update_fields=['is_active'])
+            invalidate_actor_cache(uid)
             audit_log(request, actor, action='admin.user.delete', entity_type='user', entity_id=str(uid), metadata={'soft_delete': True})
             return JsonResponse({'ok': True})
         role = str(payload.get('role') or profile.role).strip().lower()
@@ -832,6 +1174,7 @@ def admin_users(request):
                     return JsonResponse({'error': 'Company not found'}, status=404)
                 profile.company = c
         profile.save()
+        invalidate_actor_cache(uid)
         audit_log(
             request, actor,
             action='admin.user.update',
@@ -864,12 +1207,21 @@ def admin_companies(request):
                 'postal_code': c.postal_code,
                 'country': c.country,
                 'is_active': bool(c.is_active),
+                'audit_retention_days': c.audit_retention_days,
             })
         return JsonResponse({'companies': rows})
     if request.method == 'POST':
         payload = json_body(request)
         if not isinstance(payload, dict):
             return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+        raw_days = payload.get('audit_retention_days')
+        try:
+            # Empty / null falls back to RFQ_AUDIT_RETENTION_DAYS.
+            retention_days = int(raw_days) if raw_days not in (None, '') else None
+        except (TypeError, ValueError):
+            retention_days = 0
+        if retention_days is not None and retention_days < 1:
+            return JsonResponse({'error': 'audit_retention_days must be a positive number of days'}, status=400)
         cid = payload.get('id')
         if cid:
             c = Company.objects.filter(id=cid).first()
@@ -899,7 +1251,10 @@ def admin_companies(request):
             c.country = str(payload.get('country') or '').strip()
         if 'is_active' in payload:
             c.is_active = bool(payload.get('is_active'))
+        if 'audit_retention_days' in payload:
+            c.audit_retention_days = retention_days
         c.save()
+        invalidate_actor_cache()
         audit_log(request, actor, action='admin.company.upsert', entity_type='company', entity_id=str(c.id), metadata={'created': created, 'name': c.name, 'is_active': c.is_active})
         return JsonResponse({'ok': True, 'company': {
             'id': c.id,
@@ -912,6 +1267,7 @@ def admin_companies(request):
             'postal_code': c.postal_code,
             'country': c.country,
             'is_active': c.is_active,
+            'audit_retention_days': c.audit_retention_days,
         }})
     return HttpResponseNotAllowed(['GET', 'POST'])
 def admin_locks(request):
@@ -922,24 +1278,26 @@ def admin_locks(request):
         return HttpResponseNotAllowed(['GET'])
     if not require_role(actor, 'admin'):
         return JsonResponse({'error': 'Admin permission required'}, status=403)
-    now = timezone.now()
-    q = EditLock.objects.select_related('locked_by', 'company', 'project').filter(expires_at__gt=now)
-    if not actor.get('is_superadmin'):
-        q = q.filter(company=actor.get('company'))
+    company_id = None if actor.get('is_superadmin') else getattr(actor.get('company'), 'id', None)
     try:
         limit = min(int(request.GET.get('limit', 200)), 500)
     except (ValueError, TypeError):
         limit = 200
+    leases = lock_backend().active_leases(company_id=company_id, limit=limit)
+    # Names are resolved in bulk so either lock backend costs the same few queries.
+    project_names = dict(Project.objects.filter(id__in={l.project_id for l in leases if l.project_id}).values_list('id', 'name'))
+    company_names = dict(Company.objects.filter(id__in={l.company_id for l in leases if l.company_id}).values_list('id', 'name'))
+    usernames = dict(get_user_model().objects.filter(id__in={l.locked_by_id for l in leases if l.locked_by_id}).values_list('id', 'username'))
     rows = []
-    for l in q.order_by('expires_at')[:limit]:
+    for l in leases:
         rows.append({
             'resource_key': l.resource_key,
             'context': l.context,
             'project_id': l.project_id,
-            'project_name': l.project.name if l.project else '',
+            'project_name': project_names.get(l.project_id, ''),
             'company_id': l.company_id,
-            'company_name': l.company.name if l.company else '',
-            'locked_by': l.locked_by_display or (getattr(l.locked_by, 'username', '') if l.locked_by_id else ''),
+            'company_name': company_names.get(l.company_id, ''),
+            'locked_by': l.locked_by_display or usernames.get(l.locked_by_id, ''),
             'locked_by_id': l.locked_by_id,
             'expires_at': l.expires_at.isoformat() if l.expires_at else '',
         })
@@ -953,51 +1311,59 @@ def admin_audit_logs(request):
     if not require_role(actor, 'admin'):
         return JsonResponse({'error': 'Admin permission required'}, status=403)
     from .models import AuditLog
-    q = AuditLog.objects.select_related('actor', 'company', 'project').all()
+    q = AuditLog.objects.all()
     if not actor.get('is_superadmin'):
         q = q.filter(company=actor.get('company'))
-    action = str(request.GET.get('action') or '').strip()
-    if action:
-        q = q.filter(action__icontains=action)
-    entity = str(request.GET.get('entity_type') or '').strip()
-    if entity:
-        q = q.filter(entity_type__icontains=entity)
+    try:
+        q = audit_query.apply_filters(q, request.GET)
+    except ValueError as exc:
+        return JsonResponse({'error': f'Invalid {exc}'}, status=400)
     try:
         limit = min(int(request.GET.get('limit', 100)), 500)
     except (ValueError, TypeError):
         limit = 100
-    rows = []
-    for a in q.order_by('-created_at')[:limit]:
-        rows.append({
-            'id': a.id,
-            'time': a.created_at.isoformat() if a.created_at else '',
-            'action': a.action,
-            'entity_type': a.entity_type,
-            'entity_id': a.entity_id,
-            'actor': getattr(a.actor, 'username', '') if a.actor_id else '',
-            'actor_role': a.actor_role,
-            'company_id': a.company_id,
-            'project_id': a.project_id,
-            'metadata': a.metadata_json or {},
-        })
-    return JsonResponse({'logs': rows})
-def export_data(request):
+    limit = max(1, limit)
+    raw_cursor = request.GET.get('cursor')
+    if raw_cursor:
+        cursor = decode_keyset_cursor(raw_cursor)
+        if cursor is None:
+            return JsonResponse({'error': 'Invalid cursor'}, status=400)
+        q = audit_query.after_cursor(q, cursor)
+    page = list(q.values(*audit_query.ROW_FIELDS)[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    next_cursor = encode_keyset_cursor(page[-1]['created_at'], page[-1]['id']) if has_more else None
+    return JsonResponse({'logs': [audit_query.row_dict(r) for r in page], 'next_cursor': next_cursor})
+def admin_audit_logs_export(request):
+    """Stream every matching audit entry as NDJSON (default) or CSV (``format=csv``)."""
     actor, auth_err = require_auth_and_profile(request)
     if auth_err:
         return auth_err
-    csrf_err = require_same_origin_for_unsafe(request)
-    if csrf_err:
-        return csrf_err
-    if request.method != 'POST':
-        return HttpResponseNotAllowed(['POST'])
-    payload = json_body(request)
-    if not isinstance(payload, dict):
-        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
-    project_ids = payload.get('project_ids') or []
-    if not isinstance(project_ids, list) or not project_ids:
-        return JsonResponse({'error': 'project_ids is required'}, status=400)
-    requested_ids = [str(x) for x in project_ids]
-    scoped = _projects_qs_for_actor(actor).filter(id__in=requested_ids)
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if not require_role(actor, 'admin'):
+        return JsonResponse({'error': 'Admin permission required'}, status=403)
+    fmt = str(request.GET.get('format') or 'ndjson').strip().lower()
+    if fmt not in ('ndjson', 'csv'):
+        return JsonResponse({'error': 'format must be ndjson or csv'}, status=400)
+    from .models import AuditLog
+    q = AuditLog.objects.all()
+    if not actor.get('is_superadmin'):
+        q = q.filter(company=actor.get('company'))
+    try:
+        q = audit_query.apply_filters(q, request.GET)
+    except ValueError as exc:
+        return JsonResponse({'error': f'Invalid {exc}'}, status=400)
+    filters = {k: v for k, v in request.GET.items() if k != 'format'}
+    audit_log(request, actor, action='audit.export', entity_type='audit_log', metadata={'format': fmt, 'filters': filters})
+    if fmt == 'csv':
+        resp = StreamingHttpResponse(audit_query.csv_stream(q), content_type='text/csv; charset=utf-8')
+    else:
+        resp = StreamingHttpResponse(audit_query.ndjson_stream(q), content_type='application/x-ndjson')
+    resp['Content-Disposition'] = f'attachment; filename="audit_logs.{fmt}"'
+    return resp
+def _export_scope_error(actor, requested_ids):
+    scoped = annotate_project_permissions(_projects_qs_for_actor(actor).filter(id__in=requested_ids).only('id', 'company'), actor)
     allowed_ids = set()
     for p in scoped:
         if can_view_project(actor, p):
@@ -1005,5 +1371,80 @@ def export_data(request):
     denied_ids = [pid for pid in requested_ids if pid not in allowed_ids]
     if denied_ids:
         return JsonResponse({'error': 'Access denied for one or more project_ids', 'denied_project_ids': denied_ids}, status=403)
-    # Delegate rendering/export formatting to legacy implementation after strict scope check.
-    return _v.export_data(request)
+    return None
+def export_data(request):
+    actor, auth_err = require_auth_and_profile(request)
+    if auth_err:
+        return auth_err
+    csrf_err = require_same_origin_for_unsafe(request)
+    if csrf_err:
+        return csrf_err
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    opts, err = parse_export_options(json_body(request))
+    if err:
+        return err
+    scope_err = _export_scope_error(actor, opts['project_ids'])
+    if scope_err:
+        return scope_err
+    return export_response(opts)
+def _export_job_company(actor, project_ids):
+    """Company a job is filed under; a superadmin without a scope gets the one company of the exported projects."""
+    company = _write_company_for_actor(actor)
+    if company is not None:
+        return company
+    company_ids = set(Project.objects.filter(id__in=project_ids).values_list('company_id', flat=True))
+    if len(company_ids) == 1 and None not in company_ids:
+        return Company.objects.filter(id=company_ids.pop()).first()
+    return actor.get('company')
+def export_jobs_create(request):
+    actor, auth_err = require_auth_and_profile(request)
+    if auth_err:
+        return auth_err
+    csrf_err = require_same_origin_for_unsafe(request)
+    if csrf_err:
+        return csrf_err
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    opts, err = parse_export_options(json_body(request))
+    if err:
+        return err
+    scope_err = _export_scope_error(actor, opts['project_ids'])
+    if scope_err:
+        return scope_err
+    company = _export_job_company(actor, opts['project_ids'])
+    if company is None:
+        return JsonResponse({'error': 'Select company scope before exporting projects of several companies'}, status=400)
+    job = create_export_job(actor, opts, company)
+    audit_log(request, actor, action='export.job_create', entity_type='export_job', entity_id=job.id, metadata={'format': job.format, 'projects': job.total})
+    return JsonResponse({'job': job.as_dict()}, status=202)
+def _export_job_for_actor(actor, job_id):
+    return ExportJob.objects.filter(id=job_id, created_by=actor['user'], expires_at__gt=timezone.now()).first()
+def export_job_status(request, job_id):
+    actor, auth_err = require_auth_and_profile(request)
+    if auth_err:
+        return auth_err
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    job = _export_job_for_actor(actor, job_id)
+    if not job:
+        return JsonResponse({'error': 'Export job not found'}, status=404)
+    return JsonResponse({'job': job.as_dict()})
+def export_job_download(request, job_id):
+    actor, auth_err = require_auth_and_profile(request)
+    if auth_err:
+        return auth_err
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    job = _export_job_for_actor(actor, job_id)
+    if not job:
+        return JsonResponse({'error': 'Export job not found'}, status=404)
+    if job.status != ExportJob.STATUS_DONE or not job.file:
+        return JsonResponse({'error': 'Export job is not finished', 'job': job.as_dict()}, status=409)
+    try:
+        return serve_file(
+            request, job.file, filename=EXPORT_FILENAMES.get(job.format, 'rfq_export'),
+            etag=f'"{job.id}"', content_type=EXPORT_CONTENT_TYPES.get(job.format),
+        )
+    except (FileNotFoundError, OSError):
+        return JsonResponse({'error': 'Export file is no longer available'}, status=410)
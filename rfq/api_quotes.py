@@ -6,13 +6,24 @@ from django.db import transaction
 from django.http import HttpResponseNotAllowed, JsonResponse
 from .api_common import (
     audit_log as _audit_log,
+    decode_keyset_cursor as _decode_keyset_cursor,
+    encode_keyset_cursor as _encode_keyset_cursor,
     get_buyer_username as _get_buyer_username,
     json_body as _json_body,
     require_auth_and_profile as _require_auth_and_profile,
     require_role as _require_role,
     require_same_origin_for_unsafe as _require_same_origin_for_unsafe,
 )
-from .models import Project, Quote, QuoteLine, SupplierAccess
+from .item_index import matching_item_positions
+from .item_matching import MatchIndex, find_supplier
+from .models import Project, Quote, QuoteIndex, QuoteLine, SupplierAccess
+from .quote_index import PORTAL_EXPIRED_STATUSES, PORTAL_LIST_STATUSES
+from .quote_ingest import (
+    bulk_import_quotes as _bulk_import_quotes,
+    line_from_payload as _line_from_payload,
+    planner_line_from_payload as _planner_line_from_payload,
+    write_lines as _write_lines,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -45,11 +56,6 @@ def _portal_qs_for_actor(actor):
     return qs.filter(company=company)
 def _normalize_name(s):
     return ' '.join(str(s).split()).strip()
-def _safe_int(v, default=0):
-    try:
-        return int(float(v))
-    except (ValueError, TypeError):
-        return default
 def _safe_decimal(v):
     if v is None or v == '':
         return None
@@ -64,6 +70,42 @@ def _parse_val_decimal(val):
         return Decimal(str(val).replace(',', '.').strip())
     except (ValueError, InvalidOperation):
         return None
+def _quote_index_qs_for_actor(actor):
+    qs = QuoteIndex.objects.all()
+    if actor and actor.get('is_superadmin'):
+        scope_company = actor.get('scope_company')
+        return qs.filter(company=scope_company) if scope_company else qs
+    company = (actor or {}).get('company')
+    if company is None:
+        return qs.none()
+    return qs.filter(company=company)
+def _portal_list_row(p):
+    from datetime import datetime
+    sub = p.submission_data or {}
+    q_num = sub.get('quote_number') or f'PORTAL-{p.round}'
+    exp_date = p.valid_until
+    if not exp_date and sub.get('quote_valid_until'):
+        try:
+            exp_date = datetime.fromisoformat(str(sub.get('quote_valid_until')))
+        except Exception:
+            pass
+    items = sub.get('items') or p.requested_items or []
+    lines_count = len(items) if isinstance(items, list) else 0
+    return {
+        'id': p.id,
+        'project_id': p.project_id,
+        'project_name': p.project.name if p.project else '',
+        'supplier_name': p.supplier_name,
+        'received_from': p.contact_name or sub.get('supplier_contact_name') or '',
+        'quote_number': q_num,
+        'create_date': p.created_at.isoformat() if p.created_at else None,
+        'expire_date': exp_date.isoformat() if exp_date else None,
+        'currency': sub.get('currency') or 'EUR',
+        'status': p.status,
+        'source_type': 'portal',
+        'lines_count': lines_count,
+        'source_id': p.id,
+    }
 def quotes_list(request):
     if request.method != 'GET':
         return HttpResponseNotAllowed(['GET'])
@@ -73,70 +115,40 @@ def quotes_list(request):
     csrf_err = _require_same_origin_for_unsafe(request)
     if csrf_err:
         return csrf_err
-    from datetime import date, datetime
-    from django.db.models import Q
+    from datetime import date
+    from django.db.models import Count, Q
     from django.utils import timezone
-    manual_qs = _quotes_qs_for_actor(actor)
-    portal_qs = _portal_qs_for_actor(actor)
+    manual = Q(source_type=QuoteIndex.SOURCE_MANUAL)
+    portal = Q(source_type=QuoteIndex.SOURCE_PORTAL)
+    qs = _quote_index_qs_for_actor(actor).filter(manual | (portal & Q(status__in=PORTAL_LIST_STATUSES)))
     project_id = request.GET.get('project_id')
     if project_id:
-        manual_qs = manual_qs.filter(project_id=project_id)
-        portal_qs = portal_qs.filter(project_id=project_id)
+        qs = qs.filter(project_id=project_id)
     supplier = request.GET.get('supplier', '').strip()
     if supplier:
-        manual_qs = manual_qs.filter(supplier_name__icontains=supplier)
-        portal_qs = portal_qs.filter(supplier_name__icontains=supplier)
+        qs = qs.filter(supplier_name__icontains=supplier)
     expired_param = request.GET.get('expired', '').strip().lower()
     today = date.today()
     now = timezone.now()
+    portal_expired = Q(valid_until__lt=now) | Q(status__in=PORTAL_EXPIRED_STATUSES)
     if expired_param == 'true':
-        manual_qs = manual_qs.filter(expire_date__lt=today)
-        portal_qs = portal_qs.filter(Q(valid_until__lt=now) | Q(status__in=['expired', 'lost', 'rejected']))
+        qs = qs.filter((manual & Q(expire_date__lt=today)) | (portal & portal_expired))
     elif expired_param == 'false':
-        manual_qs = manual_qs.filter(expire_date__gte=today)
-        portal_qs = portal_qs.exclude(Q(valid_until__lt=now) | Q(status__in=['expired', 'lost', 'rejected']))
+        qs = qs.filter((manual & Q(expire_date__gte=today)) | (portal & ~portal_expired))
     search = request.GET.get('search', '').strip()
     if search:
-        manual_qs = manual_qs.filter(
-            Q(quote_number__icontains=search)
-            | Q(supplier_name__icontains=search)
-            | Q(project_name__icontains=search)
-            | Q(received_from__icontains=search)
+        qs = qs.filter(
+            (manual & (
+                Q(quote_number__icontains=search)
+                | Q(supplier_name__icontains=search)
+                | Q(project_name__icontains=search)
+                | Q(received_from__icontains=search)
+            ))
+            | (portal & (Q(supplier_name__icontains=search) | Q(project__name__icontains=search)))
         )
-        portal_qs = portal_qs.filter(Q(supplier_name__icontains=search) | Q(project__name__icontains=search))
-    results = []
-    for q in manual_qs:
-        d = q.as_dict()
-        d['source_type'] = 'manual'
-        d['status'] = 'expired' if (q.expire_date and q.expire_date < today) else 'active'
-        results.append(d)
-    for p in portal_qs:
-        sub = p.submission_data or {}
-        q_num = sub.get('quote_number') or f'PORTAL-{p.round}'
-        exp_date = p.valid_until
-        if not exp_date and sub.get('quote_valid_until'):
-            try:
-                exp_date = datetime.fromisoformat(str(sub.get('quote_valid_until')))
-            except Exception:
-                pass
-        items = sub.get('items') or p.requested_items or []
-        lines_count = len(items) if isinstance(items, list) else 0
-        results.append({
-            'id': p.id,
-            'project_id': p.project_id,
-            'project_name': p.project.name if p.project else '',
-            'supplier_name': p.supplier_name,
-            'received_from': p.contact_name or sub.get('supplier_contact_name') or '',
-            'quote_number': q_num,
-            'create_date': p.created_at.isoformat() if p.created_at else None,
-            'expire_date': exp_date.isoformat() if exp_date else None,
-            'currency': sub.get('currency') or 'EUR',
-            'status': p.status,
-            'source_type': 'portal',
-            'lines_count': lines_count,
-            'source_id': p.id,
-        })
-    results.sort(key=lambda x: str(x.get('create_date') or ''), reverse=True)
+    quote_number = request.GET.get('quote_number', '').strip()
+    if quote_number:
+        qs = qs.filter(quote_number__icontains=quote_number)
     try:
         limit = int(request.GET.get('limit', 100))
         offset = int(request.GET.get('offset', 0))
@@ -144,9 +156,39 @@ def quotes_list(request):
     except (ValueError, TypeError):
         limit = 100
         offset = 0
-    total = len(results)
-    page_items = results[offset:offset + limit]
-    return JsonResponse({'ok': True, 'quotes': page_items, 'total': total, 'limit': limit, 'offset': offset})
+    total = qs.count()
+    qs = qs.order_by('-create_date', '-id')
+    raw_cursor = request.GET.get('cursor')
+    if raw_cursor:
+        cursor = _decode_keyset_cursor(raw_cursor)
+        if cursor is None:
+            return JsonResponse({'error': 'Invalid cursor'}, status=400)
+        created, row_id = cursor
+        qs = qs.filter(Q(create_date__lt=created) | Q(create_date=created, id__lt=row_id))
+        offset = 0
+    page = list(qs.values('id', 'source_type', 'source_pk', 'create_date')[offset:offset + limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    manual_ids = [r['source_pk'] for r in page if r['source_type'] == QuoteIndex.SOURCE_MANUAL]
+    portal_ids = [r['source_pk'] for r in page if r['source_type'] == QuoteIndex.SOURCE_PORTAL]
+    quotes = Quote.objects.select_related('project').annotate(num_lines=Count('lines')).in_bulk(manual_ids)
+    accesses = SupplierAccess.objects.select_related('project').in_bulk(portal_ids)
+    page_items = []
+    for r in page:
+        if r['source_type'] == QuoteIndex.SOURCE_MANUAL:
+            q = quotes.get(r['source_pk'])
+            if q is None:
+                continue
+            d = q.as_dict()
+            d['source_type'] = 'manual'
+            d['status'] = 'expired' if (q.expire_date and q.expire_date < today) else 'active'
+            page_items.append(d)
+        else:
+            p = accesses.get(r['source_pk'])
+            if p is not None:
+                page_items.append(_portal_list_row(p))
+    next_cursor = _encode_keyset_cursor(page[-1]['create_date'], page[-1]['id']) if has_more and page else None
+    return JsonResponse({'ok': True, 'quotes': page_items, 'total': total, 'limit': limit, 'offset': offset, 'next_cursor': next_cursor})
 def quotes_detail(request, quote_id):
     if request.method != 'GET':
         return HttpResponseNotAllowed(['GET'])
@@ -312,26 +354,7 @@ def quotes_create(request):
             source_id=data.get('source_id', ''),
         )
         quote.save()
-        for idx, line_data in enumerate(data.get('lines', [])):
-            line = QuoteLine(
-                quote=quote,
-                drawing_number=line_data.get('drawing_number', ''),
-                manufacturer=line_data.get('manufacturer', ''),
-                mpn=line_data.get('mpn', ''),
-                description=line_data.get('description', ''),
-                uom=line_data.get('uom', 'pcs'),
-                moq=line_data.get('moq', 1),
-                manufacturing_lead_time=line_data.get('manufacturing_lead_time', ''),
-                supplier_lead_time=line_data.get('supplier_lead_time', '14 days'),
-                available_stock=line_data.get('available_stock'),
-                available_stock_date=line_data.get('available_stock_date'),
-                line_number=idx + 1,
-                notes=line_data.get('notes', ''),
-            )
-            for i in range(1, 11):
-                setattr(line, f'qty_{i}', line_data.get(f'qty_{i}', ''))
-                setattr(line, f'price_{i}', line_data.get(f'price_{i}'))
-            line.save()
+        _write_lines(quote, [_line_from_payload(line_data, idx + 1) for idx, line_data in enumerate(data.get('lines', []))])
     _audit_log(request, actor, action='quote.create', entity_type='quote', entity_id=quote.id, project=quote.project, metadata={'quote_number': quote.quote_number})
     return JsonResponse({'ok': True, 'quote': quote.as_dict()}, status=201)
 def quotes_update(request, quote_id):
@@ -398,27 +421,7 @@ def quotes_update(request, quote_id):
             quote.project_name = data['project_name']
         quote.save()
         if 'lines' in data:
-            quote.lines.all().delete()
-            for idx, line_data in enumerate(data['lines']):
-                line = QuoteLine(
-                    quote=quote,
-                    drawing_number=line_data.get('drawing_number', ''),
-                    manufacturer=line_data.get('manufacturer', ''),
-                    mpn=line_data.get('mpn', ''),
-                    description=line_data.get('description', ''),
-                    uom=line_data.get('uom', 'pcs'),
-                    moq=line_data.get('moq', 1),
-                    manufacturing_lead_time=line_data.get('manufacturing_lead_time', ''),
-                    supplier_lead_time=line_data.get('supplier_lead_time', '14 days'),
-                    available_stock=line_data.get('available_stock'),
-                    available_stock_date=line_data.get('available_stock_date'),
-                    line_number=idx + 1,
-                    notes=line_data.get('notes', ''),
-                )
-                for i in range(1, 11):
-                    setattr(line, f'qty_{i}', line_data.get(f'qty_{i}', ''))
-                    setattr(line, f'price_{i}', line_data.get(f'price_{i}'))
-                line.save()
+            _write_lines(quote, [_line_from_payload(line_data, idx + 1) for idx, line_data in enumerate(data['lines'])], replace=True)
     _audit_log(request, actor, action='quote.update', entity_type='quote', entity_id=quote.id, project=quote.project, metadata={'quote_number': quote.quote_number})
     return JsonResponse({'ok': True, 'quote': quote.as_dict()})
 def quotes_delete(request, quote_id):
@@ -468,9 +471,11 @@ def quotes_create_from_item(request):
         proj = _projects_qs_for_actor(actor).get(id=pid)
     except Project.DoesNotExist:
         return JsonResponse({'error': 'Project not found'}, status=404)
+    items = (proj.data or {}).get('items') or []
     target_item = None
-    for it in (proj.data or {}).get('items') or []:
-        if str(it.get('id') or '') == str(item_id):
+    for pos in matching_item_positions(proj, item_ids=[item_id]):
+        it = items[pos] if pos < len(items) else None
+        if isinstance(it, dict) and str(it.get('id') or '') == str(item_id):
             target_item = it
             break
     if not target_item:
@@ -538,17 +543,22 @@ def quotes_export_to_item(request):
         quote_lines = QuoteLine.objects.filter(id__in=line_ids).select_related('quote')
         pdata = proj.data or {}
         items = pdata.get('items') or []
+        quote_lines = list(quote_lines)
+        candidates = MatchIndex(
+            [
+                items[pos]
+                for pos in matching_item_positions(
+                    proj,
+                    drawing_nos=[ql.drawing_number for ql in quote_lines],
+                    mpns=[ql.mpn for ql in quote_lines],
+                )
+                if pos < len(items)
+            ],
+            drawing_fields=('drawing_no', 'item_drawing_no'),
+        )
         updates_count = 0
         for ql in quote_lines:
-            q_dn = _normalize_name(ql.drawing_number or '').lower()
-            q_mpn = _normalize_name(ql.mpn or '').lower()
-            target_item = None
-            for it in items:
-                it_dn = _normalize_name(it.get('drawing_no') or it.get('item_drawing_no') or '').lower()
-                it_mpn = _normalize_name(it.get('mpn') or '').lower()
-                if (q_dn and it_dn and q_dn == it_dn) or (q_mpn and it_mpn and q_mpn == it_mpn):
-                    target_item = it
-                    break
+            target_item = candidates.by_drawing_or_mpn(ql.drawing_number, ql.mpn)
             if target_item:
                 sups = target_item.get('suppliers') or []
                 if not isinstance(sups, list):
@@ -573,14 +583,10 @@ def quotes_export_to_item(request):
                     val = getattr(ql, f'price_{i}', None)
                     if val:
                         sup_entry[f'price_{i}'] = float(val)
-                found = False
-                for s in sups:
-                    sn = _normalize_name(s.get('supplier_name') or s.get('name') or s.get('supplier') or '').lower()
-                    if sn == _normalize_name(ql.quote.supplier_name).lower():
-                        s.update(sup_entry)
-                        found = True
-                        break
-                if not found:
+                existing_sup = find_supplier(sups, ql.quote.supplier_name)
+                if existing_sup is not None:
+                    existing_sup.update(sup_entry)
+                else:
                     sups.append(sup_entry)
                 target_item['suppliers'] = sups
                 updates_count += 1
@@ -605,58 +611,11 @@ def quotes_bulk_import(request):
     payload = _json_body(request)
     if not isinstance(payload, list):
         return JsonResponse({'error': 'Expected a list of quotes'}, status=400)
-    imported_count, lines_count, errors = 0, 0, []
-    with transaction.atomic():
-        for idx, q_data in enumerate(payload):
-            sname = str(q_data.get('supplier_name') or '').strip()
-            if not sname:
-                errors.append(f'Row {idx+1}: Missing supplier name')
-                continue
-            q_num = str(q_data.get('quote_number') or '').strip()
-            if not q_num:
-                from django.utils import timezone
-                import random
-                now_str = timezone.now().strftime('%Y%m%d_%H%M')
-                q_num = f"{sname.replace(' ', '_').upper()}_{now_str}_{random.randint(1000, 9999)}"
-            proj = None
-            q_pid = q_data.get('project_id')
-            if q_pid:
-                proj = _projects_qs_for_actor(actor).filter(id=str(q_pid)).first()
-                if not proj:
-                    errors.append(f'Row {idx+1}: invalid project_id or access denied')
-                    continue
-            quote, _created = _quotes_qs_for_actor(actor).update_or_create(
-                quote_number=q_num,
-                defaults={
-                    'supplier_name': sname,
-                    'source': 'import',
-                    'currency': q_data.get('currency') or 'EUR',
-                    'created_by': _get_buyer_username(request),
-                    'project': proj,
-                    'project_name': (proj.name if proj else str(q_data.get('project_name') or '')),
-                    'company': (proj.company if proj else actor.get('company')),
-                },
-            )
-            items = q_data.get('items') or []
-            if not isinstance(items, list):
-                continue
-            start_line_num = quote.lines.count() + 1
-            for i_idx, item in enumerate(items):
-                QuoteLine.objects.create(
-                    quote=quote,
-                    line_number=start_line_num + i_idx,
-                    drawing_number=str(item.get('drawing_number') or '').strip(),
-                    mpn=str(item.get('mpn') or '').strip(),
-                    description=str(item.get('description') or '').strip(),
-                    uom=str(item.get('uom') or 'pcs'),
-                    moq=_safe_int(item.get('moq'), 1),
-                    manufacturing_lead_time=str(item.get('lead_time') or ''),
-                    price_1=_safe_decimal(item.get('price')),
-                    qty_1=str(item.get('qty') or ''),
-                )
-                lines_count += 1
-            imported_count += 1
-    return JsonResponse({'ok': True, 'imported_quotes': imported_count, 'imported_lines': lines_count, 'errors': errors})
+    result = _bulk_import_quotes(
+        payload, projects_qs=_projects_qs_for_actor(actor), quotes_qs=_quotes_qs_for_actor(actor),
+        company=actor.get('company'), username=_get_buyer_username(request),
+    )
+    return JsonResponse({'ok': True, **result})
 def quotes_upsert_from_planner(request):
     if request.method != 'POST':
         return HttpResponseNotAllowed(['POST'])
@@ -739,24 +698,7 @@ def quotes_upsert_from_planner(request):
                     shipping_cost=_safe_decimal(shipping_cost) or Decimal('0'),
                     mov=_safe_decimal(mov) or Decimal('0'),
                 )
-            lines_count = 0
-            for idx, item in enumerate(items_data):
-                line = QuoteLine(
-                    quote=quote,
-                    line_number=idx + 1,
-                    drawing_number=str(item.get('drawing_number') or '').strip(),
-                    manufacturer=str(item.get('manufacturer') or '').strip(),
-                    mpn=str(item.get('mpn') or '').strip(),
-                    description=str(item.get('description') or '').strip(),
-                    uom=str(item.get('uom') or 'pcs'),
-                    moq=_safe_int(item.get('moq'), 1),
-                    supplier_lead_time=str(item.get('lead_time') or ''),
-                )
-                for i in range(1, 11):
-                    setattr(line, f'qty_{i}', str(item.get(f'qty_{i}') or ''))
-                    setattr(line, f'price_{i}', _safe_decimal(item.get(f'price_{i}')))
-                line.save()
-                lines_count += 1
+            lines_count = _write_lines(quote, [_planner_line_from_payload(item, idx + 1) for idx, item in enumerate(items_data)])
         return JsonResponse({'ok': True, 'quote_id': quote.id, 'quote_number': quote.quote_number, 'lines_count': lines_count, 'is_update': is_update})
     except Exception:
         logger.exception('Unexpected error')
@@ -4,6 +4,7 @@ import os
 import uuid
 from decimal import Decimal, InvalidOperation
 from django.db import transaction
+from django.db.models import Count, Prefetch
 from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from .api_common import (
@@ -15,8 +16,26 @@ from .api_common import (
     require_role as _require_role,
     require_same_origin_for_unsafe as _require_same_origin_for_unsafe,
 )
-from .models import Project, Quote, QuoteLine, SupplierAccess, SupplierAccessRound, SupplierInteractionFile
+from .change_events import publish_many
+from .file_delivery import serve_file as _serve_file
+from .file_store import store_upload
+from .item_index import matching_item_positions, supplier_item_positions
+from .item_matching import MatchIndex, drawing_no, find_supplier
+from .models import ChangeEvent, Project, Quote, QuoteLine, SupplierAccess, SupplierAccessRound, SupplierInteractionFile
+from .portal_render import merge_submitted_values
+from .quote_index import index_quotes, index_supplier_accesses
+from .round_snapshots import attach as attach_round_snapshots
 logger = logging.getLogger(__name__)
+# Tokens accepted by one /api/supplier_access/batch_approve call.
+_BATCH_APPROVE_MAX = 100
+# Page size bounds of the portal items endpoint.
+_PORTAL_ITEMS_DEFAULT_LIMIT = 200
+_PORTAL_ITEMS_MAX_LIMIT = 1000
+# Quote header fields a per-item draft patch may also carry.
+_DRAFT_HEADER_FIELDS = (
+    'notes', 'currency', 'incoterms', 'payment_terms', 'shipping', 'quote_number', 'quote_valid_until', 'packaging',
+)
+_DRAFT_CONTACT_LIMITS = (('supplier_contact_name', 255), ('supplier_contact_email', 255), ('supplier_contact_phone', 64))
 def _require_supplier_editor(actor):
     return _require_role(actor, 'editor')
 def _require_supplier_admin(actor):
@@ -121,41 +140,68 @@ def _validate_submission_prices(data):
     return errors
 
 
+def _item_has_supplier(it, sname_norm):
+    if not isinstance(it, dict):
+        return False
+    if _normalize_name(it.get('supplier') or '').lower() == sname_norm:
+        return True
+    sups = it.get('suppliers') or []
+    if isinstance(sups, list):
+        for s in sups:
+            if isinstance(s, dict) and _normalize_name(s.get('name') or s.get('supplier') or '').lower() == sname_norm:
+                return True
+    return False
+def _requested_item_entry(it):
+    entry = {
+        'id': it.get('id'),
+        'item_drawing_no': it.get('item_drawing_no') or it.get('drawing_no') or '',
+        'drawing_no': it.get('drawing_no') or it.get('item_drawing_no') or '',
+        'line': it.get('line') or '',
+        'description': it.get('description') or '',
+        'manufacturer': it.get('manufacturer') or '',
+        'mpn': it.get('mpn') or '',
+        'uom': it.get('uom') or 'pcs',
+        'target_price': it.get('target_price') or '',
+    }
+    for i in range(1, 11):
+        key = f'qty_{i}'
+        val = it.get(key)
+        if val is None and i == 1:
+            val = it.get('qty') or ''
+        entry[key] = val if val is not None else ''
+    return entry
 def _extract_items_for_supplier(project_data, supplier_name):
     items = (project_data or {}).get('items') or []
     sname_norm = _normalize_name(supplier_name).lower()
-    extracted = []
-    for it in items:
+    return [_requested_item_entry(it) for it in items if _item_has_supplier(it, sname_norm)]
+def _supplier_item_index(items):
+    """Normalized supplier name -> positions of the items it is assigned to (one pass, same rules as _item_has_supplier)."""
+    index = {}
+    for pos, it in enumerate(items):
         if not isinstance(it, dict):
             continue
-        is_assigned = _normalize_name(it.get('supplier') or '').lower() == sname_norm
-        is_in_list = False
+        names = {_normalize_name(it.get('supplier') or '').lower()}
         sups = it.get('suppliers') or []
         if isinstance(sups, list):
-            for s in sups:
-                if isinstance(s, dict) and _normalize_name(s.get('name') or s.get('supplier') or '').lower() == sname_norm:
-                    is_in_list = True
-                    break
-        if is_assigned or is_in_list:
-            entry = {
-                'id': it.get('id'),
-                'item_drawing_no': it.get('item_drawing_no') or it.get('drawing_no') or '',
-                'drawing_no': it.get('drawing_no') or it.get('item_drawing_no') or '',
-                'line': it.get('line') or '',
-                'description': it.get('description') or '',
-                'manufacturer': it.get('manufacturer') or '',
-                'mpn': it.get('mpn') or '',
-                'uom': it.get('uom') or 'pcs',
-                'target_price': it.get('target_price') or '',
-            }
-            for i in range(1, 11):
-                key = f'qty_{i}'
-                val = it.get(key)
-                if val is None and i == 1:
-                    val = it.get('qty') or ''
-                entry[key] = val if val is not None else ''
-            extracted.append(entry)
-    return extracted
+            names.update(
+                _normalize_name(s.get('name') or s.get('supplier') or '').lower() for s in sups if isinstance(s, dict)
+            )
+        names.discard('')
+        for name in names:
+            index.setdefault(name, []).append(pos)
+    return index
+def _extract_items_for_project_supplier(project, supplier_name):
+    """Like _extract_items_for_supplier, but only visits positions found via the item index."""
+    items = (project.data or {}).get('items') or []
+    sname_norm = _normalize_name(supplier_name).lower()
+    picked = []
+    for pos in supplier_item_positions(project, supplier_name):
+        it = items[pos] if pos < len(items) else None
+        if not _item_has_supplier(it, sname_norm):
+            # Index out of step with the blob; fall back to the full scan.
+            return _extract_items_for_supplier(project.data, supplier_name)
+        picked.append(_requested_item_entry(it))
+    return picked
 def supplier_access_generate(request):
     if request.method != 'POST':
         return HttpResponseNotAllowed(['POST'])
@@ -176,7 +222,7 @@ def supplier_access_generate(request):
         proj = _projects_qs_for_actor(actor).get(id=pid)
     except Project.DoesNotExist:
         return JsonResponse({'error': 'Project not found'}, status=404)
-    extracted = _extract_items_for_supplier(proj.data, sname)
+    extracted = _extract_items_for_project_supplier(proj, sname)
     vu = None
     vu_raw = payload.get('valid_until')
     if vu_raw:
@@ -246,6 +292,102 @@ def supplier_portal_save_draft(request, token):
         access.status = 'viewed'
     access.save()
     return JsonResponse({'ok': True, 'message': 'Draft saved'})
+def _portal_access_or_error(token, *, editable=False, for_update=False):
+    qs = SupplierAccess.objects.select_for_update() if for_update else SupplierAccess.objects
+    try:
+        access = qs.get(id=token)
+    except SupplierAccess.DoesNotExist:
+        return None, JsonResponse({'error': 'Invalid token'}, status=404)
+    if editable and access.status not in ['sent', 'viewed', 're_quote_requested']:
+        return None, JsonResponse({'error': 'This quote is closed or already submitted.'}, status=403)
+    if _is_token_expired(access) and access.status != 'expired':
+        access.status = 'expired'
+        access.save(update_fields=['status'])
+    if access.status == 'expired':
+        return None, JsonResponse({'error': 'This quote token has expired.'}, status=403)
+    return access, None
+def _portal_item_matches(item, needle):
+    for f in ('id', 'item_drawing_no', 'drawing_no', 'mpn', 'manufacturer', 'description'):
+        if needle in str(item.get(f) or '').lower():
+            return True
+    return False
+@csrf_exempt
+def supplier_portal_items(request, token):
+    """One page of requested items, pre-filled with the saved draft / submission."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    access, err = _portal_access_or_error(token)
+    if err:
+        return err
+    offset = max(0, _safe_int(request.GET.get('offset'), 0))
+    limit = min(max(1, _safe_int(request.GET.get('limit'), _PORTAL_ITEMS_DEFAULT_LIMIT)), _PORTAL_ITEMS_MAX_LIMIT)
+    section = (request.GET.get('section') or '').strip().lower()
+    needle = (request.GET.get('q') or '').strip().lower()
+    rows = [it for it in (access.requested_items or []) if isinstance(it, dict)]
+    if section == 'original':
+        rows = [it for it in rows if not it.get('added_at')]
+    elif section == 'updated':
+        rows = [it for it in rows if it.get('added_at')]
+    if needle:
+        rows = [it for it in rows if _portal_item_matches(it, needle)]
+    page = [dict(it) for it in rows[offset:offset + limit]]
+    merge_submitted_values(page, access.submission_data or {})
+    next_offset = offset + limit if offset + limit < len(rows) else None
+    return JsonResponse({
+        'items': page,
+        'total': len(rows),
+        'offset': offset,
+        'limit': limit,
+        'next_offset': next_offset,
+        'status': access.status,
+        'updated_at': access.updated_at.isoformat() if access.updated_at else None,
+    })
+@csrf_exempt
+def supplier_portal_patch_draft(request, token):
+    """Merge edited rows (and optionally header fields) into the saved draft."""
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    data = _json_body(request)
+    if not isinstance(data, dict) or not isinstance(data.get('items', []), list):
+        return JsonResponse({'error': 'Invalid payload'}, status=400)
+    price_errors = _validate_submission_prices(data)
+    if price_errors:
+        return JsonResponse({'error': 'Invalid submitted prices', 'details': price_errors}, status=400)
+    with transaction.atomic():
+        access, err = _portal_access_or_error(token, editable=True, for_update=True)
+        if err:
+            return err
+        requested = MatchIndex(access.requested_items or [])
+        draft = dict(access.submission_data or {})
+        saved_items = [it for it in (draft.get('items') or []) if isinstance(it, dict)]
+        saved = MatchIndex(saved_items, last_wins=True)
+        patched, unmatched = 0, []
+        for row in data.get('items') or []:
+            if not isinstance(row, dict):
+                continue
+            keys = (row.get('id'), drawing_no(row), row.get('mpn'))
+            if requested.lookup(*keys) is None:
+                unmatched.append({'id': row.get('id'), 'item_drawing_no': drawing_no(row), 'mpn': row.get('mpn')})
+                continue
+            current = saved.lookup(*keys)
+            if current is None:
+                current = {}
+                saved_items.append(current)
+            current.update(row)
+            patched += 1
+        for field in _DRAFT_HEADER_FIELDS:
+            if field in data:
+                draft[field] = data[field]
+        for field, max_len in _DRAFT_CONTACT_LIMITS:
+            if field in data:
+                draft[field] = str(data.get(field) or '').strip()[:max_len]
+        draft['items'] = saved_items
+        draft['is_draft'] = True
+        access.submission_data = draft
+        if access.status == 'sent':
+            access.status = 'viewed'
+        access.save()
+    return JsonResponse({'ok': True, 'message': 'Draft saved', 'patched': patched, 'unmatched': unmatched})
 @csrf_exempt
 def supplier_portal_submit(request, token):
     try:
@@ -294,53 +436,30 @@ def supplier_portal_submit(request, token):
         access.submitted_at = now
         access.replied_at = now
         access.save()
-        SupplierAccessRound.objects.create(
+        round_rec = SupplierAccessRound(
             company=access.company,
             supplier_access=access,
             round=access.round,
-            requested_items=access.requested_items,
-            submission_data=data,
             submitted_at=now,
             buyer_decision=None,
         )
+        attach_round_snapshots([round_rec], [(access.requested_items, data)])
+        round_rec.save()
         for f in files:
             SupplierInteractionFile.objects.create(
                 company=access.company,
                 supplier_access=access,
                 round=access.round,
-                file=f,
+                blob=store_upload(f),
                 original_name=f.name,
                 size=f.size,
                 uploaded_by='supplier',
             )
     return JsonResponse({'ok': True})
-def supplier_access_approve(request, token):
-    if request.method != 'POST':
-        return HttpResponseNotAllowed(['POST'])
-    actor, auth_err = _require_auth_and_profile(request)
-    if auth_err:
-        return auth_err
-    csrf_err = _require_same_origin_for_unsafe(request)
-    if csrf_err:
-        return csrf_err
-    if not _require_supplier_admin(actor):
-        return JsonResponse({'error': 'Admin permission required'}, status=403)
-    try:
-        access = _supplier_access_qs_for_actor(actor).get(id=token)
-    except SupplierAccess.DoesNotExist:
-        return JsonResponse({'error': 'Invalid token'}, status=404)
-    from django.utils import timezone
-    now = timezone.now()
-    user = _get_buyer_username(request)
+def _approval_context(access):
+    """Submission fields and match index for one approval (built before any row lock)."""
     submission = access.submission_data or {}
     sub_items = submission.get('items') or []
-    quote_currency = str(submission.get('currency') or 'EUR')
-    quote_shipping = str(submission.get('shipping') or '')
-    quote_incoterms = str(submission.get('incoterms') or '')
-    quote_payment_terms = str(submission.get('payment_terms') or '')
-    quote_number = str(submission.get('quote_number') or '')
-    quote_valid_until = str(submission.get('quote_valid_until') or '')
-    quote_packaging = str(submission.get('packaging') or '')
     sub_map = {}
     sub_no_id = []
     for si in sub_items:
@@ -352,269 +471,402 @@ def supplier_access_approve(request, token):
         else:
             sub_no_id.append(si)
     all_candidates = list(sub_map.values()) + sub_no_id
+    return {
+        'submission': submission,
+        'sub_items': sub_items,
+        'sub_map': sub_map,
+        'all_candidates': all_candidates,
+        'sub_index': MatchIndex(all_candidates),
+        'currency': str(submission.get('currency') or 'EUR'),
+        'shipping': str(submission.get('shipping') or ''),
+        'incoterms': str(submission.get('incoterms') or ''),
+        'payment_terms': str(submission.get('payment_terms') or ''),
+        'quote_number': str(submission.get('quote_number') or ''),
+        'quote_valid_until': str(submission.get('quote_valid_until') or ''),
+        'packaging': str(submission.get('packaging') or ''),
+    }
+def _apply_approval(proj, items, access, ctx, now, user):
+    """Write one submission's prices into ``items`` (mutated in place).
+
+    Returns ``(updates_count, unmatched_items, updated_item_keys)``.
+    """
+    sub_map, all_candidates, sub_index = ctx['sub_map'], ctx['all_candidates'], ctx['sub_index']
+    quote_currency = ctx['currency']
+    quote_shipping = ctx['shipping']
+    quote_incoterms = ctx['incoterms']
+    quote_payment_terms = ctx['payment_terms']
+    quote_number = ctx['quote_number']
+    quote_valid_until = ctx['quote_valid_until']
+    quote_packaging = ctx['packaging']
     updates_count = 0
     unmatched_items = []
-    sup_name_norm = _normalize_name(access.supplier_name).lower()
     updated_item_keys = set()
-    with transaction.atomic():
-        proj = _projects_qs_for_actor(actor).select_for_update().get(id=access.project_id)
-        pdata = proj.data or {}
-        items = pdata.get('items') or []
-        for it in items:
-            it_id = _normalize_item_id(it.get('id'))
-            sub_entry = sub_map.get(it_id) if it_id else None
-            if not sub_entry:
-                p_dn = _normalize_name(it.get('item_drawing_no') or it.get('drawing_no') or '').lower()
-                p_mpn = _normalize_name(it.get('mpn') or '').lower()
-                for cand in all_candidates:
-                    c_dn = _normalize_name(cand.get('item_drawing_no') or cand.get('drawing_no') or '').lower()
-                    c_mpn = _normalize_name(cand.get('mpn') or '').lower()
-                    if p_dn and c_dn and c_dn == p_dn:
-                        sub_entry = cand
-                        break
-                    if p_mpn and c_mpn and c_mpn == p_mpn:
-                        sub_entry = cand
-                        break
-            if not sub_entry:
-                unmatched_items.append({
-                    'id': it.get('id'),
-                    'item_drawing_no': it.get('item_drawing_no') or it.get('drawing_no') or '',
-                    'mpn': it.get('mpn') or '',
-                    'reason': 'no_matching_submission_item',
-                })
-                continue
-            price_decimal = _validate_price_decimal(sub_entry.get('price') or sub_entry.get('price_1'))
-            if price_decimal is None:
-                unmatched_items.append({
-                    'id': it.get('id'),
-                    'item_drawing_no': it.get('item_drawing_no') or it.get('drawing_no') or '',
-                    'mpn': it.get('mpn') or '',
-                    'reason': 'invalid_price',
-                })
-                continue
-            new_price = float(price_decimal)
-            new_moq = sub_entry.get('moq') or ''
-            new_lead = sub_entry.get('lead_time') or ''
-            new_comment = sub_entry.get('notes') or sub_entry.get('comment') or ''
-            sups = it.get('suppliers') or []
-            if not isinstance(sups, list):
-                sups = []
-            sup_fields = {
-                'price': new_price,
-                'price_1': new_price,
-                'moq': new_moq,
-                'lead_time': new_lead,
-                'currency': quote_currency,
-                'shipping': quote_shipping,
-                'incoterms': quote_incoterms,
-                'payment_terms': quote_payment_terms,
-                'quote_number': quote_number,
-                'quote_valid_until': quote_valid_until,
-                'packaging': quote_packaging,
-                'status': 'Quoted',
-                'quote_status': 'Quoted',
-                'rfq_sent_date': access.created_at.strftime('%Y-%m-%d'),
-                'quote_received_date': (access.submitted_at or now).strftime('%Y-%m-%d'),
-                'source': 'supplier_interaction',
-                'interaction_id': access.id,
-                'round': access.round,
-                'note': new_comment,
-            }
-            for tier_i in range(2, 11):
-                tk = f'price_{tier_i}'
-                raw_tier = sub_entry.get(tk)
-                if str(raw_tier or '').strip():
-                    tier_price = _validate_price_decimal(raw_tier)
-                    if tier_price is not None:
-                        sup_fields[tk] = float(tier_price)
-            prices_arr = []
-            for tier_idx in range(1, 11):
-                qty_val = it.get(f'qty_{tier_idx}')
-                if (qty_val is None or not str(qty_val).strip()) and tier_idx == 1:
-                    qty_val = it.get('qty') or sub_entry.get(f'qty_{tier_idx}') or sub_entry.get('qty') or ''
-                if (qty_val is None or not str(qty_val).strip()) and tier_idx > 1:
-                    qty_val = sub_entry.get(f'qty_{tier_idx}') or ''
-                if qty_val is not None and str(qty_val).strip():
-                    price_key = f'price_{tier_idx}' if tier_idx > 1 else 'price'
-                    tier_price = sup_fields.get(f'price_{tier_idx}') or sup_fields.get(price_key, '')
-                    prices_arr.append({'qty': qty_val, 'price': tier_price if tier_price else '', 'index': tier_idx})
-            if prices_arr:
-                sup_fields['prices'] = prices_arr
-            found = False
-            for s in sups:
-                if isinstance(s, dict):
-                    sname = s.get('supplier_name') or s.get('name') or s.get('supplier') or ''
-                    if _normalize_name(sname).lower() == sup_name_norm:
-                        s.update(sup_fields)
-                        found = True
-                        break
-            if not found:
-                sup_fields['name'] = access.supplier_name
-                sup_fields['supplier_name'] = access.supplier_name
-                # Do not auto-decide main supplier during Supplier Interaction approval.
-                sup_fields['isMain'] = False
-                sups.append(sup_fields)
-            it['suppliers'] = sups
-            it['price_source'] = 'supplier_interaction'
-            it['last_interaction_id'] = access.id
-            it['last_approved_by'] = user
-            it['last_approved_at'] = now.isoformat()
-            it['quote_round'] = access.round
-            # IMPORTANT: do not auto-overwrite top-level winner fields on item
-            # (supplier/price_1/main tier values). Winner selection belongs to
-            # Price Comparison step, not Supplier Interaction approval.
-            if str(it.get('status') or '') not in ('Done', 'Closed'):
-                it['status'] = 'Quoted'
-            updates_count += 1
-            k = _item_match_key(it)
-            if k:
-                updated_item_keys.add(k)
-        proj.data = pdata
-        proj.save()
-        access.status = 'approved'
-        access.approved_at = now
-        access.approved_by = user
-        access.save()
-        round_rec = SupplierAccessRound.objects.filter(supplier_access=access, round=access.round).first()
-        if not round_rec:
-            round_rec = SupplierAccessRound.objects.create(
-                company=access.company,
-                supplier_access=access,
-                round=access.round,
-                requested_items=access.requested_items,
-                submission_data=access.submission_data,
-                submitted_at=access.submitted_at,
+    # Only items sharing an id, drawing number or MPN with the submission can
+    # match; the item index narrows those down without walking every item.
+    candidate_positions = set(matching_item_positions(
+        proj,
+        item_ids=sub_map.keys(),
+        drawing_nos=[c.get('item_drawing_no') or c.get('drawing_no') for c in all_candidates],
+        mpns=[c.get('mpn') for c in all_candidates],
+    ))
+    for pos, it in enumerate(items):
+        if pos not in candidate_positions:
+            unmatched_items.append({
+                'id': it.get('id'),
+                'item_drawing_no': it.get('item_drawing_no') or it.get('drawing_no') or '',
+                'mpn': it.get('mpn') or '',
+                'reason': 'no_matching_submission_item',
+            })
+            continue
+        sub_entry = sub_index.by_id(it.get('id')) or sub_index.by_drawing_or_mpn(drawing_no(it), it.get('mpn'))
+        if not sub_entry:
+            unmatched_items.append({
+                'id': it.get('id'),
+                'item_drawing_no': it.get('item_drawing_no') or it.get('drawing_no') or '',
+                'mpn': it.get('mpn') or '',
+                'reason': 'no_matching_submission_item',
+            })
+            continue
+        price_decimal = _validate_price_decimal(sub_entry.get('price') or sub_entry.get('price_1'))
+        if price_decimal is None:
+            unmatched_items.append({
+                'id': it.get('id'),
+                'item_drawing_no': it.get('item_drawing_no') or it.get('drawing_no') or '',
+                'mpn': it.get('mpn') or '',
+                'reason': 'invalid_price',
+            })
+            continue
+        new_price = float(price_decimal)
+        new_moq = sub_entry.get('moq') or ''
+        new_lead = sub_entry.get('lead_time') or ''
+        new_comment = sub_entry.get('notes') or sub_entry.get('comment') or ''
+        sups = it.get('suppliers') or []
+        if not isinstance(sups, list):
+            sups = []
+        sup_fields = {
+            'price': new_price,
+            'price_1': new_price,
+            'moq': new_moq,
+            'lead_time': new_lead,
+            'currency': quote_currency,
+            'shipping': quote_shipping,
+            'incoterms': quote_incoterms,
+            'payment_terms': quote_payment_terms,
+            'quote_number': quote_number,
+            'quote_valid_until': quote_valid_until,
+            'packaging': quote_packaging,
+            'status': 'Quoted',
+            'quote_status': 'Quoted',
+            'rfq_sent_date': access.created_at.strftime('%Y-%m-%d'),
+            'quote_received_date': (access.submitted_at or now).strftime('%Y-%m-%d'),
+            'source': 'supplier_interaction',
+            'interaction_id': access.id,
+            'round': access.round,
+            'note': new_comment,
+        }
+        for tier_i in range(2, 11):
+            tk = f'price_{tier_i}'
+            raw_tier = sub_entry.get(tk)
+            if str(raw_tier or '').strip():
+                tier_price = _validate_price_decimal(raw_tier)
+                if tier_price is not None:
+                    sup_fields[tk] = float(tier_price)
+        prices_arr = []
+        for tier_idx in range(1, 11):
+            qty_val = it.get(f'qty_{tier_idx}')
+            if (qty_val is None or not str(qty_val).strip()) and tier_idx == 1:
+                qty_val = it.get('qty') or sub_entry.get(f'qty_{tier_idx}') or sub_entry.get('qty') or ''
+            if (qty_val is None or not str(qty_val).strip()) and tier_idx > 1:
+                qty_val = sub_entry.get(f'qty_{tier_idx}') or ''
+            if qty_val is not None and str(qty_val).strip():
+                price_key = f'price_{tier_idx}' if tier_idx > 1 else 'price'
+                tier_price = sup_fields.get(f'price_{tier_idx}') or sup_fields.get(price_key, '')
+                prices_arr.append({'qty': qty_val, 'price': tier_price if tier_price else '', 'index': tier_idx})
+        if prices_arr:
+            sup_fields['prices'] = prices_arr
+        existing_sup = find_supplier(sups, access.supplier_name)
+        if existing_sup is not None:
+            existing_sup.update(sup_fields)
+        else:
+            sup_fields['name'] = access.supplier_name
+            sup_fields['supplier_name'] = access.supplier_name
+            # Do not auto-decide main supplier during Supplier Interaction approval.
+            sup_fields['isMain'] = False
+            sups.append(sup_fields)
+        it['suppliers'] = sups
+        it['price_source'] = 'supplier_interaction'
+        it['last_interaction_id'] = access.id
+        it['last_approved_by'] = user
+        it['last_approved_at'] = now.isoformat()
+        it['quote_round'] = access.round
+        # IMPORTANT: do not auto-overwrite top-level winner fields on item
+        # (supplier/price_1/main tier values). Winner selection belongs to
+        # Price Comparison step, not Supplier Interaction approval.
+        if str(it.get('status') or '') not in ('Done', 'Closed'):
+            it['status'] = 'Quoted'
+        updates_count += 1
+        k = _item_match_key(it)
+        if k:
+            updated_item_keys.add(k)
+    return updates_count, unmatched_items, updated_item_keys
+def _approval_quote_lines(access, ctx):
+    req_index = MatchIndex(access.requested_items or [], last_wins=True)
+    quote_lines = []
+    for si in ctx['sub_items']:
+        if not isinstance(si, dict) or si.get('no_bid'):
+            continue
+        price_decimal = _validate_price_decimal(si.get('price') or si.get('price_1'))
+        if price_decimal is None:
+            continue
+        ri = req_index.lookup(si.get('id'), drawing_no(si), si.get('mpn')) or {}
+        ql = QuoteLine(
+            line_number=len(quote_lines) + 1,
+            drawing_number=ri.get('item_drawing_no') or ri.get('drawing_no') or si.get('item_drawing_no') or '',
+            manufacturer=ri.get('manufacturer') or si.get('manufacturer') or '',
+            mpn=ri.get('mpn') or si.get('mpn') or '',
+            description=ri.get('description') or si.get('description') or '',
+            uom=ri.get('uom') or si.get('uom') or 'pcs',
+            moq=_safe_int(si.get('moq'), 1),
+            supplier_lead_time=str(si.get('lead_time') or ''),
+            notes=str(si.get('notes') or si.get('comment') or ''),
+        )
+        ql.price_1 = price_decimal
+        for i in range(1, 11):
+            qty_val = ri.get(f'qty_{i}') or (ri.get('qty') if i == 1 else '')
+            setattr(ql, f'qty_{i}', str(qty_val or ''))
+        for i in range(2, 11):
+            raw_t = si.get(f'price_{i}')
+            if str(raw_t or '').strip():
+                t_decimal = _validate_price_decimal(raw_t)
+                if t_decimal is not None:
+                    setattr(ql, f'price_{i}', t_decimal)
+        quote_lines.append(ql)
+    return quote_lines
+def _approval_expire_date(ctx, now):
+    from datetime import date as dt_date, timedelta
+    if ctx['quote_valid_until']:
+        try:
+            return dt_date.fromisoformat(ctx['quote_valid_until'])
+        except (ValueError, TypeError):
+            pass
+    return None if now is None else (now + timedelta(days=90)).date()
+def _approval_quotes(actor, proj, approvals, now, user):
+    """Create or refresh the portal ``Quote`` of every approval in a few queries.
+
+    ``approvals`` is a list of ``(access, ctx)``; returns quotes in the same order.
+    """
+    numbers = [
+        ctx['quote_number'] or f"{_normalize_name(access.supplier_name)[:15]}_{now.strftime('%Y%m%d_%H%M')}"
+        for access, ctx in approvals
+    ]
+    qs = _quotes_qs_for_actor(actor)
+    existing = {q.quote_number: q for q in qs.filter(project=proj, quote_number__in=numbers)}
+    taken = set(qs.filter(quote_number__in=numbers).values_list('quote_number', flat=True))
+    quotes, created, refreshed = [], [], []
+    for (access, ctx), q_num in zip(approvals, numbers):
+        quote_obj = existing.pop(q_num, None)
+        if quote_obj is not None:
+            quote_obj.supplier_name = access.supplier_name
+            quote_obj.currency = ctx['currency']
+            quote_obj.incoterm = ctx['incoterms']
+            quote_obj.payment_terms = ctx['payment_terms']
+            quote_obj.packaging = ctx['packaging']
+            if ctx['shipping']:
+                quote_obj.shipping_cost = _safe_decimal(ctx['shipping']) or Decimal('0')
+            expire_date = _approval_expire_date(ctx, None)
+            if expire_date:
+                quote_obj.expire_date = expire_date
+            refreshed.append(quote_obj)
+        else:
+            if q_num in taken:
+                import random
+                q_num += f"_{random.randint(100, 999)}"
+            quote_obj = Quote(
+                id=uuid.uuid4().hex,
+                company=proj.company,
+                project=proj,
+                project_name=proj.name,
+                supplier_name=access.supplier_name,
+                quote_number=q_num,
+                source='supplier_portal',
+                source_id=access.id,
+                created_by=user,
+                expire_date=_approval_expire_date(ctx, now),
+                currency=ctx['currency'],
+                incoterm=ctx['incoterms'],
+                payment_terms=ctx['payment_terms'],
+                packaging=ctx['packaging'],
+                shipping_cost=_safe_decimal(ctx['shipping']) or Decimal('0'),
+                received_from=ctx['submission'].get('supplier_contact_name') or access.contact_name or '',
+                notes=str(ctx['submission'].get('notes') or ''),
             )
+            created.append(quote_obj)
+        # Two approvals quoting the same number in one batch get distinct quotes.
+        taken.add(quote_obj.quote_number)
+        quotes.append(quote_obj)
+    for quote_obj in refreshed:
+        quote_obj.save()
+    if refreshed:
+        QuoteLine.objects.filter(quote__in=refreshed).delete()
+    if created:
+        Quote.objects.bulk_create(created)
+        index_quotes(created)
+    lines = []
+    for (access, ctx), quote_obj in zip(approvals, quotes):
+        for line in _approval_quote_lines(access, ctx):
+            line.quote = quote_obj
+            lines.append(line)
+    QuoteLine.objects.bulk_create(lines, batch_size=500)
+    return quotes
+def _record_approval_rounds(accesses, now, user):
+    existing = {
+        (r.supplier_access_id, r.round): r
+        for r in SupplierAccessRound.objects.filter(supplier_access__in=accesses)
+    }
+    unrecorded = [access for access in accesses if (access.id, access.round) not in existing]
+    missing = [
+        SupplierAccessRound(
+            company=access.company,
+            supplier_access=access,
+            round=access.round,
+            submitted_at=access.submitted_at,
+            buyer_decision='approved',
+            decision_by=user,
+            decision_at=now,
+        )
+        for access in unrecorded
+    ]
+    attach_round_snapshots(missing, [(access.requested_items, access.submission_data) for access in unrecorded])
+    current = [existing[(a.id, a.round)] for a in accesses if (a.id, a.round) in existing]
+    for round_rec in current:
         round_rec.buyer_decision = 'approved'
         round_rec.decision_by = user
         round_rec.decision_at = now
-        round_rec.save()
-        from datetime import timedelta
-        try:
-            q_num = quote_number or f"{_normalize_name(access.supplier_name)[:15]}_{now.strftime('%Y%m%d_%H%M')}"
-            existing_quote = _quotes_qs_for_actor(actor).filter(quote_number=q_num, project=proj).first()
-            if existing_quote:
-                existing_quote.supplier_name = access.supplier_name
-                existing_quote.currency = quote_currency
-                existing_quote.incoterm = quote_incoterms
-                existing_quote.payment_terms = quote_payment_terms
-                existing_quote.packaging = quote_packaging
-                if quote_shipping:
-                    existing_quote.shipping_cost = _safe_decimal(quote_shipping) or Decimal('0')
-                if quote_valid_until:
-                    try:
-                        from datetime import date as dt_date
-                        existing_quote.expire_date = dt_date.fromisoformat(quote_valid_until)
-                    except (ValueError, TypeError):
-                        pass
-                existing_quote.save()
-                existing_quote.lines.all().delete()
-                quote_obj = existing_quote
-            else:
-                expire_date = (now + timedelta(days=90)).date()
-                if quote_valid_until:
-                    try:
-                        from datetime import date as dt_date
-                        expire_date = dt_date.fromisoformat(quote_valid_until)
-                    except (ValueError, TypeError):
-                        pass
-                if _quotes_qs_for_actor(actor).filter(quote_number=q_num).exists():
-                    import random
-                    q_num += f"_{random.randint(100, 999)}"
-                quote_obj = Quote.objects.create(
-                    id=uuid.uuid4().hex,
-                    company=proj.company,
-                    project=proj,
-                    project_name=proj.name,
-                    supplier_name=access.supplier_name,
-                    quote_number=q_num,
-                    source='supplier_portal',
-                    source_id=access.id,
-                    created_by=user,
-                    expire_date=expire_date,
-                    currency=quote_currency,
-                    incoterm=quote_incoterms,
-                    payment_terms=quote_payment_terms,
-                    packaging=quote_packaging,
-                    shipping_cost=_safe_decimal(quote_shipping) or Decimal('0'),
-                    received_from=submission.get('supplier_contact_name') or access.contact_name or '',
-                    notes=str(submission.get('notes') or ''),
-                )
-            req_items = access.requested_items or []
-            req_by_id = {}
-            req_by_dn = {}
-            req_by_mpn = {}
-            for ri in req_items:
-                if not isinstance(ri, dict):
-                    continue
-                rid = _normalize_item_id(ri.get('id'))
-                if rid:
-                    req_by_id[rid] = ri
-                rdn = _normalize_name(ri.get('item_drawing_no') or ri.get('drawing_no') or '').lower()
-                if rdn:
-                    req_by_dn[rdn] = ri
-                rmpn = _normalize_name(ri.get('mpn') or '').lower()
-                if rmpn:
-                    req_by_mpn[rmpn] = ri
-            line_num = 0
-            for si in sub_items:
-                if not isinstance(si, dict) or si.get('no_bid'):
-                    continue
-                price_decimal = _validate_price_decimal(si.get('price') or si.get('price_1'))
-                if price_decimal is None:
-                    continue
-                line_num += 1
-                sid = _normalize_item_id(si.get('id'))
-                sdn = _normalize_name(si.get('item_drawing_no') or si.get('drawing_no') or '').lower()
-                smpn = _normalize_name(si.get('mpn') or '').lower()
-                ri = req_by_id.get(sid)
-                if not ri and sdn:
-                    ri = req_by_dn.get(sdn)
-                if not ri and smpn:
-                    ri = req_by_mpn.get(smpn)
-                ri = ri or {}
-                ql = QuoteLine(
-                    quote=quote_obj,
-                    line_number=line_num,
-                    drawing_number=ri.get('item_drawing_no') or ri.get('drawing_no') or si.get('item_drawing_no') or '',
-                    manufacturer=ri.get('manufacturer') or si.get('manufacturer') or '',
-                    mpn=ri.get('mpn') or si.get('mpn') or '',
-                    description=ri.get('description') or si.get('description') or '',
-                    uom=ri.get('uom') or si.get('uom') or 'pcs',
-                    moq=_safe_int(si.get('moq'), 1),
-                    supplier_lead_time=str(si.get('lead_time') or ''),
-                    notes=str(si.get('notes') or si.get('comment') or ''),
-                )
-                ql.price_1 = price_decimal
-                for i in range(1, 11):
-                    qty_val = ri.get(f'qty_{i}') or (ri.get('qty') if i == 1 else '')
-                    setattr(ql, f'qty_{i}', str(qty_val or ''))
-                for i in range(2, 11):
-                    raw_t = si.get(f'price_{i}')
-                    if str(raw_t or '').strip():
-                        t_decimal = _validate_price_decimal(raw_t)
-                        if t_decimal is not None:
-                            setattr(ql, f'price_{i}', t_decimal)
-                ql.save()
+    if missing:
+        SupplierAccessRound.objects.bulk_create(missing)
+    if current:
+        SupplierAccessRound.objects.bulk_update(current, ['buyer_decision', 'decision_by', 'decision_at'])
+def _approve_into_project(actor, proj, accesses, now, user):
+    """Apply every access's submission to ``proj`` (row already locked) and save the blob once.
+
+    Returns one result dict per access, in order.
+    """
+    pdata = proj.data or {}
+    items = pdata.get('items') or []
+    approvals = [(access, _approval_context(access)) for access in accesses]
+    results = []
+    for access, ctx in approvals:
+        updates_count, unmatched_items, updated_item_keys = _apply_approval(proj, items, access, ctx, now, user)
+        results.append({
+            'token': access.id,
+            'ok': True,
+            'updated_items': updates_count,
+            'unmatched_items': unmatched_items,
+            'quote_number': None,
+            '_keys': updated_item_keys,
+        })
+    for access in accesses:
+        access.status = 'approved'
+        access.approved_at = now
+        access.approved_by = user
+        # Saved one by one so the signals keep QuoteIndex and the change feed in step.
+        access.save()
+    _record_approval_rounds(accesses, now, user)
+    try:
+        with transaction.atomic():
+            quotes = _approval_quotes(actor, proj, approvals, now, user)
+    except Exception:
+        logger.exception('Unexpected error')
+    else:
+        for (access, _ctx), quote_obj, result in zip(approvals, quotes, results):
+            result['quote_number'] = quote_obj.quote_number
+            updated_item_keys = result['_keys']
             for it in items:
                 if updated_item_keys:
                     k = _item_match_key(it)
                     if not k or k not in updated_item_keys:
                         continue
-                sups = it.get('suppliers') or []
-                for s in sups:
-                    sname = s.get('supplier_name') or s.get('name') or ''
-                    if _normalize_name(sname).lower() == sup_name_norm:
-                        s['quote_id'] = quote_obj.id
-                        s['quote_number'] = quote_obj.quote_number
-                        break
-            proj.data = pdata
-            proj.save()
+                sup = find_supplier(it.get('suppliers') or [], access.supplier_name)
+                if sup is not None:
+                    sup['quote_id'] = quote_obj.id
+                    sup['quote_number'] = quote_obj.quote_number
+    proj.data = pdata
+    proj.save()
+    for result in results:
+        result.pop('_keys')
+    return results
+def supplier_access_approve(request, token):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    actor, auth_err = _require_auth_and_profile(request)
+    if auth_err:
+        return auth_err
+    csrf_err = _require_same_origin_for_unsafe(request)
+    if csrf_err:
+        return csrf_err
+    if not _require_supplier_admin(actor):
+        return JsonResponse({'error': 'Admin permission required'}, status=403)
+    try:
+        access = _supplier_access_qs_for_actor(actor).get(id=token)
+    except SupplierAccess.DoesNotExist:
+        return JsonResponse({'error': 'Invalid token'}, status=404)
+    from django.utils import timezone
+    now = timezone.now()
+    user = _get_buyer_username(request)
+    with transaction.atomic():
+        proj = _projects_qs_for_actor(actor).select_for_update().get(id=access.project_id)
+        result = _approve_into_project(actor, proj, [access], now, user)[0]
+    logger.info('Approved %d/%d items for %s (unmatched: %d)', result['updated_items'], len((proj.data or {}).get('items') or []), access.supplier_name, len(result['unmatched_items']))
+    _audit_log(request, actor, action='supplier.approve', entity_type='supplier_access', entity_id=access.id, project=proj, metadata={'updated_items': result['updated_items'], 'unmatched_items': len(result['unmatched_items']), 'status': access.status})
+    return JsonResponse({'ok': True, 'updated_items': result['updated_items'], 'unmatched_items': result['unmatched_items'], 'quote_number': result['quote_number']})
+def supplier_access_batch_approve(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    actor, auth_err = _require_auth_and_profile(request)
+    if auth_err:
+        return auth_err
+    csrf_err = _require_same_origin_for_unsafe(request)
+    if csrf_err:
+        return csrf_err
+    if not _require_supplier_admin(actor):
+        return JsonResponse({'error': 'Admin permission required'}, status=403)
+    payload = _json_body(request)
+    tokens = payload.get('tokens') if isinstance(payload, dict) else None
+    if not isinstance(tokens, list) or not tokens:
+        return JsonResponse({'error': 'Expected {tokens:[...]}'}, status=400)
+    tokens = list(dict.fromkeys(str(t) for t in tokens))
+    if len(tokens) > _BATCH_APPROVE_MAX:
+        return JsonResponse({'error': f'At most {_BATCH_APPROVE_MAX} tokens per batch'}, status=400)
+    from django.utils import timezone
+    now = timezone.now()
+    user = _get_buyer_username(request)
+    found = {a.id: a for a in _supplier_access_qs_for_actor(actor).filter(id__in=tokens)}
+    by_project = {}
+    for token in tokens:
+        if token in found:
+            by_project.setdefault(found[token].project_id, []).append(found[token])
+    results = {token: {'token': token, 'ok': False, 'error': 'Invalid token'} for token in tokens if token not in found}
+    # Projects are locked in id order so concurrent batches cannot deadlock.
+    for project_id in sorted(by_project):
+        accesses = by_project[project_id]
+        # One failing project rolls back only its own approvals; the rest of the batch still applies.
+        try:
+            with transaction.atomic():
+                proj = _projects_qs_for_actor(actor).select_for_update().get(id=project_id)
+                project_results = _approve_into_project(actor, proj, accesses, now, user)
         except Exception:
-            logger.exception('Unexpected error')
-    logger.info('Approved %d/%d items for %s (unmatched: %d)', updates_count, len(items), access.supplier_name, len(unmatched_items))
-    _audit_log(request, actor, action='supplier.approve', entity_type='supplier_access', entity_id=access.id, project=proj, metadata={'updated_items': updates_count, 'unmatched_items': len(unmatched_items), 'status': access.status})
-    return JsonResponse({'ok': True, 'updated_items': updates_count, 'unmatched_items': unmatched_items, 'quote_number': quote_obj.quote_number if 'quote_obj' in dir() else None})
+            logger.exception('Batch approval failed for project %s', project_id)
+            for access in accesses:
+                results[access.id] = {'token': access.id, 'ok': False, 'error': 'Approval failed'}
+            continue
+        for result in project_results:
+            results[result['token']] = result
+        for access in accesses:
+            result = results[access.id]
+            _audit_log(request, actor, action='supplier.approve', entity_type='supplier_access', entity_id=access.id, project=proj, metadata={'updated_items': result['updated_items'], 'unmatched_items': len(result['unmatched_items']), 'status': access.status, 'batch': True})
+    ordered = [results[token] for token in tokens]
+    logger.info('Batch-approved %d/%d supplier accesses across %d project(s)', sum(1 for r in ordered if r['ok']), len(tokens), len(by_project))
+    return JsonResponse({'ok': True, 'results': ordered})
 def supplier_access_reject(request, token):
     if request.method != 'POST':
         return HttpResponseNotAllowed(['POST'])
@@ -641,14 +893,13 @@ def supplier_access_reject(request, token):
     with transaction.atomic():
         round_rec = SupplierAccessRound.objects.filter(supplier_access=access, round=access.round).first()
         if not round_rec:
-            round_rec = SupplierAccessRound.objects.create(
+            round_rec = SupplierAccessRound(
                 company=access.company,
                 supplier_access=access,
                 round=access.round,
-                requested_items=access.requested_items,
-                submission_data=access.submission_data,
                 submitted_at=access.submitted_at,
             )
+            attach_round_snapshots([round_rec], [(access.requested_items, access.submission_data)])
         round_rec.decision_by = user
         round_rec.decision_at = now
         round_rec.decision_reason = reason
@@ -662,7 +913,7 @@ def supplier_access_reject(request, token):
             access.approved_at = None
             access.approved_by = None
             try:
-                refreshed = _extract_items_for_supplier(access.project.data, access.supplier_name)
+                refreshed = _extract_items_for_project_supplier(access.project, access.supplier_name)
                 if refreshed:
                     access.requested_items = refreshed
             except (AttributeError, TypeError, ValueError):
@@ -682,7 +933,30 @@ def supplier_access_reject(request, token):
         access.save()
     _audit_log(request, actor, action='supplier.decision', entity_type='supplier_access', entity_id=access.id, project=access.project, metadata={'new_status': access.status, 'round': access.round})
     return JsonResponse({'ok': True, 'new_status': access.status, 'round': access.round})
+_ACCESS_SUMMARY_KEYS = (
+    'id', 'project_id', 'supplier_name', 'status', 'round', 'created_at', 'viewed_at', 'submitted_at',
+    'approved_at', 'valid_until', 'items_count', 'rejection_reason', 'is_complete', 'reopen_requested',
+)
+def _round_history_row(r):
+    return {
+        'round': r.round,
+        'submission_data': r.get_submission_data(),
+        'submitted_at': r.submitted_at.isoformat() if r.submitted_at else None,
+        'buyer_decision': r.buyer_decision or '',
+        'decision_reason': r.decision_reason or '',
+        'decision_by': r.decision_by or '',
+        'decision_at': r.decision_at.isoformat() if r.decision_at else None,
+    }
+def _flag_param(request, name, default):
+    raw = str(request.GET.get(name) or '').strip().lower()
+    if not raw:
+        return default
+    return raw in ('1', 'true', 'yes')
 def project_supplier_access_list(request, project_id):
+    """List supplier accesses of a project.
+    Query: fields=full|summary (summary drops requested_items/submission_data, adds files_count/rounds_count),
+    include_history=1|0 (default on for full, off for summary), ids=comma-separated access ids.
+    """
     if request.method != 'GET':
         return HttpResponseNotAllowed(['GET'])
     actor, auth_err = _require_auth_and_profile(request)
@@ -692,33 +966,45 @@ def project_supplier_access_list(request, project_id):
     if csrf_err:
         return csrf_err
     pid = str(project_id)
-    qs = _supplier_access_qs_for_actor(actor).filter(project_id=pid).order_by('-created_at')
+    summary = str(request.GET.get('fields') or 'full').strip().lower() == 'summary'
+    include_history = _flag_param(request, 'include_history', not summary)
+    # The project row (and its data blob) is not needed for listing.
+    qs = _supplier_access_qs_for_actor(actor).select_related(None).filter(project_id=pid).order_by('-created_at')
+    ids = [x.strip() for x in str(request.GET.get('ids') or '').split(',') if x.strip()]
+    if ids:
+        qs = qs.filter(id__in=ids)
+    if summary:
+        qs = qs.annotate(files_count=Count('files', distinct=True), rounds_count=Count('rounds', distinct=True))
+    else:
+        qs = qs.prefetch_related(Prefetch('files', queryset=SupplierInteractionFile.objects.select_related('blob')))
+    if include_history:
+        # History rows only expose submission snapshots; skip the requested_items copies.
+        qs = qs.prefetch_related(Prefetch(
+            'rounds', queryset=SupplierAccessRound.objects.defer('requested_items').select_related('submission_snapshot'),
+        ))
     data = []
     for acc in qs:
-        d = acc.as_dict()
+        full = acc.as_dict()
+        d = {k: full[k] for k in _ACCESS_SUMMARY_KEYS} if summary else full
         if acc.submission_data:
             sub = acc.submission_data
             d['submission_summary'] = {'notes': sub.get('notes'), 'items_count': len(sub.get('items') or [])}
-        d['files'] = [f.as_dict() for f in acc.files.all()]
-        d['round_history'] = []
-        for r in acc.rounds.all():
-            d['round_history'].append({
-                'round': r.round,
-                'submission_data': r.submission_data or {},
-                'submitted_at': r.submitted_at.isoformat() if r.submitted_at else None,
-                'buyer_decision': r.buyer_decision or '',
-                'decision_reason': r.decision_reason or '',
-                'decision_by': r.decision_by or '',
-                'decision_at': r.decision_at.isoformat() if r.decision_at else None,
-            })
-        d['validation'] = {'is_complete': acc._check_completeness(), 'rejection_reason': acc.rejection_reason}
+        if summary:
+            d['files_count'] = acc.files_count
+            d['rounds_count'] = acc.rounds_count
+            d['reopen_reason'] = (acc.submission_data or {}).get('reopen_reason') or ''
+        else:
+            d['files'] = [f.as_dict() for f in acc.files.all()]
+        if include_history:
+            d['round_history'] = [_round_history_row(r) for r in acc.rounds.all()]
+        d['validation'] = {'is_complete': full['is_complete'], 'rejection_reason': acc.rejection_reason}
         data.append(d)
     return JsonResponse({'accesses': data})
 def supplier_interaction_file_download(request, file_id):
     if request.method != 'GET':
         return HttpResponseNotAllowed(['GET'])
     try:
-        f = SupplierInteractionFile.objects.select_related('supplier_access', 'supplier_access__project').get(id=file_id)
+        f = SupplierInteractionFile.objects.select_related('supplier_access', 'supplier_access__project', 'blob').get(id=file_id)
     except SupplierInteractionFile.DoesNotExist:
         return JsonResponse({'error': 'Not found'}, status=404)
     has_access = False
@@ -733,12 +1019,13 @@ def supplier_interaction_file_download(request, file_id):
         has_access = True
     if not has_access:
         return HttpResponse('Unauthorized', status=403)
-    from django.http import FileResponse
+    # Blob bodies never change, so their hash is a strong validator.
+    etag = f'"{f.blob.sha256}"' if f.blob_id else None
     try:
-        resp = FileResponse(f.file.open('rb'))
-        resp['Content-Disposition'] = f'attachment; filename="{f.original_name}"'
+        resp = _serve_file(request, f.stored_file, filename=f.original_name, etag=etag, last_modified=f.uploaded_at)
+        resp['Cache-Control'] = 'private, max-age=3600'
         return resp
-    except (FileNotFoundError, OSError):
+    except (FileNotFoundError, OSError, ValueError):
         return HttpResponse('File missing', status=404)
 def supplier_access_request_reopen(request, token):
     if request.method != 'POST':
@@ -788,7 +1075,7 @@ def supplier_access_update_items(request, token):
                 existing_drawings.add(drawing)
             if ci.get('mpn'):
                 existing_mpns.add(str(ci['mpn']))
-        fresh = _extract_items_for_supplier(access.project.data, access.supplier_name)
+        fresh = _extract_items_for_project_supplier(access.project, access.supplier_name)
         new_items = []
         now_iso = timezone.now().isoformat()
         for fi in fresh:
@@ -863,7 +1150,7 @@ def supplier_access_reopen_buyer(request, token):
         sd.pop('reopen_reason', None)
         access.submission_data = sd
         try:
-            refreshed = _extract_items_for_supplier(access.project.data, access.supplier_name)
+            refreshed = _extract_items_for_project_supplier(access.project, access.supplier_name)
             if refreshed:
                 access.requested_items = refreshed
         except (AttributeError, TypeError, ValueError):
@@ -906,18 +1193,20 @@ def supplier_access_bulk_generate(request):
     contact_email = str(payload.get('contact_email') or '').strip()[:255]
     contact_phone = str(payload.get('contact_phone') or '').strip()[:64]
     instruction_message = str(payload.get('instruction_message') or '').strip()
-    results = []
+    items = (proj.data or {}).get('items') or []
+    by_supplier = _supplier_item_index(items)
+    accesses = []
     for sname in supplier_names:
         sname = str(sname).strip()
         if not sname:
             continue
-        extracted = _extract_items_for_supplier(proj.data, sname)
-        token = uuid.uuid4().hex
-        access = SupplierAccess(
-            id=token,
+        positions = by_supplier.get(_normalize_name(sname).lower(), [])
+        accesses.append(SupplierAccess(
+            id=uuid.uuid4().hex,
+            company_id=proj.company_id,
             project=proj,
             supplier_name=sname,
-            requested_items=extracted,
+            requested_items=[_requested_item_entry(items[pos]) for pos in positions],
             submission_data={},
             status='sent',
             round=1,
@@ -926,7 +1215,13 @@ def supplier_access_bulk_generate(request):
             contact_email=contact_email,
             contact_phone=contact_phone,
             instruction_message=instruction_message,
-        )
-        access.save()
-        results.append(access.as_dict())
+        ))
+    with transaction.atomic():
+        SupplierAccess.objects.bulk_create(accesses)
+        # bulk_create skips post_save: index and announce the new links here.
+        index_supplier_accesses(accesses)
+        publish_many(proj.company_id, ChangeEvent.KIND_SUPPLIER_ACCESS, [
+            (proj.id, {'access_id': a.id, 'status': a.status, 'round': a.round}) for a in accesses
+        ])
+    results = [a.as_dict() for a in accesses]
     return JsonResponse({'ok': True, 'accesses': results, 'count': len(results)})
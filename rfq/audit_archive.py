@@ -0,0 +1,152 @@
+"""Retention for ``AuditLog``: archive old entries to files, restore on demand.
+
+Entries older than their company's retention window
+(``Company.audit_retention_days``, else ``RFQ_AUDIT_RETENTION_DAYS``) are
+written oldest-first to gzipped NDJSON files under
+``MEDIA_ROOT/audit_archive/<company>/``, at most
+``RFQ_AUDIT_ARCHIVE_ROWS_PER_FILE`` rows each, and recorded as
+``AuditArchive`` rows. Only after a file is stored are its entries deleted,
+in ``DELETE_BATCH_SIZE`` batches, so no transaction or lock is ever held for
+long and the table stays at roughly one retention window of data.
+
+``restore_archive`` puts a file's entries back (with their original ids) and
+removes the archive; the next run archives them again unless the retention
+window was raised in the meantime.
+"""
+import gzip
+import hashlib
+import io
+import json
+import tempfile
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .audit_writer import drop_dangling
+from .models import AuditArchive, AuditLog, Company
+
+DELETE_BATCH_SIZE = 1000
+READ_BATCH_SIZE = 2000
+
+FIELDS = (
+    'id', 'created_at', 'company_id', 'actor_id', 'actor_role', 'action', 'entity_type', 'entity_id',
+    'project_id', 'metadata_json', 'ip', 'user_agent',
+)
+
+
+def _storage():
+    return AuditArchive._meta.get_field('file').storage
+
+
+def retention_cutoffs(now=None):
+    """``(company_id, cutoff)`` for every company plus ``None`` for entries without one."""
+    now = now or timezone.now()
+    default_days = max(1, int(getattr(settings, 'RFQ_AUDIT_RETENTION_DAYS', 365)))
+    for company_id, days in Company.objects.order_by('id').values_list('id', 'audit_retention_days'):
+        yield company_id, now - timedelta(days=days or default_days)
+    yield None, now - timedelta(days=default_days)
+
+
+def _expired(company_id, cutoff):
+    q = AuditLog.objects.filter(created_at__lt=cutoff)
+    q = q.filter(company_id=company_id) if company_id else q.filter(company__isnull=True)
+    return q.order_by('created_at', 'id')
+
+
+def _iter_batches(qs, limit):
+    # Oldest first in keyset batches, up to ``limit`` rows in total.
+    cursor = None
+    while limit > 0:
+        page = qs if cursor is None else qs.filter(Q(created_at__gt=cursor[0]) | Q(created_at=cursor[0], id__gt=cursor[1]))
+        batch = list(page.values(*FIELDS)[:min(READ_BATCH_SIZE, limit)])
+        if not batch:
+            return
+        yield batch
+        limit -= len(batch)
+        cursor = (batch[-1]['created_at'], batch[-1]['id'])
+
+
+def _write_file(company_id, qs, limit):
+    """Archive up to ``limit`` rows of ``qs``; returns ``(AuditArchive, ids)`` or ``(None, [])``."""
+    ids = []
+    first_at = last_at = None
+    with tempfile.TemporaryFile() as tmp:
+        with gzip.GzipFile(fileobj=tmp, mode='wb') as gz:
+            for batch in _iter_batches(qs, limit):
+                for row in batch:
+                    gz.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8') + b'\n')
+                    ids.append(row['id'])
+                first_at = first_at or batch[0]['created_at']
+                last_at = batch[-1]['created_at']
+        if not ids:
+            return None, []
+        tmp.seek(0)
+        digest = hashlib.sha256()
+        for block in iter(lambda: tmp.read(64 * 1024), b''):
+            digest.update(block)
+        tmp.seek(0)
+        name = f"audit_archive/{company_id or 'none'}/{first_at:%Y%m%dT%H%M%S}-{last_at:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.ndjson.gz"
+        saved = _storage().save(name, File(tmp))
+    archive = AuditArchive.objects.create(
+        company_id=company_id, file=saved, sha256=digest.hexdigest(), row_count=len(ids), first_at=first_at, last_at=last_at,
+    )
+    return archive, ids
+
+
+def archive_company(company_id, cutoff, rows_per_file=None):
+    """Archive and delete ``company_id``'s entries older than ``cutoff``; returns ``(rows, files)``."""
+    rows_per_file = max(1, int(rows_per_file or getattr(settings, 'RFQ_AUDIT_ARCHIVE_ROWS_PER_FILE', 50000)))
+    rows = files = 0
+    while True:
+        archive, ids = _write_file(company_id, _expired(company_id, cutoff), rows_per_file)
+        if archive is None:
+            return rows, files
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            AuditLog.objects.filter(id__in=ids[start:start + DELETE_BATCH_SIZE]).delete()
+        rows += len(ids)
+        files += 1
+
+
+def archive_expired(now=None, rows_per_file=None):
+    """Apply every retention window; returns ``(rows, files)`` in total."""
+    rows = files = 0
+    for company_id, cutoff in retention_cutoffs(now):
+        r, f = archive_company(company_id, cutoff, rows_per_file)
+        rows += r
+        files += f
+    return rows, files
+
+
+def read_archive(archive):
+    """The archived entries as dicts; raises ValueError if the file does not match its checksum."""
+    with archive.file.open('rb') as fh:
+        data = fh.read()
+    if hashlib.sha256(data).hexdigest() != archive.sha256:
+        raise ValueError(f'Audit archive {archive.id} is corrupt (checksum mismatch)')
+    with gzip.GzipFile(fileobj=io.BytesIO(data)) as gz:
+        return [json.loads(line) for line in gz if line.strip()]
+
+
+def restore_archive(archive):
+    """Re-insert an archive's entries and remove the archive; returns the number of rows."""
+    rows = read_archive(archive)
+    entries = []
+    for row in rows:
+        row['created_at'] = parse_datetime(row['created_at'])
+        entries.append(AuditLog(**row))
+    with transaction.atomic():
+        for start in range(0, len(entries), DELETE_BATCH_SIZE):
+            batch = entries[start:start + DELETE_BATCH_SIZE]
+            drop_dangling(batch)
+            AuditLog.objects.bulk_create(batch, ignore_conflicts=True)
+        name = archive.file.name
+        archive.delete()
+        transaction.on_commit(lambda: _storage().delete(name))
+    return len(entries)
@@ -0,0 +1,131 @@
+"""Buffered writer behind ``api_common.audit_log``.
+
+Entries are queued in process and written with one ``bulk_create`` when
+``RFQ_AUDIT_BATCH_SIZE`` entries are waiting (by the request that fills the
+batch) or ``RFQ_AUDIT_FLUSH_SECONDS`` after the oldest one was queued (by a
+daemon thread). The queue is also flushed at interpreter exit, so a worker
+that shuts down normally loses nothing; a killed worker loses at most one
+batch, which is acceptable for a best-effort log.
+
+``RFQ_AUDIT_INLINE`` writes every entry immediately instead (development and
+tests). ``RFQ_AUDIT_EXCLUDE_ACTIONS`` / ``RFQ_AUDIT_SAMPLE_RATES`` drop or
+sample high-frequency actions in either mode.
+"""
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection, transaction
+
+from .models import AuditLog, Company, Project
+
+logger = logging.getLogger(__name__)
+
+_pending = []
+_pending_lock = threading.Lock()
+_flusher = None
+_flusher_pid = None
+_wakeup = threading.Event()
+
+
+def _matches(action, pattern):
+    if pattern.endswith('*'):
+        return action.startswith(pattern[:-1])
+    return action == pattern
+
+
+def should_record(action):
+    """False for excluded actions and for the share of sampled actions that is skipped."""
+    if any(_matches(action, p) for p in getattr(settings, 'RFQ_AUDIT_EXCLUDE_ACTIONS', ())):
+        return False
+    rates = getattr(settings, 'RFQ_AUDIT_SAMPLE_RATES', {}) or {}
+    rate = next((r for p, r in rates.items() if _matches(action, p)), 1.0)
+    return rate >= 1 or random.random() < rate
+
+
+def drop_dangling(entries):
+    # Projects, companies or users can be deleted while their entries wait in
+    # the queue; the entries are still worth keeping, without the reference.
+    for field, model in (('project_id', Project), ('company_id', Company), ('actor_id', get_user_model())):
+        ids = {getattr(e, field) for e in entries if getattr(e, field) is not None}
+        if not ids:
+            continue
+        existing = set(model.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        for entry in entries:
+            if getattr(entry, field) not in existing:
+                setattr(entry, field, None)
+
+
+def _insert(entries):
+    drop_dangling(entries)
+    try:
+        with transaction.atomic():
+            AuditLog.objects.bulk_create(entries)
+        return
+    except DatabaseError:
+        logger.warning('Audit batch of %d failed; retrying entries one by one', len(entries), exc_info=True)
+    for entry in entries:
+        try:
+            with transaction.atomic():
+                entry.save(force_insert=True)
+        except DatabaseError:
+            logger.exception('Dropping audit entry %s', entry.action)
+
+
+def flush():
+    """Write every queued entry; returns how many were written."""
+    with _pending_lock:
+        batch = _pending[:]
+        del _pending[:]
+    if batch:
+        _insert(batch)
+    return len(batch)
+
+
+def _run_flusher():
+    interval = max(0.1, float(getattr(settings, 'RFQ_AUDIT_FLUSH_SECONDS', 2)))
+    while True:
+        _wakeup.wait()
+        _wakeup.clear()
+        time.sleep(interval)
+        try:
+            flush()
+        except Exception:
+            logger.exception('Audit flush failed')
+        finally:
+            connection.close()
+
+
+def _ensure_flusher():
+    global _flusher, _flusher_pid
+    # A forked worker does not inherit the parent's thread; start its own.
+    if _flusher is not None and _flusher_pid == os.getpid():
+        return
+    _flusher = threading.Thread(target=_run_flusher, name='rfq-audit-flush', daemon=True)
+    _flusher_pid = os.getpid()
+    _flusher.start()
+
+
+def write(entry):
+    """Persist an unsaved ``AuditLog`` now (inline mode) or with the next batch."""
+    if getattr(settings, 'RFQ_AUDIT_INLINE', False):
+        entry.save(force_insert=True)
+        return
+    batch_size = max(1, int(getattr(settings, 'RFQ_AUDIT_BATCH_SIZE', 100)))
+    with _pending_lock:
+        _pending.append(entry)
+        full = len(_pending) >= batch_size
+        if not full:
+            _ensure_flusher()
+    if full:
+        flush()
+    else:
+        _wakeup.set()
+
+
+atexit.register(flush)
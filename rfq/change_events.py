@@ -0,0 +1,140 @@
+"""Per-company change feed behind ``/api/events`` and ``/api/events/stream``.
+
+Writers call ``publish`` (from ``rfq.signals``); the row is inserted after the
+surrounding transaction commits, so readers never see an event for data they
+cannot load yet. The table is the fan-out: every web process (WSGI or ASGI)
+polls it, which is enough for a single-node deployment without a broker.
+
+Readers page by id. On PostgreSQL two concurrent inserts can commit out of id
+order, so a reader could pass an id whose row is not visible yet and never
+come back for it. ``events_after`` therefore stops in front of a missing id
+for ``RFQ_EVENTS_SETTLE_SECONDS``; after that the id is taken to belong to a
+rolled-back insert and skipped.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .api_common import annotate_project_permissions, can_view_project
+from .models import ChangeEvent, Project
+
+logger = logging.getLogger(__name__)
+
+# Prune old rows every this many events (cheap, no scheduler needed).
+PRUNE_EVERY = 200
+
+
+def retention():
+    return timedelta(minutes=max(1, int(getattr(settings, 'RFQ_EVENTS_RETENTION_MINUTES', 60))))
+
+
+def publish(company_id, kind, project_id='', **payload):
+    """Queue a change event for ``company_id``; written once the current transaction commits."""
+    if not company_id:
+        return
+
+    def _write():
+        try:
+            ev = ChangeEvent.objects.create(company_id=company_id, kind=kind, project_id=str(project_id or '')[:64], payload=payload)
+            if ev.id % PRUNE_EVERY == 0:
+                prune_events()
+        except Exception:
+            logger.exception('Could not publish change event %s', kind)
+
+    transaction.on_commit(_write)
+
+
+def publish_many(company_id, kind, events):
+    """Queue several events of one kind at once; ``events`` is a list of ``(project_id, payload)``."""
+    if not company_id or not events:
+        return
+
+    def _write():
+        try:
+            rows = ChangeEvent.objects.bulk_create([
+                ChangeEvent(company_id=company_id, kind=kind, project_id=str(project_id or '')[:64], payload=payload)
+                for project_id, payload in events
+            ])
+            if rows and rows[-1].id and rows[-1].id // PRUNE_EVERY != (rows[-1].id - len(rows)) // PRUNE_EVERY:
+                prune_events()
+        except Exception:
+            logger.exception('Could not publish change events %s', kind)
+
+    transaction.on_commit(_write)
+
+
+def prune_events(now=None):
+    cutoff = (now or timezone.now()) - retention()
+    deleted, _ = ChangeEvent.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def latest_event_id():
+    return ChangeEvent.objects.aggregate(m=Max('id'))['m'] or 0
+
+
+def events_gap(after_id):
+    """True when events newer than ``after_id`` may already have been pruned."""
+    if not after_id:
+        return False
+    oldest = ChangeEvent.objects.aggregate(m=Min('id'))['m']
+    return oldest is None or oldest > after_id + 1
+
+
+def _events_qs_for_actor(actor):
+    qs = ChangeEvent.objects.all()
+    if actor and actor.get('is_superadmin'):
+        scope_company = actor.get('scope_company')
+        return qs.filter(company=scope_company) if scope_company else qs
+    company = (actor or {}).get('company')
+    if company is None:
+        return qs.none()
+    return qs.filter(company=company)
+
+
+def _settled_horizon(after_id, limit):
+    """Highest id up to which no recent insert can still be in flight (``None``: no limit)."""
+    settle = float(getattr(settings, 'RFQ_EVENTS_SETTLE_SECONDS', 2))
+    if settle <= 0:
+        return None
+    cutoff = timezone.now() - timedelta(seconds=settle)
+    # Gaps are looked for across all companies: their events share one id sequence.
+    prev = after_id
+    for event_id, created_at in ChangeEvent.objects.filter(id__gt=after_id).order_by('id').values_list('id', 'created_at')[:limit]:
+        if event_id != prev + 1 and created_at >= cutoff:
+            return prev
+        prev = event_id
+    return None
+
+
+def events_after(actor, after_id, limit=200):
+    """Events newer than ``after_id`` the actor may see, oldest first.
+
+    Returns ``(events, last_id)``; ``last_id`` also advances past events that
+    were filtered out by project ACLs so callers do not re-read them, but not
+    past a recent id gap (see the module docstring).
+    """
+    qs = _events_qs_for_actor(actor).filter(id__gt=after_id)
+    horizon = _settled_horizon(after_id, limit)
+    if horizon is not None:
+        qs = qs.filter(id__lte=horizon)
+    rows = list(qs.order_by('id')[:limit])
+    if not rows:
+        return [], after_id
+    pids = {r.project_id for r in rows if r.project_id}
+    visible = set()
+    if pids:
+        # Deleted projects have no row left to check; their delete event only carries the id.
+        existing = annotate_project_permissions(Project.objects.filter(id__in=pids).only('id', 'company'), actor)
+        found = set()
+        for p in existing:
+            found.add(p.id)
+            if can_view_project(actor, p):
+                visible.add(p.id)
+        visible |= pids - found
+    events = [r for r in rows if not r.project_id or r.project_id in visible]
+    return events, rows[-1].id
@@ -0,0 +1,22 @@
+"""System checks for deployment settings that are easy to get wrong."""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+LOCAL_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register('rfq')
+def actor_cache_backend_check(app_configs, **kwargs):
+    # Profile changes only invalidate the cache of the process that made them; with a
+    # per-process cache other workers keep the old role for up to RFQ_ACTOR_CACHE_TTL.
+    ttl = int(getattr(settings, 'RFQ_ACTOR_CACHE_TTL', 0) or 0)
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if ttl <= 0 or settings.DEBUG or backend != LOCAL_CACHE_BACKEND:
+        return []
+    return [Warning(
+        f'RFQ_ACTOR_CACHE_TTL={ttl} with a per-process cache: role changes and deactivations reach '
+        f'other worker processes only after up to {ttl} seconds.',
+        hint='Configure a shared CACHES backend (e.g. Redis) when running more than one worker, or set '
+             'RFQ_ACTOR_CACHE_TTL=0. Single-process deployments can silence rfq.W001.',
+        id='rfq.W001',
+    )]
@@ -0,0 +1,118 @@
+"""Background runner for export jobs.
+
+Jobs are rows in ``ExportJob``; a small per-process thread pool renders them
+with the ``rfq.api_export`` writers, so no external broker is needed. A job
+that was queued when its process died stays ``queued``/``running`` until it
+expires and is removed by ``cleanup_expired_jobs`` (``manage.py
+cleanup_export_jobs``).
+"""
+import logging
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .api_export import EXPORT_FILENAMES, EXPORT_WRITERS
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Write progress at most this often (in projects) to keep UPDATEs cheap.
+PROGRESS_STEP = 5
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = max(1, int(getattr(settings, 'RFQ_EXPORT_JOB_WORKERS', 2)))
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rfq-export')
+        return _executor
+
+
+def job_ttl():
+    return timedelta(hours=max(1, int(getattr(settings, 'RFQ_EXPORT_JOB_TTL_HOURS', 24))))
+
+
+def create_job(actor, opts, company):
+    """Persist a queued job of ``company`` for ``opts`` (see ``api_export.parse_export_options``) and schedule it."""
+    job = ExportJob.objects.create(
+        id=uuid.uuid4().hex,
+        company=company,
+        created_by=actor['user'],
+        format=opts['format'],
+        options=opts,
+        total=len(dict.fromkeys(opts['project_ids'])),
+        expires_at=timezone.now() + job_ttl(),
+    )
+    if getattr(settings, 'RFQ_EXPORT_JOBS_INLINE', False):
+        run_job(job.id)
+        job.refresh_from_db()
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, job.id))
+    return job
+
+
+def _run_in_worker(job_id):
+    try:
+        run_job(job_id)
+        cleanup_expired_jobs()
+    except Exception:
+        logger.exception('Export job worker crashed: %s', job_id)
+    finally:
+        connection.close()
+
+
+def run_job(job_id):
+    """Render one queued job; a job already claimed by another worker is left alone."""
+    claimed = ExportJob.objects.filter(id=job_id, status=ExportJob.STATUS_QUEUED).update(
+        status=ExportJob.STATUS_RUNNING, started_at=timezone.now(),
+    )
+    if not claimed:
+        return
+    job = ExportJob.objects.get(id=job_id)
+
+    def progress(done):
+        if done % PROGRESS_STEP == 0:
+            ExportJob.objects.filter(id=job_id).update(progress=done)
+
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            EXPORT_WRITERS[job.format](job.options, tmp, progress)
+            size = tmp.tell()
+            tmp.seek(0)
+            job.file.save(f'{job.id}_{EXPORT_FILENAMES[job.format]}', File(tmp), save=False)
+    except Exception as e:
+        logger.exception('Export job failed: %s', job_id)
+        ExportJob.objects.filter(id=job_id).update(
+            status=ExportJob.STATUS_FAILED, error=str(e)[:1000], finished_at=timezone.now(),
+        )
+        return
+    ExportJob.objects.filter(id=job_id).update(
+        status=ExportJob.STATUS_DONE, file=job.file.name, size=size, progress=job.total,
+        finished_at=timezone.now(),
+    )
+
+
+def cleanup_expired_jobs(now=None):
+    """Delete expired jobs and their artifacts; returns the number of jobs removed."""
+    now = now or timezone.now()
+    removed = 0
+    for job in ExportJob.objects.filter(expires_at__lt=now).only('id', 'file').iterator():
+        try:
+            if job.file:
+                job.file.delete(save=False)
+        except Exception:
+            logger.warning('Could not delete export artifact for job %s', job.id)
+        job.delete()
+        removed += 1
+    return removed
@@ -0,0 +1,145 @@
+"""Serving stored files with conditional GET and byte-range support.
+
+Views do their permission checks and then call ``serve_file``. It answers
+``If-None-Match`` / ``If-Modified-Since`` with 304 and otherwise hands the
+transfer to the backend named by ``RFQ_FILE_DELIVERY``:
+
+- ``django`` (default): the body is streamed from storage in blocks. A single
+  ``Range: bytes=...`` gets 206 (multi-range requests get the whole file,
+  which RFC 9110 allows) and an unsatisfiable range gets 416.
+- ``x-accel-redirect``: an empty response with ``X-Accel-Redirect`` pointing
+  at an ``internal`` nginx location (``RFQ_FILE_DELIVERY_ACCEL_PREFIX``) that
+  maps onto ``MEDIA_ROOT``; nginx does the transfer and the ranges.
+- ``x-sendfile``: ``X-Sendfile`` with the absolute path, for Apache
+  (mod_xsendfile) or lighttpd.
+
+Either proxy backend releases the worker as soon as the headers are built.
+``x-sendfile`` falls back to ``django`` for storages without a local path.
+"""
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+
+_BLOCK_SIZE = 64 * 1024
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """``(start, end)`` inclusive for a single byte range, None to send everything, or 'invalid'."""
+    m = _RANGE_RE.match((header or '').strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    if not m.group(1):
+        suffix = int(m.group(2))
+        if suffix == 0:
+            return 'invalid'
+        return max(0, size - suffix), size - 1
+    start = int(m.group(1))
+    end = int(m.group(2)) if m.group(2) else size - 1
+    if start >= size or end < start:
+        return 'invalid'
+    return start, min(end, size - 1)
+
+
+def _iter_range(fh, start, length):
+    try:
+        fh.seek(start)
+        while length > 0:
+            block = fh.read(min(_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        fh.close()
+
+
+def _finish(response, etag, last_modified):
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def _content_type(filename):
+    return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+
+def _stream_response(request, stored, filename, etag, as_attachment):
+    fh = stored.open('rb')
+    size = stored.size
+    byte_range = None
+    if request.method == 'GET' and 'HTTP_RANGE' in request.META:
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if not if_range or (etag and if_range == etag):
+            byte_range = parse_range(request.META['HTTP_RANGE'], size)
+    if byte_range == 'invalid':
+        fh.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        return FileResponse(fh, as_attachment=as_attachment, filename=filename)
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(_iter_range(fh, start, length), status=206, content_type=_content_type(filename))
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    return response
+
+
+def _proxy_response(header, value, filename, as_attachment):
+    response = HttpResponse(content_type=_content_type(filename))
+    response[header] = value
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    return response
+
+
+def _accel_redirect_response(request, stored, filename, etag, as_attachment):
+    prefix = getattr(settings, 'RFQ_FILE_DELIVERY_ACCEL_PREFIX', '/protected-media/')
+    location = prefix.rstrip('/') + '/' + quote(stored.name.lstrip('/'))
+    return _proxy_response('X-Accel-Redirect', location, filename, as_attachment)
+
+
+def _sendfile_response(request, stored, filename, etag, as_attachment):
+    try:
+        path = stored.path
+    except NotImplementedError:
+        return _stream_response(request, stored, filename, etag, as_attachment)
+    return _proxy_response('X-Sendfile', path, filename, as_attachment)
+
+
+_BACKENDS = {
+    'django': _stream_response,
+    'x-accel-redirect': _accel_redirect_response,
+    'x-sendfile': _sendfile_response,
+}
+
+
+def _backend():
+    name = str(getattr(settings, 'RFQ_FILE_DELIVERY', 'django') or 'django').strip().lower()
+    return _BACKENDS.get(name, _stream_response)
+
+
+def serve_file(request, stored, *, filename, etag=None, last_modified=None, as_attachment=True, content_type=None):
+    """Response for the storage file ``stored`` (a ``FieldFile``); raises OSError if it is missing.
+
+    ``content_type`` overrides the type guessed from ``filename``.
+    """
+    modified_ts = int(last_modified.timestamp()) if last_modified else None
+    conditional = get_conditional_response(request, etag=etag, last_modified=modified_ts)
+    if conditional is not None:
+        return _finish(conditional, etag, last_modified)
+    response = _backend()(request, stored, filename, etag, as_attachment)
+    if content_type and response.status_code in (200, 206):
+        response['Content-Type'] = content_type
+    return _finish(response, etag, last_modified)
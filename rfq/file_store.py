@@ -0,0 +1,92 @@
+"""Content-addressed storage for supplier interaction files.
+
+Uploads are hashed chunk by chunk (Django already spooled large ones to a
+temporary file), and stored once per SHA-256 under ``blobs/ab/cd/<sha>``.
+A supplier re-sending the same datasheet every round therefore only adds a
+``SupplierInteractionFile`` row pointing at the existing ``StoredBlob``.
+``StoredBlob.ref_count`` tracks those rows; the body is deleted from storage
+after the last reference goes away.
+"""
+import hashlib
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import StoredBlob
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def blob_path(digest):
+    return f'blobs/{digest[:2]}/{digest[2:4]}/{digest}'
+
+
+def hash_upload(f):
+    """SHA-256 hex digest of an uploaded file, read in chunks; rewinds the file afterwards."""
+    digest = hashlib.sha256()
+    for chunk in f.chunks(_HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    f.seek(0)
+    return digest.hexdigest()
+
+
+def _add_reference(digest):
+    """Bump and return the blob for ``digest``, or None when it is not stored yet."""
+    updated = StoredBlob.objects.filter(sha256=digest).update(ref_count=F('ref_count') + 1)
+    return StoredBlob.objects.get(sha256=digest) if updated else None
+
+
+def _storage():
+    return StoredBlob._meta.get_field('file').storage
+
+
+def store_upload(f):
+    """Return the ``StoredBlob`` holding ``f``'s bytes, writing them only if they are new."""
+    digest = hash_upload(f)
+    blob = _add_reference(digest)
+    if blob is not None:
+        return blob
+    storage = _storage()
+    name = blob_path(digest)
+    # A body left behind by a rolled-back upload has the same content: reuse it.
+    saved_name = name if storage.exists(name) else storage.save(name, f)
+    try:
+        with transaction.atomic():
+            return StoredBlob.objects.create(sha256=digest, file=saved_name, size=f.size, ref_count=1)
+    except IntegrityError:
+        # Lost a race with a concurrent upload of the same bytes.
+        if saved_name != name:
+            storage.delete(saved_name)
+        return _add_reference(digest)
+
+
+def _delete_body(digest, name):
+    if not StoredBlob.objects.filter(sha256=digest).exists():
+        _storage().delete(name)
+
+
+def release_blob(blob_id):
+    """Drop one reference; delete the body (after commit) once nothing points at it."""
+    StoredBlob.objects.filter(id=blob_id).update(ref_count=F('ref_count') - 1)
+    blob = StoredBlob.objects.filter(id=blob_id, ref_count__lte=0).first()
+    if blob is None:
+        return
+    digest, name = blob.sha256, blob.file.name
+    blob.delete()
+    transaction.on_commit(lambda: _delete_body(digest, name))
+
+
+def migrate_legacy_file(row):
+    """Move a pre-blob ``SupplierInteractionFile`` onto the shared store; returns False if its file is missing."""
+    legacy = row.file
+    try:
+        with legacy.open('rb'):
+            blob = store_upload(legacy)
+    except (FileNotFoundError, OSError):
+        return False
+    old_name = legacy.name
+    row.blob = blob
+    row.file = ''
+    row.save(update_fields=['blob', 'file'])
+    legacy.storage.delete(old_name)
+    return True
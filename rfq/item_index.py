@@ -0,0 +1,254 @@
+"""Relational shadow of ``Project.data['items']``.
+
+``ProjectItem`` / ``ItemSupplierQuote`` rows mirror the item list (and each
+item's nested ``suppliers``) so hot paths can find the few positions they care
+about with indexed queries instead of walking the whole blob. The JSON blob
+stays the source of truth: rows are rebuilt from it in ``Project.save()`` and
+callers always re-read the item itself from ``project.data`` by position.
+"""
+import hashlib
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Max, Q
+
+_NULL_IDS = {'none', 'null', 'undefined', 'nan'}
+
+_ITEM_FIELDS = (
+    'item_id', 'item_key', 'drawing_no', 'drawing_no_norm', 'drawing_no_alt_norm',
+    'mpn', 'mpn_norm', 'manufacturer', 'description', 'main_supplier_norm',
+)
+
+BULK_BATCH_SIZE = 500
+
+
+def norm(v):
+    return ' '.join(str(v or '').split()).strip().lower()
+
+
+def normalize_item_id(v):
+    s = str(v or '').strip()
+    if not s or s.lower() in _NULL_IDS:
+        return ''
+    return s
+
+
+def item_key(it):
+    """Same key as the bulk-sync merge uses to pair existing and incoming items."""
+    if not isinstance(it, dict):
+        return ''
+    iid = norm(it.get('id'))
+    if iid and iid not in _NULL_IDS:
+        return f'id:{iid}'
+    dn = norm(it.get('item_drawing_no') or it.get('drawing_no'))
+    if dn:
+        return f'dn:{dn}'
+    mpn = norm(it.get('mpn'))
+    if mpn:
+        return f'mpn:{mpn}'
+    return ''
+
+
+def _num(v):
+    try:
+        s = str(v or '').replace(',', '.').strip()
+        return float(s) if s else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def is_quoted(s):
+    if not isinstance(s, dict):
+        return False
+    if _num(s.get('price_1') or s.get('price')) > 0:
+        return True
+    if str(s.get('status') or '').strip().lower() == 'quoted':
+        return True
+    if str(s.get('quote_status') or '').strip().lower() == 'quoted':
+        return True
+    return False
+
+
+def _price(s):
+    value = _num(s.get('price_1') or s.get('price'))
+    if value <= 0:
+        return None
+    try:
+        d = Decimal(str(value)).quantize(Decimal('0.0001'))
+    except (InvalidOperation, ValueError):
+        return None
+    return d if d < Decimal('1e15') else None
+
+
+def _cut(v, n=255):
+    return str(v or '')[:n]
+
+
+def index_norm(value):
+    """``norm(value)`` cut to the stored column width, for querying the index."""
+    return _cut(norm(value))
+
+
+def build_item_rows(data):
+    """Yield ``(position, item_fields, supplier_rows, row_hash)`` for every item in ``data``.
+
+    Pure function (no ORM access) so the backfill migration can reuse it.
+    Non-dict items still get a row so positions line up with the blob.
+    """
+    items = (data or {}).get('items') if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return
+    for pos, it in enumerate(items):
+        if not isinstance(it, dict):
+            it = {}
+        dn = it.get('item_drawing_no') or it.get('drawing_no') or ''
+        dn_alt = it.get('drawing_no') or it.get('item_drawing_no') or ''
+        fields = {
+            'item_id': _cut(normalize_item_id(it.get('id'))),
+            'item_key': _cut(item_key(it)),
+            'drawing_no': _cut(dn),
+            'drawing_no_norm': _cut(norm(dn)),
+            'drawing_no_alt_norm': _cut(norm(dn_alt)),
+            'mpn': _cut(it.get('mpn')),
+            'mpn_norm': _cut(norm(it.get('mpn'))),
+            'manufacturer': _cut(it.get('manufacturer')),
+            'description': str(it.get('description') or ''),
+            'main_supplier_norm': _cut(norm(it.get('supplier'))),
+        }
+        sups = it.get('suppliers') or []
+        if not isinstance(sups, list):
+            sups = []
+        sup_rows = []
+        for spos, s in enumerate(sups):
+            if not isinstance(s, dict):
+                continue
+            name = s.get('supplier_name') or s.get('name') or s.get('supplier') or ''
+            # Some readers look at 'name'/'supplier' before 'supplier_name'.
+            alt_norm = norm(s.get('name') or s.get('supplier'))
+            price = _price(s)
+            sup_rows.append({
+                'supplier_position': spos,
+                'supplier_name': _cut(name),
+                'supplier_name_norm': _cut(norm(name)),
+                'alt_name_norm': _cut(alt_norm) if alt_norm != norm(name) else '',
+                'is_main': bool(s.get('isMain')),
+                'is_quoted': is_quoted(s),
+                'price': price,
+                'currency': _cut(s.get('currency'), 16),
+                'status': _cut(s.get('quote_status') or s.get('status'), 64),
+                'quote_id': _cut(s.get('quote_id'), 64),
+            })
+        digest = hashlib.sha1(
+            json.dumps([fields, sup_rows], sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        yield pos, fields, sup_rows, digest
+
+
+def sync_project_items(project):
+    """Bring the index rows for ``project`` in line with ``project.data``.
+
+    Rows are diffed per position by content hash, so an edit to one item only
+    rewrites that item (and its supplier rows).
+    """
+    from .models import ItemSupplierQuote, ProjectItem
+
+    existing = {
+        pos: (pk, digest, company_id)
+        for pk, pos, digest, company_id in ProjectItem.objects.filter(project=project).values_list('id', 'position', 'row_hash', 'company_id')
+    }
+    created = []
+    changed = []
+    pending_sups = {}
+    for pos, fields, sup_rows, digest in build_item_rows(project.data):
+        cur = existing.pop(pos, None)
+        if cur and cur[1] == digest and cur[2] == project.company_id:
+            continue
+        row = ProjectItem(company_id=project.company_id, project=project, position=pos, row_hash=digest, **fields)
+        if cur:
+            row.pk = cur[0]
+            changed.append(row)
+        else:
+            created.append(row)
+        pending_sups[pos] = sup_rows
+    stale_ids = [v[0] for v in existing.values()]
+    if stale_ids:
+        ProjectItem.objects.filter(id__in=stale_ids).delete()
+    if changed:
+        ItemSupplierQuote.objects.filter(item_id__in=[r.pk for r in changed]).delete()
+        ProjectItem.objects.bulk_update(changed, ['company', 'row_hash', *_ITEM_FIELDS], batch_size=BULK_BATCH_SIZE)
+    if created:
+        ProjectItem.objects.bulk_create(created, batch_size=BULK_BATCH_SIZE)
+    sup_objs = [
+        ItemSupplierQuote(company_id=project.company_id, project=project, item=row, **s)
+        for row in (*changed, *created)
+        for s in pending_sups.get(row.position, ())
+    ]
+    if sup_objs:
+        ItemSupplierQuote.objects.bulk_create(sup_objs, batch_size=BULK_BATCH_SIZE)
+
+
+def _positions(qs):
+    return sorted(set(qs.values_list('position', flat=True)))
+
+
+def supplier_item_positions(project, supplier_name):
+    """Positions of items assigned to ``supplier_name`` (main supplier or listed)."""
+    from .models import ProjectItem
+
+    n = index_norm(supplier_name)
+    if not n:
+        return []
+    return _positions(ProjectItem.objects.filter(project=project).filter(
+        Q(main_supplier_norm=n)
+        | Q(supplier_quotes__supplier_name_norm=n)
+        | Q(supplier_quotes__alt_name_norm=n)
+    ))
+
+
+def matching_item_positions(project, *, item_ids=(), drawing_nos=(), mpns=()):
+    """Positions of items whose id, drawing number or MPN is in the given sets.
+
+    Drawing numbers and MPNs are compared normalized (see ``norm``); both
+    ``item_drawing_no`` / ``drawing_no`` spellings are matched.
+    """
+    from .models import ProjectItem
+
+    # Stored values are cut to the column width, so the query values must be too.
+    ids = {_cut(normalize_item_id(v)) for v in item_ids} - {''}
+    dns = {index_norm(v) for v in drawing_nos} - {''}
+    mpn_set = {index_norm(v) for v in mpns} - {''}
+    cond = Q()
+    if ids:
+        cond |= Q(item_id__in=ids)
+    if dns:
+        cond |= Q(drawing_no_norm__in=dns) | Q(drawing_no_alt_norm__in=dns)
+    if mpn_set:
+        cond |= Q(mpn_norm__in=mpn_set)
+    if not cond:
+        return []
+    return _positions(ProjectItem.objects.filter(project=project).filter(cond))
+
+
+def quoted_item_positions(project):
+    """Positions of items whose supplier quotes must survive a bulk-sync merge.
+
+    Mirrors the merge's "last item wins" keying: for every key carried by an
+    item with a meaningful quote, only the last item with that key counts.
+    """
+    from .models import ProjectItem
+
+    keys = set(
+        ProjectItem.objects.filter(project=project, supplier_quotes__is_quoted=True)
+        .exclude(item_key='')
+        .values_list('item_key', flat=True)
+    )
+    if not keys:
+        return []
+    last = (
+        ProjectItem.objects.filter(project=project, item_key__in=keys)
+        .values('item_key').annotate(last_position=Max('position'))
+        .values_list('last_position', flat=True)
+    )
+    return _positions(ProjectItem.objects.filter(
+        project=project, position__in=list(last), supplier_quotes__is_quoted=True,
+    ))
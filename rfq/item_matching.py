@@ -0,0 +1,75 @@
+"""In-memory matching of incoming rows to project items.
+
+Supplier submissions, quote lines and synced items are paired with project
+items by id, drawing number or MPN. ``MatchIndex`` normalizes each row once
+and answers every lookup with a dict hit, so pairing N items against M rows
+costs O(N + M) instead of re-normalizing all M rows for every item.
+"""
+from .item_index import norm, normalize_item_id
+
+# Field order used when reading a drawing number off an item-like dict.
+DRAWING_FIELDS = ('item_drawing_no', 'drawing_no')
+
+
+def drawing_no(row, fields=DRAWING_FIELDS):
+    for f in fields:
+        v = row.get(f)
+        if v:
+            return v
+    return ''
+
+
+def supplier_name(s):
+    """Normalized supplier name of an item's supplier entry."""
+    if not isinstance(s, dict):
+        return ''
+    return norm(s.get('supplier_name') or s.get('name') or s.get('supplier'))
+
+
+def find_supplier(sups, name):
+    """First supplier entry in ``sups`` whose normalized name equals ``norm(name)``."""
+    target = norm(name)
+    if not target:
+        return None
+    for s in sups:
+        if supplier_name(s) == target:
+            return s
+    return None
+
+
+class MatchIndex:
+    """Rows keyed by normalized id, drawing number and MPN.
+
+    By default the first row wins a key, matching the linear scans this
+    replaces; ``last_wins=True`` mirrors code that filled a plain dict.
+    """
+
+    def __init__(self, rows, *, drawing_fields=DRAWING_FIELDS, last_wins=False):
+        self._by_id = {}
+        self._by_dn = {}
+        self._by_mpn = {}
+        for pos, row in enumerate(rows):
+            if not isinstance(row, dict):
+                continue
+            entry = (pos, row)
+            for index, key in (
+                (self._by_id, normalize_item_id(row.get('id'))),
+                (self._by_dn, norm(drawing_no(row, drawing_fields))),
+                (self._by_mpn, norm(row.get('mpn'))),
+            ):
+                if key and (last_wins or key not in index):
+                    index[key] = entry
+
+    def by_id(self, item_id):
+        hit = self._by_id.get(normalize_item_id(item_id))
+        return hit[1] if hit else None
+
+    def by_drawing_or_mpn(self, drawing, mpn):
+        """Earliest row sharing the drawing number or the MPN (either one suffices)."""
+        hits = [h for h in (self._by_dn.get(norm(drawing)), self._by_mpn.get(norm(mpn))) if h]
+        return min(hits, key=lambda h: h[0])[1] if hits else None
+
+    def lookup(self, item_id='', drawing='', mpn=''):
+        """Id first, then drawing number, then MPN."""
+        hit = self._by_id.get(normalize_item_id(item_id)) or self._by_dn.get(norm(drawing)) or self._by_mpn.get(norm(mpn))
+        return hit[1] if hit else None
@@ -0,0 +1,140 @@
+"""Minimal RFC 6902 (JSON Patch) applier for Project.data deltas.
+
+Operations are applied in place; callers are expected to discard the target
+document when ``JsonPatchError`` is raised (the project row is only saved after
+every operation succeeded).
+"""
+import copy
+
+_MISSING = object()
+
+MAX_PATCH_OPS = 5000
+
+
+class JsonPatchError(ValueError):
+    pass
+
+
+def _parse_pointer(pointer):
+    if not isinstance(pointer, str):
+        raise JsonPatchError('path must be a string')
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise JsonPatchError(f'invalid JSON pointer: {pointer!r}')
+    return [p.replace('~1', '/').replace('~0', '~') for p in pointer[1:].split('/')]
+
+
+def _list_index(container, token, *, allow_end=False):
+    if allow_end and token == '-':
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith('0')):
+        raise JsonPatchError(f'invalid array index: {token!r}')
+    idx = int(token)
+    upper = len(container) if allow_end else len(container) - 1
+    if idx > upper:
+        raise JsonPatchError(f'array index out of range: {token}')
+    return idx
+
+
+def _resolve_parent(doc, tokens):
+    if not tokens:
+        raise JsonPatchError('operation on document root is not allowed')
+    cur = doc
+    for token in tokens[:-1]:
+        if isinstance(cur, dict):
+            if token not in cur:
+                raise JsonPatchError(f'path not found: /{"/".join(tokens)}')
+            cur = cur[token]
+        elif isinstance(cur, list):
+            cur = cur[_list_index(cur, token)]
+        else:
+            raise JsonPatchError(f'path not found: /{"/".join(tokens)}')
+    return cur, tokens[-1]
+
+
+def _get(doc, tokens):
+    cur = doc
+    for token in tokens:
+        if isinstance(cur, dict):
+            if token not in cur:
+                raise JsonPatchError(f'path not found: /{"/".join(tokens)}')
+            cur = cur[token]
+        elif isinstance(cur, list):
+            cur = cur[_list_index(cur, token)]
+        else:
+            raise JsonPatchError(f'path not found: /{"/".join(tokens)}')
+    return cur
+
+
+def _add(doc, tokens, value):
+    parent, key = _resolve_parent(doc, tokens)
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, key, allow_end=True), value)
+    else:
+        raise JsonPatchError(f'cannot add to non-container at /{"/".join(tokens)}')
+
+
+def _remove(doc, tokens):
+    parent, key = _resolve_parent(doc, tokens)
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise JsonPatchError(f'path not found: /{"/".join(tokens)}')
+        return parent.pop(key)
+    if isinstance(parent, list):
+        return parent.pop(_list_index(parent, key))
+    raise JsonPatchError(f'path not found: /{"/".join(tokens)}')
+
+
+def _replace(doc, tokens, value):
+    parent, key = _resolve_parent(doc, tokens)
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise JsonPatchError(f'path not found: /{"/".join(tokens)}')
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent[_list_index(parent, key)] = value
+    else:
+        raise JsonPatchError(f'path not found: /{"/".join(tokens)}')
+
+
+def apply_patch(doc, ops):
+    """Apply JSON Patch ``ops`` to ``doc`` in place. Returns number of applied ops."""
+    if not isinstance(doc, dict):
+        raise JsonPatchError('target document must be an object')
+    if not isinstance(ops, list):
+        raise JsonPatchError('patch must be a list of operations')
+    if len(ops) > MAX_PATCH_OPS:
+        raise JsonPatchError(f'too many operations (max {MAX_PATCH_OPS})')
+    for idx, op in enumerate(ops):
+        if not isinstance(op, dict):
+            raise JsonPatchError(f'op {idx}: must be an object')
+        name = op.get('op')
+        try:
+            tokens = _parse_pointer(op.get('path'))
+            value = op.get('value', _MISSING)
+            if name in ('add', 'replace', 'test') and value is _MISSING:
+                raise JsonPatchError('missing value')
+            if name == 'add':
+                _add(doc, tokens, value)
+            elif name == 'remove':
+                _remove(doc, tokens)
+            elif name == 'replace':
+                _replace(doc, tokens, value)
+            elif name == 'move':
+                src = _parse_pointer(op.get('from'))
+                if tokens[:len(src)] == src and len(tokens) > len(src):
+                    raise JsonPatchError('cannot move a value into one of its children')
+                _add(doc, tokens, _remove(doc, src))
+            elif name == 'copy':
+                _add(doc, tokens, copy.deepcopy(_get(doc, _parse_pointer(op.get('from')))))
+            elif name == 'test':
+                if _get(doc, tokens) != value:
+                    raise JsonPatchError('test failed')
+            else:
+                raise JsonPatchError(f'unsupported op {name!r}')
+        except JsonPatchError as e:
+            raise JsonPatchError(f'op {idx} ({name} {op.get("path")}): {e}') from None
+    return len(ops)
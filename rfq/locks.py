@@ -0,0 +1,206 @@
+"""Edit-lock (lease) backends behind ``/api/locks/*``.
+
+``RFQ_LOCK_BACKEND`` picks where leases live:
+
+- ``db`` (default): the ``EditLock`` table (unique ``resource_key``, indexed
+  ``expires_at``). Acquire locks the row; renewing any number of leases is
+  one read plus one conditional ``UPDATE`` with no row locks, and a second
+  read only when the ``UPDATE`` missed leases lost in between.
+- ``memory``: a per-process lease table. No database writes at all, but only
+  correct when a single process serves the API (e.g. one ASGI worker).
+
+Both return lease objects with ``EditLock``'s attribute names
+(``resource_key``, ``company_id``, ``project_id``, ``locked_by_id``,
+``locked_by_display``, ``context``, ``expires_at``) and both publish the same
+``lock`` change events. Renewals never do: owners do not change.
+"""
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .change_events import publish
+from .models import ChangeEvent, EditLock
+
+# Resource keys accepted by one /api/locks/heartbeat_batch call.
+MAX_BATCH_KEYS = 100
+
+
+def lock_event(lock, locked):
+    publish(
+        lock.company_id, ChangeEvent.KIND_LOCK, lock.project_id or '',
+        resource_key=lock.resource_key, locked=locked,
+        owner={'user_id': lock.locked_by_id, 'display': lock.locked_by_display} if locked else None,
+        expires_at=lock.expires_at.isoformat() if locked and lock.expires_at else None,
+    )
+
+
+def _renew_result(lease, user_id, now):
+    if lease is None:
+        return {'renewed': False, 'reason': 'missing'}
+    if lease.expires_at <= now:
+        return {'renewed': False, 'reason': 'expired'}
+    if lease.locked_by_id != user_id:
+        return {'renewed': False, 'reason': 'owner_mismatch'}
+    return None
+
+
+class DatabaseLockBackend:
+    def acquire(self, resource_key, *, company_id, project_id, user_id, display, context, expires_at):
+        now = timezone.now()
+        with transaction.atomic():
+            lock = EditLock.objects.select_for_update().filter(resource_key=resource_key).first()
+            if lock and lock.expires_at > now and lock.locked_by_id != user_id:
+                return lock, False
+            if not lock:
+                lock = EditLock(resource_key=resource_key)
+            lock.company_id = company_id if company_id else lock.company_id
+            lock.project_id = project_id
+            lock.locked_by_id = user_id
+            lock.locked_by_display = display
+            lock.context = context
+            lock.expires_at = expires_at
+            lock.save()
+        return lock, True
+
+    def renew(self, resource_keys, user_id, expires_at):
+        now = timezone.now()
+        leases = {l.resource_key: l for l in EditLock.objects.filter(resource_key__in=resource_keys)}
+        results = {key: _renew_result(leases.get(key), user_id, now) for key in resource_keys}
+        renewable = [key for key, res in results.items() if res is None]
+        if not renewable:
+            return results
+        # The owner / expiry conditions are repeated so a lease taken over meanwhile is left alone.
+        updated = EditLock.objects.filter(resource_key__in=renewable, locked_by_id=user_id, expires_at__gt=now).update(
+            expires_at=expires_at, updated_at=now,
+        )
+        missed = {}
+        if updated != len(renewable):
+            # Some leases changed hands or expired between the read and the update; find out which.
+            current = {l.resource_key: l for l in EditLock.objects.filter(resource_key__in=renewable)}
+            for key in renewable:
+                lease = current.get(key)
+                if lease is None or lease.locked_by_id != user_id or lease.expires_at < expires_at:
+                    missed[key] = _renew_result(lease, user_id, now) or {'renewed': False, 'reason': 'expired'}
+        for key in renewable:
+            results[key] = missed.get(key) or {'renewed': True, 'expires_at': expires_at.isoformat()}
+        return results
+
+    def release(self, resource_key, *, user_id=None, company_id=None):
+        q = EditLock.objects.filter(resource_key=resource_key)
+        if user_id is not None:
+            q = q.filter(locked_by_id=user_id)
+        if company_id is not None:
+            q = q.filter(company_id=company_id)
+        deleted, _ = q.delete()
+        return bool(deleted)
+
+    def active(self, resource_key):
+        now = timezone.now()
+        return EditLock.objects.filter(resource_key=resource_key, expires_at__gt=now).order_by('-expires_at', '-updated_at').first()
+
+    def foreign_project_lock(self, project_id, user_id):
+        q = EditLock.objects.filter(project_id=project_id, expires_at__gt=timezone.now())
+        if user_id:
+            q = q.exclude(locked_by_id=user_id)
+        return q.order_by('expires_at').first()
+
+    def active_leases(self, company_id=None, limit=200):
+        q = EditLock.objects.filter(expires_at__gt=timezone.now())
+        if company_id is not None:
+            q = q.filter(company_id=company_id)
+        return list(q.order_by('expires_at')[:limit])
+
+
+class Lease:
+    __slots__ = ('resource_key', 'company_id', 'project_id', 'locked_by_id', 'locked_by_display', 'context', 'expires_at')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+
+class MemoryLockBackend:
+    def __init__(self):
+        self._leases = {}
+        self._mutex = threading.Lock()
+
+    def _live(self, now):
+        # Expired leases are dropped lazily, whenever the table is scanned.
+        for key in [k for k, l in self._leases.items() if l.expires_at <= now]:
+            del self._leases[key]
+        return self._leases.values()
+
+    def acquire(self, resource_key, *, company_id, project_id, user_id, display, context, expires_at):
+        now = timezone.now()
+        with self._mutex:
+            lease = self._leases.get(resource_key)
+            if lease and lease.expires_at > now and lease.locked_by_id != user_id:
+                return lease, False
+            lease = Lease(
+                resource_key=resource_key, company_id=company_id or getattr(lease, 'company_id', None),
+                project_id=project_id, locked_by_id=user_id, locked_by_display=display, context=context, expires_at=expires_at,
+            )
+            self._leases[resource_key] = lease
+        lock_event(lease, True)
+        return lease, True
+
+    def renew(self, resource_keys, user_id, expires_at):
+        now = timezone.now()
+        results = {}
+        with self._mutex:
+            for key in resource_keys:
+                lease = self._leases.get(key)
+                results[key] = _renew_result(lease, user_id, now)
+                if results[key] is None:
+                    lease.expires_at = expires_at
+                    results[key] = {'renewed': True, 'expires_at': expires_at.isoformat()}
+        return results
+
+    def release(self, resource_key, *, user_id=None, company_id=None):
+        with self._mutex:
+            lease = self._leases.get(resource_key)
+            if lease is None:
+                return False
+            if user_id is not None and lease.locked_by_id != user_id:
+                return False
+            if company_id is not None and lease.company_id != company_id:
+                return False
+            del self._leases[resource_key]
+        lock_event(lease, False)
+        return True
+
+    def active(self, resource_key):
+        lease = self._leases.get(resource_key)
+        return lease if lease and lease.expires_at > timezone.now() else None
+
+    def foreign_project_lock(self, project_id, user_id):
+        with self._mutex:
+            held = [l for l in self._live(timezone.now()) if l.project_id == project_id and (not user_id or l.locked_by_id != user_id)]
+        return min(held, key=lambda l: l.expires_at) if held else None
+
+    def active_leases(self, company_id=None, limit=200):
+        with self._mutex:
+            leases = [l for l in self._live(timezone.now()) if company_id is None or l.company_id == company_id]
+        return sorted(leases, key=lambda l: l.expires_at)[:limit]
+
+
+_BACKENDS = {'db': DatabaseLockBackend, 'memory': MemoryLockBackend}
+_instances = {}
+_instances_mutex = threading.Lock()
+
+
+def get_backend():
+    name = str(getattr(settings, 'RFQ_LOCK_BACKEND', 'db') or 'db').strip().lower()
+    if name not in _BACKENDS:
+        name = 'db'
+    with _instances_mutex:
+        if name not in _instances:
+            _instances[name] = _BACKENDS[name]()
+        return _instances[name]
+
+
+def lease_expiry(ttl_sec, now=None):
+    return (now or timezone.now()) + timedelta(seconds=ttl_sec)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from rfq.audit_archive import archive_expired
+
+
+class Command(BaseCommand):
+    help = 'Archive audit log entries older than their retention window to MEDIA_ROOT/audit_archive and delete them.'
+
+    def handle(self, *args, **options):
+        rows, files = archive_expired()
+        self.stdout.write(f'Archived {rows} audit entr{"y" if rows == 1 else "ies"} into {files} file(s).')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from rfq.export_jobs import cleanup_expired_jobs
+
+
+class Command(BaseCommand):
+    help = 'Delete expired export jobs and their files under MEDIA_ROOT/exports.'
+
+    def handle(self, *args, **options):
+        removed = cleanup_expired_jobs()
+        self.stdout.write(f'Removed {removed} expired export job(s).')
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from rfq.round_snapshots import compact_legacy_rounds, prune_unreferenced
+
+
+class Command(BaseCommand):
+    help = 'Move inline supplier round snapshots into compressed shared rows and drop unreferenced ones.'
+
+    def handle(self, *args, **options):
+        moved = compact_legacy_rounds()
+        pruned = prune_unreferenced()
+        self.stdout.write(f'Compacted {moved} round(s); removed {pruned} unreferenced snapshot(s).')
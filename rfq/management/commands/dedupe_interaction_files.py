@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from rfq.file_store import migrate_legacy_file
+from rfq.models import SupplierInteractionFile
+
+
+class Command(BaseCommand):
+    help = 'Move supplier interaction files uploaded before the content-addressed store onto shared blobs.'
+
+    def handle(self, *args, **options):
+        moved = missing = 0
+        legacy = SupplierInteractionFile.objects.filter(blob__isnull=True).exclude(file='')
+        for row in legacy.iterator():
+            if migrate_legacy_file(row):
+                moved += 1
+            else:
+                missing += 1
+        self.stdout.write(f'Moved {moved} file(s) onto shared blobs; {missing} missing on disk.')
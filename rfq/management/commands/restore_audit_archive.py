@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from rfq.audit_archive import restore_archive
+from rfq.models import AuditArchive
+
+
+class Command(BaseCommand):
+    help = 'Restore archived audit log entries back into the audit log table (or list archives with --list).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archive_ids', nargs='*', type=int)
+        parser.add_argument('--list', action='store_true', help='List archives instead of restoring.')
+
+    def handle(self, *args, **options):
+        if options['list'] or not options['archive_ids']:
+            for a in AuditArchive.objects.order_by('company_id', 'first_at'):
+                self.stdout.write(f'{a.id}\tcompany={a.company_id or "-"}\t{a.first_at:%Y-%m-%d} .. {a.last_at:%Y-%m-%d}\t{a.row_count} rows\t{a.file.name}')
+            return
+        for archive_id in options['archive_ids']:
+            archive = AuditArchive.objects.filter(id=archive_id).first()
+            if archive is None:
+                raise CommandError(f'Audit archive {archive_id} not found')
+            try:
+                restored = restore_archive(archive)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(f'Restored {restored} audit entr{"y" if restored == 1 else "ies"} from archive {archive_id}.')
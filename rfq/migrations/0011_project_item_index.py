@@ -0,0 +1,87 @@
+# Generated by Django 5.2.9 on 2026-10-18 04:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfq', '0010_company_address_line1_company_address_line2_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('item_id', models.CharField(blank=True, default='', max_length=255)),
+                ('item_key', models.CharField(blank=True, default='', max_length=255)),
+                ('drawing_no', models.CharField(blank=True, default='', max_length=255)),
+                ('drawing_no_norm', models.CharField(blank=True, db_index=True, default='', max_length=255)),
+                ('drawing_no_alt_norm', models.CharField(blank=True, default='', max_length=255)),
+                ('mpn', models.CharField(blank=True, default='', max_length=255)),
+                ('mpn_norm', models.CharField(blank=True, db_index=True, default='', max_length=255)),
+                ('manufacturer', models.CharField(blank=True, default='', max_length=255)),
+                ('description', models.TextField(blank=True, default='')),
+                ('main_supplier_norm', models.CharField(blank=True, default='', max_length=255)),
+                ('row_hash', models.CharField(blank=True, default='', max_length=40)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_items', to='rfq.company')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_rows', to='rfq.project')),
+            ],
+            options={
+                'ordering': ['project', 'position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ItemSupplierQuote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('supplier_position', models.PositiveIntegerField(default=0)),
+                ('supplier_name', models.CharField(blank=True, default='', max_length=255)),
+                ('supplier_name_norm', models.CharField(blank=True, db_index=True, default='', max_length=255)),
+                ('alt_name_norm', models.CharField(blank=True, default='', max_length=255)),
+                ('is_main', models.BooleanField(default=False)),
+                ('is_quoted', models.BooleanField(default=False)),
+                ('price', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('currency', models.CharField(blank=True, default='', max_length=16)),
+                ('status', models.CharField(blank=True, default='', max_length=64)),
+                ('quote_id', models.CharField(blank=True, default='', max_length=64)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_supplier_quotes', to='rfq.company')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_supplier_quotes', to='rfq.project')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='supplier_quotes', to='rfq.projectitem')),
+            ],
+            options={
+                'ordering': ['item', 'supplier_position'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='projectitem',
+            index=models.Index(fields=['project', 'item_id'], name='rfq_project_project_cafbc2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectitem',
+            index=models.Index(fields=['project', 'item_key'], name='rfq_project_project_3f3dcf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectitem',
+            index=models.Index(fields=['project', 'drawing_no_norm'], name='rfq_project_project_c5a417_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectitem',
+            index=models.Index(fields=['project', 'mpn_norm'], name='rfq_project_project_368828_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectitem',
+            index=models.Index(fields=['project', 'main_supplier_norm'], name='rfq_project_project_9c42bd_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='projectitem',
+            unique_together={('project', 'position')},
+        ),
+        migrations.AddIndex(
+            model_name='itemsupplierquote',
+            index=models.Index(fields=['project', 'supplier_name_norm'], name='rfq_itemsup_project_429983_idx'),
+        ),
+    ]
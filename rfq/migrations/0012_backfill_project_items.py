@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+def forwards(apps, schema_editor):
+    from rfq.item_index import BULK_BATCH_SIZE, build_item_rows
+
+    Project = apps.get_model('rfq', 'Project')
+    ProjectItem = apps.get_model('rfq', 'ProjectItem')
+    ItemSupplierQuote = apps.get_model('rfq', 'ItemSupplierQuote')
+
+    for project in Project.objects.all().iterator(chunk_size=50):
+        rows = list(build_item_rows(project.data))
+        items = ProjectItem.objects.bulk_create(
+            [
+                ProjectItem(company_id=project.company_id, project_id=project.id, position=pos, row_hash=digest, **fields)
+                for pos, fields, _sups, digest in rows
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        sups = [
+            ItemSupplierQuote(company_id=project.company_id, project_id=project.id, item_id=item.pk, **s)
+            for item, (_pos, _fields, sup_rows, _digest) in zip(items, rows)
+            for s in sup_rows
+        ]
+        if sups:
+            ItemSupplierQuote.objects.bulk_create(sups, batch_size=BULK_BATCH_SIZE)
+
+
+def backwards(apps, schema_editor):
+    # Index rows are dropped together with their tables.
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfq', '0011_project_item_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
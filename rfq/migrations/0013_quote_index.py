@@ -0,0 +1,36 @@
+# Generated by Django 5.2.9 on 2026-10-18 04:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfq', '0012_backfill_project_items'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuoteIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_type', models.CharField(max_length=16)),
+                ('source_pk', models.CharField(max_length=64)),
+                ('supplier_name', models.CharField(blank=True, default='', max_length=255)),
+                ('project_name', models.CharField(blank=True, default='', max_length=255)),
+                ('quote_number', models.CharField(blank=True, default='', max_length=128)),
+                ('received_from', models.CharField(blank=True, default='', max_length=255)),
+                ('status', models.CharField(blank=True, default='', max_length=32)),
+                ('create_date', models.DateTimeField(blank=True, null=True)),
+                ('expire_date', models.DateField(blank=True, null=True)),
+                ('valid_until', models.DateTimeField(blank=True, null=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quote_index_rows', to='rfq.company')),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='quote_index_rows', to='rfq.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', '-create_date', '-id'], name='rfq_quotein_company_701827_idx'), models.Index(fields=['project', '-create_date', '-id'], name='rfq_quotein_project_968194_idx')],
+                'unique_together': {('source_type', 'source_pk')},
+            },
+        ),
+    ]
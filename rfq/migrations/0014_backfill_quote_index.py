@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def forwards(apps, schema_editor):
+    from rfq.quote_index import portal_row_fields, quote_row_fields
+
+    Quote = apps.get_model('rfq', 'Quote')
+    SupplierAccess = apps.get_model('rfq', 'SupplierAccess')
+    QuoteIndex = apps.get_model('rfq', 'QuoteIndex')
+
+    rows = [QuoteIndex(source_type='manual', source_pk=q.pk, **quote_row_fields(q)) for q in Quote.objects.all().iterator()]
+    rows += [QuoteIndex(source_type='portal', source_pk=a.pk, **portal_row_fields(a)) for a in SupplierAccess.objects.all().iterator()]
+    QuoteIndex.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+
+
+def backwards(apps, schema_editor):
+    # Index rows are dropped together with their table.
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfq', '0013_quote_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-18 04:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfq', '0015_export_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=32)),
+                ('project_id', models.CharField(blank=True, default='', max_length=64)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='change_events', to='rfq.company')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'id'], name='rfq_changee_company_ab3caa_idx')],
+            },
+        ),
+    ]
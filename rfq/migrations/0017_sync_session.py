@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-18 04:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfq', '0016_change_event'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncSession',
+            fields=[
+                ('id', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('committed', 'Committed')], default='open', max_length=16)),
+                ('full_replace', models.BooleanField(default=False)),
+                ('total_chunks', models.IntegerField(blank=True, null=True)),
+                ('incoming_ids', models.JSONField(blank=True, default=list)),
+                ('chunks', models.JSONField(blank=True, default=dict)),
+                ('deleted', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_sessions', to='rfq.company')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfq', '0017_sync_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supplieraccess',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfq', '0018_supplieraccess_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(upload_to='blobs/')),
+                ('size', models.BigIntegerField(default=0)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='supplierinteractionfile',
+            name='file',
+            field=models.FileField(blank=True, upload_to='interaction_files/%Y/%m/'),
+        ),
+        migrations.AddField(
+            model_name='supplierinteractionfile',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='interaction_files', to='rfq.storedblob'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfq', '0019_stored_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoundSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('data', models.BinaryField()),
+                ('raw_size', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='supplieraccessround',
+            name='requested_snapshot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='rfq.roundsnapshot'),
+        ),
+        migrations.AddField(
+            model_name='supplieraccessround',
+            name='submission_snapshot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='rfq.roundsnapshot'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfq', '0021_auditlog_created_at_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['company', '-created_at', '-id'], name='rfq_auditlo_company_f38a46_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['company', 'action', '-created_at'], name='rfq_auditlo_company_d50d0e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['company', 'entity_type', 'entity_id'], name='rfq_auditlo_company_e50b22_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['project', '-created_at', '-id'], name='rfq_auditlo_project_d45caa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['actor', '-created_at'], name='rfq_auditlo_actor_i_3e8823_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# (model, JSON column, index name). GIN indexes serve jsonb containment (@>)
+# and key-existence (?) lookups; other databases have no equivalent and skip this.
+GIN_INDEXES = [
+    ('Project', 'data', 'rfq_project_data_gin'),
+    ('SupplierAccess', 'submission_data', 'rfq_supplieraccess_subm_gin'),
+    ('AuditLog', 'metadata_json', 'rfq_auditlog_metadata_gin'),
+]
+
+
+def create_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    qn = schema_editor.quote_name
+    for model_name, column, index_name in GIN_INDEXES:
+        table = apps.get_model('rfq', model_name)._meta.db_table
+        # CONCURRENTLY keeps the tables writable while large ones are indexed.
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {qn(index_name)} ON {qn(table)} USING gin ({qn(column)})'
+        )
+
+
+def drop_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for _model_name, _column, index_name in GIN_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(index_name)}')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('rfq', '0023_audit_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_gin_indexes, drop_gin_indexes),
+    ]
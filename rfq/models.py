@@ -1,5 +1,8 @@
+import json
+import zlib
+
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 
@@ -18,6 +21,8 @@ class Company(models.Model):
     postal_code = models.CharField(max_length=32, blank=True, default='')
     country = models.CharField(max_length=128, blank=True, default='')
     is_active = models.BooleanField(default=True)
+    # Days audit entries stay in AuditLog before being archived; None uses RFQ_AUDIT_RETENTION_DAYS.
+    audit_retention_days = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -73,7 +78,12 @@ class Project(models.Model):
             self.name = str(self.data.get('name'))[:255]
         else:
             self.data['name'] = self.name
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or 'data' in update_fields:
+                from .item_index import sync_project_items
+                sync_project_items(self)
 
     def as_dict(self):
         # Return the stored JSON blob; inject server timestamps for convenience.
@@ -90,6 +100,60 @@ class Project(models.Model):
         ordering = ['-updated_at']
 
 
+class ProjectItem(models.Model):
+    """Indexed shadow of one entry in Project.data['items'] (rebuilt on Project.save)."""
+
+    company = models.ForeignKey('Company', on_delete=models.CASCADE, related_name='project_items')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='item_rows')
+    position = models.PositiveIntegerField()  # index into data['items']
+    item_id = models.CharField(max_length=255, blank=True, default='')
+    item_key = models.CharField(max_length=255, blank=True, default='')
+    drawing_no = models.CharField(max_length=255, blank=True, default='')
+    drawing_no_norm = models.CharField(max_length=255, blank=True, default='', db_index=True)
+    drawing_no_alt_norm = models.CharField(max_length=255, blank=True, default='')
+    mpn = models.CharField(max_length=255, blank=True, default='')
+    mpn_norm = models.CharField(max_length=255, blank=True, default='', db_index=True)
+    manufacturer = models.CharField(max_length=255, blank=True, default='')
+    description = models.TextField(blank=True, default='')
+    main_supplier_norm = models.CharField(max_length=255, blank=True, default='')
+    row_hash = models.CharField(max_length=40, blank=True, default='')
+
+    class Meta:
+        ordering = ['project', 'position']
+        unique_together = [('project', 'position')]
+        indexes = [
+            models.Index(fields=['project', 'item_id']),
+            models.Index(fields=['project', 'item_key']),
+            models.Index(fields=['project', 'drawing_no_norm']),
+            models.Index(fields=['project', 'mpn_norm']),
+            models.Index(fields=['project', 'main_supplier_norm']),
+        ]
+
+
+class ItemSupplierQuote(models.Model):
+    """Indexed shadow of one entry in an item's nested 'suppliers' list."""
+
+    company = models.ForeignKey('Company', on_delete=models.CASCADE, related_name='item_supplier_quotes')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='item_supplier_quotes')
+    item = models.ForeignKey(ProjectItem, on_delete=models.CASCADE, related_name='supplier_quotes')
+    supplier_position = models.PositiveIntegerField(default=0)
+    supplier_name = models.CharField(max_length=255, blank=True, default='')
+    supplier_name_norm = models.CharField(max_length=255, blank=True, default='', db_index=True)
+    alt_name_norm = models.CharField(max_length=255, blank=True, default='')
+    is_main = models.BooleanField(default=False)
+    is_quoted = models.BooleanField(default=False)
+    price = models.DecimalField(max_digits=20, decimal_places=4, null=True, blank=True)
+    currency = models.CharField(max_length=16, blank=True, default='')
+    status = models.CharField(max_length=64, blank=True, default='')
+    quote_id = models.CharField(max_length=64, blank=True, default='')
+
+    class Meta:
+        ordering = ['item', 'supplier_position']
+        indexes = [
+            models.Index(fields=['project', 'supplier_name_norm']),
+        ]
+
+
 class Attachment(models.Model):
     """File attachment linked to a project (project detail page)."""
 
@@ -113,7 +177,8 @@ class Attachment(models.Model):
             'id': self.id,
             'project_id': self.project_id,
             'filename': self.file.name.split('/')[-1] if self.file else '',
-            'url': self.file.url if self.file else '',
+            # Served through the permission-checked API view, not straight from MEDIA_URL.
+            'url': f'/api/projects/{self.project_id}/attachments/{self.id}' if self.file else '',
             'kind': self.kind or '',
             'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else '',
             'size': getattr(self.file, 'size', None),
@@ -150,6 +215,7 @@ class SupplierAccess(models.Model):
     
     # Timestamps & Meta
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     viewed_at = models.DateTimeField(null=True, blank=True)
     replied_at = models.DateTimeField(null=True, blank=True) # kept for backward compat, same as submitted_at
     submitted_at = models.DateTimeField(null=True, blank=True)
@@ -169,6 +235,10 @@ class SupplierAccess(models.Model):
                 self.company_id = self.project.company_id
             else:
                 self.company_id = get_default_company_id()
+        # updated_at versions the cached portal page, so partial saves bump it too.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'updated_at' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'updated_at']
         super().save(*args, **kwargs)
 
     @property
@@ -215,6 +285,17 @@ class SupplierAccess(models.Model):
         ordering = ['-created_at']
 
 
+class RoundSnapshot(models.Model):
+    """zlib-compressed canonical JSON, stored once per content hash and shared by rounds."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    data = models.BinaryField()
+    raw_size = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def load(self):
+        return json.loads(zlib.decompress(bytes(self.data)).decode('utf-8'))
+
+
 class SupplierAccessRound(models.Model):
     """
     Append-only history of negotiation rounds. 
@@ -223,8 +304,11 @@ class SupplierAccessRound(models.Model):
     company = models.ForeignKey('Company', on_delete=models.CASCADE, related_name='supplier_access_rounds')
     supplier_access = models.ForeignKey(SupplierAccess, on_delete=models.CASCADE, related_name='rounds')
     round = models.IntegerField()
+    # Legacy inline snapshots; new rounds leave these empty and reference shared RoundSnapshot rows.
     requested_items = models.JSONField(default=list) # Snapshot of what was asked
     submission_data = models.JSONField(default=dict) # Snapshot of what was submitted
+    requested_snapshot = models.ForeignKey(RoundSnapshot, null=True, blank=True, on_delete=models.PROTECT, related_name='+')
+    submission_snapshot = models.ForeignKey(RoundSnapshot, null=True, blank=True, on_delete=models.PROTECT, related_name='+')
     submitted_at = models.DateTimeField(null=True, blank=True)
     
     # Decision Metadata
@@ -240,17 +324,34 @@ class SupplierAccessRound(models.Model):
             else:
                 self.company_id = get_default_company_id()
         super().save(*args, **kwargs)
+
+    def get_requested_items(self):
+        return self.requested_snapshot.load() if self.requested_snapshot_id else (self.requested_items or [])
+
+    def get_submission_data(self):
+        return self.submission_snapshot.load() if self.submission_snapshot_id else (self.submission_data or {})
     
     class Meta:
         ordering = ['round']
 
 
+class StoredBlob(models.Model):
+    """Content-addressed file body, shared by every upload with the same SHA-256."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='blobs/')
+    size = models.BigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
 class SupplierInteractionFile(models.Model):
     """Secure file uploads linked to a specific round."""
     company = models.ForeignKey('Company', on_delete=models.CASCADE, related_name='supplier_interaction_files')
     supplier_access = models.ForeignKey(SupplierAccess, on_delete=models.CASCADE, related_name='files')
     round = models.IntegerField()
-    file = models.FileField(upload_to='interaction_files/%Y/%m/')
+    # Legacy per-upload copy; new uploads reference a shared ``blob`` instead.
+    file = models.FileField(upload_to='interaction_files/%Y/%m/', blank=True)
+    blob = models.ForeignKey(StoredBlob, null=True, blank=True, on_delete=models.PROTECT, related_name='interaction_files')
     original_name = models.CharField(max_length=255)
     size = models.IntegerField(default=0)
     uploaded_by = models.CharField(max_length=50) # 'supplier' or 'buyer'
@@ -264,12 +365,17 @@ class SupplierInteractionFile(models.Model):
                 self.company_id = get_default_company_id()
         super().save(*args, **kwargs)
 
+    @property
+    def stored_file(self):
+        return self.blob.file if self.blob_id else self.file
+
     def as_dict(self):
+        stored = self.stored_file
         return {
             'id': self.id,
             'name': self.original_name,
             'size': self.size,
-            'url': self.file.url if self.file else '',
+            'url': stored.url if stored else '',
             'uploaded_at': self.uploaded_at.isoformat(),
             'uploaded_by': self.uploaded_by
         }
@@ -388,7 +494,8 @@ class Quote(models.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'source': self.source,
             'source_id': self.source_id,
-            'lines_count': self.lines.count(),
+            # quotes_list annotates num_lines for a whole page in one query.
+            'lines_count': self.num_lines if hasattr(self, 'num_lines') else self.lines.count(),
         }
 
     class Meta:
@@ -486,6 +593,33 @@ class QuoteLine(models.Model):
         ordering = ['line_number', 'id']
 
 
+class QuoteIndex(models.Model):
+    """Denormalized listing row per manual Quote / portal SupplierAccess (kept in sync by rfq.signals)."""
+
+    SOURCE_MANUAL = 'manual'
+    SOURCE_PORTAL = 'portal'
+
+    company = models.ForeignKey('Company', on_delete=models.CASCADE, related_name='quote_index_rows')
+    project = models.ForeignKey(Project, on_delete=models.SET_NULL, null=True, blank=True, related_name='quote_index_rows')
+    source_type = models.CharField(max_length=16)
+    source_pk = models.CharField(max_length=64)
+    supplier_name = models.CharField(max_length=255, blank=True, default='')
+    project_name = models.CharField(max_length=255, blank=True, default='')
+    quote_number = models.CharField(max_length=128, blank=True, default='')
+    received_from = models.CharField(max_length=255, blank=True, default='')
+    status = models.CharField(max_length=32, blank=True, default='')
+    create_date = models.DateTimeField(null=True, blank=True)
+    expire_date = models.DateField(null=True, blank=True)
+    valid_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = [('source_type', 'source_pk')]
+        indexes = [
+            models.Index(fields=['company', '-create_date', '-id']),
+            models.Index(fields=['project', '-create_date', '-id']),
+        ]
+
+
 class ProjectAccess(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='access_entries')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='project_access_entries')
@@ -522,7 +656,153 @@ class AuditLog(models.Model):
     metadata_json = models.JSONField(default=dict, blank=True)
     ip = models.CharField(max_length=64, blank=True, default='')
     user_agent = models.CharField(max_length=255, blank=True, default='')
-    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Set when the entry is queued, not when its batch is written (see audit_writer).
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        # Admin list / export filters (see audit_query): each one is exact or a
+        # prefix and the result is ordered by (-created_at, -id).
+        indexes = [
+            models.Index(fields=['company', '-created_at', '-id']),
+            models.Index(fields=['company', 'action', '-created_at']),
+            models.Index(fields=['company', 'entity_type', 'entity_id']),
+            models.Index(fields=['project', '-created_at', '-id']),
+            models.Index(fields=['actor', '-created_at']),
+        ]
+
+
+class AuditArchive(models.Model):
+    """Gzipped NDJSON file of ``AuditLog`` rows moved out of the table (see ``audit_archive``)."""
+    company = models.ForeignKey('Company', on_delete=models.SET_NULL, null=True, blank=True, related_name='audit_archives')
+    file = models.FileField(upload_to='audit_archive/')
+    sha256 = models.CharField(max_length=64)
+    row_count = models.PositiveIntegerField(default=0)
+    first_at = models.DateTimeField()
+    last_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']
+
+
+class ExportJob(models.Model):
+    """Background ``/api/export`` run; the rendered file is kept until ``expires_at``."""
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.CharField(primary_key=True, max_length=64)
+    company = models.ForeignKey('Company', on_delete=models.CASCADE, related_name='export_jobs')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='export_jobs')
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    format = models.CharField(max_length=8, default='xlsx')
+    options = models.JSONField(default=dict, blank=True)
+    progress = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    file = models.FileField(upload_to='exports/%Y/%m/', null=True, blank=True)
+    size = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'format': self.format,
+            'progress': self.progress,
+            'total': self.total,
+            'size': self.size,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'download_url': f'/api/export/jobs/{self.id}/download' if self.status == self.STATUS_DONE else '',
+        }
+
+
+class SyncSession(models.Model):
+    """Chunked ``/api/projects/sync`` upload; chunk results are kept so a client can resume."""
+
+    STATUS_OPEN = 'open'
+    STATUS_COMMITTED = 'committed'
+
+    STATUS_CHOICES = [
+        (STATUS_OPEN, 'Open'),
+        (STATUS_COMMITTED, 'Committed'),
+    ]
+
+    id = models.CharField(primary_key=True, max_length=64)
+    company = models.ForeignKey('Company', on_delete=models.CASCADE, related_name='sync_sessions')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sync_sessions')
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_OPEN)
+    full_replace = models.BooleanField(default=False)
+    total_chunks = models.IntegerField(null=True, blank=True)
+    # Project ids seen across all chunks (full_replace prunes everything else on commit).
+    incoming_ids = models.JSONField(default=list, blank=True)
+    # {"<seq>": {"results": [...], "upserted": n, "skipped": n, "conflicts": n}}
+    chunks = models.JSONField(default=dict, blank=True)
+    deleted = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def totals(self):
+        out = {'upserted': 0, 'skipped': 0, 'conflicts': 0}
+        for chunk in (self.chunks or {}).values():
+            for key in out:
+                out[key] += int(chunk.get(key) or 0)
+        return out
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'full_replace': self.full_replace,
+            'total_chunks': self.total_chunks,
+            'received_chunks': sorted(int(k) for k in (self.chunks or {})),
+            'deleted': self.deleted,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            **self.totals(),
+        }
+
+
+class ChangeEvent(models.Model):
+    """Per-company change feed read by ``/api/events`` (ids double as SSE event ids)."""
+
+    KIND_PROJECT = 'project'
+    KIND_PROJECT_DELETED = 'project_deleted'
+    KIND_LOCK = 'lock'
+    KIND_SUPPLIER_ACCESS = 'supplier_access'
+
+    company = models.ForeignKey('Company', on_delete=models.CASCADE, related_name='change_events')
+    kind = models.CharField(max_length=32)
+    project_id = models.CharField(max_length=64, blank=True, default='')
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['company', 'id'])]
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'project_id': self.project_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            **(self.payload or {}),
+        }
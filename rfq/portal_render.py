@@ -0,0 +1,170 @@
+"""Cached rendering of the supplier portal page.
+
+The portal page is a pure function of the access row and its project's name,
+so the rendered HTML is cached under a key built from the access id, round and
+``updated_at`` (plus the project's ``updated_at``). Any save bumps
+``updated_at`` and therefore moves the page to a fresh key; stale entries just
+age out. The CSRF token is the only per-visitor part of the page: it is
+rendered as a placeholder and swapped in on every hit.
+
+The same version doubles as the page's ETag / Last-Modified, so a supplier
+re-opening an unchanged link gets a 304 without the page being rendered.
+"""
+import copy
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+
+TEMPLATE = 'rfq/supplier_portal.html'
+_CSRF_PLACEHOLDER = '__rfq_portal_csrf_token__'
+
+
+def _cache_ttl():
+    return int(getattr(settings, 'RFQ_PORTAL_CACHE_TTL', 3600))
+
+
+def merge_submitted_values(items, submission):
+    """Merge submitted values back into items for read-only display."""
+    if not submission.get('items'):
+        return
+    sub_by_id = {}
+    sub_by_drawing = {}
+    sub_by_mpn = {}
+    for si in submission['items']:
+        if not isinstance(si, dict):
+            continue
+        if si.get('id'):
+            sub_by_id[str(si['id'])] = si
+        drawing = si.get('item_drawing_no') or si.get('drawing_no')
+        if drawing:
+            sub_by_drawing[str(drawing)] = si
+        if si.get('mpn'):
+            sub_by_mpn[str(si['mpn'])] = si
+    for item in items:
+        sub = None
+        item_id = item.get('id')
+        if item_id:
+            sub = sub_by_id.get(str(item_id))
+        if not sub:
+            drawing = item.get('item_drawing_no') or item.get('drawing_no') or ''
+            if drawing:
+                sub = sub_by_drawing.get(str(drawing))
+        if not sub:
+            mpn = item.get('mpn') or ''
+            if mpn:
+                sub = sub_by_mpn.get(str(mpn))
+        if sub:
+            item['submitted_price'] = sub.get('price', '')
+            # Dynamic price tiers (2..10)
+            for i in range(2, 11):
+                item[f'submitted_price_{i}'] = sub.get(f'price_{i}', '')
+            item['submitted_moq'] = sub.get('moq', '')
+            item['submitted_lead_time'] = sub.get('lead_time', '')
+            item['submitted_no_bid'] = sub.get('no_bid', False)
+            item['submitted_no_bid_reason'] = sub.get('no_bid_reason', '')
+
+
+def portal_context(access):
+    """Template context (view model) for one access, without request-bound values."""
+    # Cancelled portal
+    if access.status == 'expired':
+        return {
+            'access': access,
+            'token': access.id,
+            'items': [],
+            'updated_items': [],
+            'project': access.project,
+            'supplier_name': access.supplier_name,
+            'submission': {},
+            'is_cancelled': True,
+        }
+
+    all_items = copy.deepcopy(access.requested_items or [])
+    submission = access.submission_data or {}
+    merge_submitted_values(all_items, submission)
+
+    # Compute dynamic qty tiers across ALL items
+    max_tiers = 0
+    for item in all_items:
+        for i in range(1, 11):
+            val = item.get(f'qty_{i}')
+            if val is not None and str(val).strip():
+                max_tiers = max(max_tiers, i)
+
+    # Build generic tier header labels (qty varies per item, so header is generic)
+    qty_tiers = []
+    for i in range(1, max_tiers + 1):
+        label = f'Price (Tier {i})'
+        qty_tiers.append({'index': i, 'label': label})
+
+    # Pre-process items: add tier_values list for template rendering
+    for item in all_items:
+        tier_values = []
+        for i in range(1, max_tiers + 1):
+            qty_val = item.get(f'qty_{i}', '')
+            submitted = item.get('submitted_price' if i == 1 else f'submitted_price_{i}', '')
+            tier_values.append({
+                'index': i,
+                'qty': qty_val,
+                'submitted_price': submitted,
+                'input_class': 'inp-price' if i == 1 else f'inp-price{i}',
+                'has_qty': bool(str(qty_val).strip()),
+            })
+        item['tier_values'] = tier_values
+
+    # Separate original items from items added later (update)
+    original_items = [i for i in all_items if not i.get('added_at')]
+    updated_items = [i for i in all_items if i.get('added_at')]
+
+    return {
+        'access': access,
+        'token': access.id,
+        'items': original_items,
+        'updated_items': updated_items,
+        'all_items': all_items,
+        'project': access.project,
+        'supplier_name': access.supplier_name,
+        'submission': submission,
+        'is_cancelled': False,
+        'qty_tiers': qty_tiers,
+        'max_tiers': max_tiers,
+    }
+
+
+def last_modified(access):
+    """Newest write that can change the page: the access row or its project."""
+    stamps = [s for s in (access.updated_at, getattr(access.project, 'updated_at', None)) if s]
+    return max(stamps) if stamps else None
+
+
+def _version(access):
+    project_ts = getattr(access.project, 'updated_at', None)
+    parts = (
+        access.id,
+        access.round,
+        access.updated_at.isoformat() if access.updated_at else '',
+        project_ts.isoformat() if project_ts else '',
+    )
+    return hashlib.sha256(':'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:32]
+
+
+def portal_etag(request, access):
+    """ETag of the page as this visitor sees it (their CSRF cookie is baked into the form)."""
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    digest = hashlib.sha256(f'{_version(access)}:{csrf_cookie}'.encode('utf-8')).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def render_portal(request, access):
+    """Rendered portal HTML, from cache when this version was rendered before."""
+    key = f'rfq:portal:{_version(access)}'
+    html = cache.get(key)
+    if html is None:
+        context = portal_context(access)
+        context['csrf_token'] = _CSRF_PLACEHOLDER
+        html = render_to_string(TEMPLATE, context)
+        cache.set(key, html, _cache_ttl())
+    return html.replace(_CSRF_PLACEHOLDER, get_token(request))
@@ -0,0 +1,89 @@
+"""Listing rows for ``quotes_list``.
+
+Manual ``Quote`` rows and portal ``SupplierAccess`` rows are mirrored into
+``QuoteIndex`` so the quotes page can filter, sort and paginate in SQL. The
+full objects are only loaded for the rows of the requested page.
+"""
+
+PORTAL_LIST_STATUSES = ('submitted', 'approved', 're_quote_requested')
+PORTAL_EXPIRED_STATUSES = ('expired', 'lost', 'rejected')
+
+
+def quote_row_fields(quote):
+    return {
+        'company_id': quote.company_id,
+        'project_id': quote.project_id,
+        'supplier_name': (quote.supplier_name or '')[:255],
+        'project_name': (quote.project_name or '')[:255],
+        'quote_number': (quote.quote_number or '')[:128],
+        'received_from': (quote.received_from or '')[:255],
+        'status': '',
+        'create_date': quote.create_date,
+        'expire_date': quote.expire_date,
+        'valid_until': None,
+    }
+
+
+def portal_row_fields(access):
+    sub = access.submission_data if isinstance(access.submission_data, dict) else {}
+    return {
+        'company_id': access.company_id,
+        'project_id': access.project_id,
+        'supplier_name': (access.supplier_name or '')[:255],
+        'project_name': '',
+        'quote_number': str(sub.get('quote_number') or f'PORTAL-{access.round}')[:128],
+        'received_from': (access.contact_name or sub.get('supplier_contact_name') or '')[:255],
+        'status': access.status or '',
+        'create_date': access.created_at,
+        'expire_date': None,
+        'valid_until': access.valid_until,
+    }
+
+
+def index_quote(quote):
+    from .models import QuoteIndex
+
+    QuoteIndex.objects.update_or_create(
+        source_type=QuoteIndex.SOURCE_MANUAL, source_pk=quote.pk, defaults=quote_row_fields(quote),
+    )
+
+
+def index_quotes(quotes):
+    """Refresh the index rows of many quotes at once (``bulk_create`` / ``bulk_update`` skip the signal)."""
+    from .models import QuoteIndex
+
+    if not quotes:
+        return
+    pks = [q.pk for q in quotes]
+    QuoteIndex.objects.filter(source_type=QuoteIndex.SOURCE_MANUAL, source_pk__in=pks).delete()
+    QuoteIndex.objects.bulk_create(
+        [QuoteIndex(source_type=QuoteIndex.SOURCE_MANUAL, source_pk=q.pk, **quote_row_fields(q)) for q in quotes],
+        batch_size=500,
+    )
+
+
+def index_supplier_access(access):
+    from .models import QuoteIndex
+
+    QuoteIndex.objects.update_or_create(
+        source_type=QuoteIndex.SOURCE_PORTAL, source_pk=access.pk, defaults=portal_row_fields(access),
+    )
+
+
+def index_supplier_accesses(accesses):
+    """Bulk counterpart of ``index_supplier_access`` for freshly inserted accesses."""
+    from .models import QuoteIndex
+
+    if not accesses:
+        return
+    QuoteIndex.objects.filter(source_type=QuoteIndex.SOURCE_PORTAL, source_pk__in=[a.pk for a in accesses]).delete()
+    QuoteIndex.objects.bulk_create(
+        [QuoteIndex(source_type=QuoteIndex.SOURCE_PORTAL, source_pk=a.pk, **portal_row_fields(a)) for a in accesses],
+        batch_size=500,
+    )
+
+
+def unindex(source_type, source_pk):
+    from .models import QuoteIndex
+
+    QuoteIndex.objects.filter(source_type=source_type, source_pk=source_pk).delete()
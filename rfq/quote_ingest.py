@@ -0,0 +1,213 @@
+"""Batched writes for quotes and quote lines.
+
+Payloads are validated and turned into unsaved model instances first; the
+database is then touched with a handful of ``bulk_create`` / ``bulk_update``
+statements, so the write transaction (and SQLite's write lock) lasts only as
+long as the inserts themselves. ``bulk_create`` / ``bulk_update`` skip model
+signals, so the ``QuoteIndex`` rows are refreshed explicitly.
+"""
+import random
+import uuid
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Quote, QuoteLine, get_default_company_id
+from .quote_index import index_quotes
+
+LINE_BATCH_SIZE = 500
+QUOTE_BATCH_SIZE = 200
+TIERS = range(1, 11)
+# Imported price lists carry no validity; new quotes get the planner's default.
+DEFAULT_EXPIRE_DAYS = 90
+
+# Header fields rewritten when an import row hits an existing quote.
+_IMPORT_UPDATE_FIELDS = [
+    'supplier_name', 'source', 'currency', 'created_by', 'project', 'project_name', 'company', 'updated_at',
+]
+
+
+def _safe_int(v, default=0):
+    try:
+        return int(float(v))
+    except (ValueError, TypeError):
+        return default
+
+
+def _safe_decimal(v):
+    if v is None or v == '':
+        return None
+    try:
+        return Decimal(str(v).replace(',', '.'))
+    except (InvalidOperation, ValueError, TypeError):
+        return None
+
+
+def line_from_payload(line_data, line_number):
+    """QuoteLine in the shape used by ``quotes_create`` / ``quotes_update`` (values passed through as sent)."""
+    line = QuoteLine(
+        drawing_number=line_data.get('drawing_number', ''),
+        manufacturer=line_data.get('manufacturer', ''),
+        mpn=line_data.get('mpn', ''),
+        description=line_data.get('description', ''),
+        uom=line_data.get('uom', 'pcs'),
+        moq=line_data.get('moq', 1),
+        manufacturing_lead_time=line_data.get('manufacturing_lead_time', ''),
+        supplier_lead_time=line_data.get('supplier_lead_time', '14 days'),
+        available_stock=line_data.get('available_stock'),
+        available_stock_date=line_data.get('available_stock_date'),
+        line_number=line_number,
+        notes=line_data.get('notes', ''),
+    )
+    for i in TIERS:
+        setattr(line, f'qty_{i}', line_data.get(f'qty_{i}', ''))
+        setattr(line, f'price_{i}', line_data.get(f'price_{i}'))
+    return line
+
+
+def planner_line_from_payload(item, line_number):
+    """QuoteLine from an RFQ Planner item (strings trimmed, numbers coerced)."""
+    line = QuoteLine(
+        line_number=line_number,
+        drawing_number=str(item.get('drawing_number') or '').strip(),
+        manufacturer=str(item.get('manufacturer') or '').strip(),
+        mpn=str(item.get('mpn') or '').strip(),
+        description=str(item.get('description') or '').strip(),
+        uom=str(item.get('uom') or 'pcs'),
+        moq=_safe_int(item.get('moq'), 1),
+        supplier_lead_time=str(item.get('lead_time') or ''),
+    )
+    for i in TIERS:
+        setattr(line, f'qty_{i}', str(item.get(f'qty_{i}') or ''))
+        setattr(line, f'price_{i}', _safe_decimal(item.get(f'price_{i}')))
+    return line
+
+
+def import_line_from_payload(item, line_number):
+    """QuoteLine from a price-list import row (single qty/price tier)."""
+    return QuoteLine(
+        line_number=line_number,
+        drawing_number=str(item.get('drawing_number') or '').strip(),
+        mpn=str(item.get('mpn') or '').strip(),
+        description=str(item.get('description') or '').strip(),
+        uom=str(item.get('uom') or 'pcs'),
+        moq=_safe_int(item.get('moq'), 1),
+        manufacturing_lead_time=str(item.get('lead_time') or ''),
+        price_1=_safe_decimal(item.get('price')),
+        qty_1=str(item.get('qty') or ''),
+    )
+
+
+def write_lines(quote, lines, replace=False):
+    """Attach ``lines`` to ``quote`` and insert them in batches; optionally drop the old lines first."""
+    if replace:
+        quote.lines.all().delete()
+    for line in lines:
+        line.quote = quote
+    QuoteLine.objects.bulk_create(lines, batch_size=LINE_BATCH_SIZE)
+    return len(lines)
+
+
+def _auto_quote_number(supplier_name, taken):
+    now_str = timezone.now().strftime('%Y%m%d_%H%M')
+    while True:
+        q_num = f"{supplier_name.replace(' ', '_').upper()}_{now_str}_{random.randint(1000, 9999)}"
+        if q_num not in taken:
+            return q_num
+
+
+def bulk_import_quotes(rows, *, projects_qs, quotes_qs, company, username):
+    """Upsert quotes (by ``quote_number``) and append their lines.
+
+    Rows sharing a quote number hit the same quote: the last row's header
+    wins and lines are appended in payload order, as the per-row loop did.
+    Returns ``{'imported_quotes', 'imported_lines', 'errors'}``.
+    """
+    errors = []
+    pids = {str(r.get('project_id')) for r in rows if isinstance(r, dict) and r.get('project_id')}
+    projects = {str(p.id): p for p in projects_qs.filter(id__in=pids)} if pids else {}
+    default_company_id = None
+    plans = {}  # quote_number -> {'header': {...}, 'rows': [...], 'counted': n, 'items': [...]}
+    for idx, q_data in enumerate(rows):
+        if not isinstance(q_data, dict):
+            errors.append(f'Row {idx+1}: Expected an object')
+            continue
+        sname = str(q_data.get('supplier_name') or '').strip()
+        if not sname:
+            errors.append(f'Row {idx+1}: Missing supplier name')
+            continue
+        q_num = str(q_data.get('quote_number') or '').strip() or _auto_quote_number(sname, plans)
+        proj = None
+        q_pid = q_data.get('project_id')
+        if q_pid:
+            proj = projects.get(str(q_pid))
+            if not proj:
+                errors.append(f'Row {idx+1}: invalid project_id or access denied')
+                continue
+        if proj:
+            company_id = proj.company_id
+        elif company is not None:
+            company_id = company.id
+        else:
+            default_company_id = default_company_id or get_default_company_id()
+            company_id = default_company_id
+        plan = plans.setdefault(q_num, {'rows': [], 'counted': 0, 'items': []})
+        plan['header'] = {
+            'supplier_name': sname,
+            'source': 'import',
+            'currency': q_data.get('currency') or 'EUR',
+            'created_by': username,
+            'project': proj,
+            'project_name': (proj.name if proj else str(q_data.get('project_name') or '')),
+            'company_id': company_id,
+        }
+        plan['rows'].append(idx)
+        items = q_data.get('items') or []
+        if isinstance(items, list):
+            plan['items'].extend(it for it in items if isinstance(it, dict))
+            plan['counted'] += 1
+    if not plans:
+        return {'imported_quotes': 0, 'imported_lines': 0, 'errors': errors}
+
+    existing = {q.quote_number: q for q in quotes_qs.select_related(None).filter(quote_number__in=list(plans))}
+    # quote_number is globally unique; numbers owned by another tenant cannot be upserted.
+    foreign = set(Quote.objects.filter(quote_number__in=[n for n in plans if n not in existing]).values_list('quote_number', flat=True))
+    for q_num in sorted(foreign, key=lambda n: plans[n]['rows'][0]):
+        for idx in plans.pop(q_num)['rows']:
+            errors.append(f'Row {idx+1}: quote_number already in use')
+    line_counts = dict(
+        QuoteLine.objects.filter(quote__in=list(existing.values())).values('quote_id').annotate(n=Count('id')).values_list('quote_id', 'n')
+    ) if existing else {}
+
+    now = timezone.now()
+    expire_date = (now + timedelta(days=DEFAULT_EXPIRE_DAYS)).date()
+    created, updated, lines = [], [], []
+    for q_num, plan in plans.items():
+        header = plan['header']
+        quote = existing.get(q_num)
+        if quote:
+            for field, value in header.items():
+                setattr(quote, field, value)
+            quote.updated_at = now
+            updated.append(quote)
+        else:
+            quote = Quote(id=str(uuid.uuid4()), quote_number=q_num, expire_date=expire_date, **header)
+            created.append(quote)
+        start = line_counts.get(quote.id, 0) + 1
+        for i_idx, item in enumerate(plan['items']):
+            line = import_line_from_payload(item, start + i_idx)
+            line.quote = quote
+            lines.append(line)
+
+    with transaction.atomic():
+        if created:
+            Quote.objects.bulk_create(created, batch_size=QUOTE_BATCH_SIZE)
+        if updated:
+            Quote.objects.bulk_update(updated, _IMPORT_UPDATE_FIELDS, batch_size=QUOTE_BATCH_SIZE)
+        QuoteLine.objects.bulk_create(lines, batch_size=LINE_BATCH_SIZE)
+        index_quotes(created + updated)
+    imported = sum(plan['counted'] for plan in plans.values())
+    return {'imported_quotes': imported, 'imported_lines': len(lines), 'errors': errors}
@@ -0,0 +1,87 @@
+"""Compressed, deduplicated storage of supplier round snapshots.
+
+Each submit / decision used to copy ``requested_items`` and
+``submission_data`` into its ``SupplierAccessRound`` row. The snapshot is now
+encoded as canonical JSON, zlib-compressed and stored once per SHA-256 in
+``RoundSnapshot``; rounds reference it. Requested items rarely change between
+rounds and a decision snapshots the submission it decides on, so most rounds
+add no new snapshot rows at all. ``SupplierAccessRound.get_requested_items()``
+/ ``get_submission_data()`` decode transparently (and still read the legacy
+inline columns of older rows).
+"""
+import hashlib
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+
+from .models import RoundSnapshot, SupplierAccessRound
+
+_COMPRESS_LEVEL = 6
+
+
+def encode(value):
+    """``(sha256, compressed bytes, raw size)`` of ``value``'s canonical JSON."""
+    raw = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, cls=DjangoJSONEncoder).encode('utf-8')
+    return hashlib.sha256(raw).hexdigest(), zlib.compress(raw, _COMPRESS_LEVEL), len(raw)
+
+
+def store_many(values):
+    """``RoundSnapshot`` for every value (in order), inserting only unseen contents."""
+    encoded = [encode(v) for v in values]
+    by_sha = {s.sha256: s for s in RoundSnapshot.objects.filter(sha256__in={e[0] for e in encoded})}
+    fresh = {}
+    for sha, data, raw_size in encoded:
+        if sha not in by_sha and sha not in fresh:
+            fresh[sha] = RoundSnapshot(sha256=sha, data=data, raw_size=raw_size)
+    if fresh:
+        try:
+            with transaction.atomic():
+                RoundSnapshot.objects.bulk_create(fresh.values())
+        except IntegrityError:
+            # A concurrent writer stored some of them first; theirs are identical.
+            RoundSnapshot.objects.bulk_create(fresh.values(), ignore_conflicts=True)
+        by_sha.update((s.sha256, s) for s in RoundSnapshot.objects.filter(sha256__in=fresh))
+    return [by_sha[e[0]] for e in encoded]
+
+
+def attach(rounds, pairs):
+    """Point each round at snapshots of its ``(requested_items, submission_data)`` pair."""
+    snapshots = store_many([v for pair in pairs for v in ((pair[0] or []), (pair[1] or {}))])
+    for i, rnd in enumerate(rounds):
+        rnd.requested_snapshot = snapshots[2 * i]
+        rnd.submission_snapshot = snapshots[2 * i + 1]
+        rnd.requested_items = []
+        rnd.submission_data = {}
+    return rounds
+
+
+def compact_legacy_rounds(batch_size=500):
+    """Move inline snapshots of older rounds into ``RoundSnapshot`` rows; returns the number moved."""
+    moved = 0
+    while True:
+        batch = list(
+            SupplierAccessRound.objects.filter(requested_snapshot__isnull=True, submission_snapshot__isnull=True)
+            .order_by('id')[:batch_size]
+        )
+        if not batch:
+            return moved
+        with transaction.atomic():
+            attach(batch, [(r.requested_items, r.submission_data) for r in batch])
+            SupplierAccessRound.objects.bulk_update(
+                batch, ['requested_snapshot', 'submission_snapshot', 'requested_items', 'submission_data'],
+            )
+        moved += len(batch)
+
+
+def prune_unreferenced():
+    """Delete snapshots no round points at any more (after accesses were deleted); returns the count."""
+    rounds = SupplierAccessRound.objects
+    deleted, _ = (
+        RoundSnapshot.objects
+        .exclude(id__in=rounds.filter(requested_snapshot__isnull=False).values('requested_snapshot_id'))
+        .exclude(id__in=rounds.filter(submission_snapshot__isnull=False).values('submission_snapshot_id'))
+        .delete()
+    )
+    return deleted
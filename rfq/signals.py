@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .api_common import invalidate_actor_cache
+from .change_events import publish
+from .file_store import release_blob
+from .locks import lock_event
+from .models import (
+    ChangeEvent, Company, EditLock, Project, Quote, QuoteIndex, SupplierAccess, SupplierInteractionFile, UserCompanyProfile,
+)
+from .quote_index import index_quote, index_supplier_access, unindex
+
+
+@receiver(connection_created)
+def _tune_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA busy_timeout = {int(getattr(settings, 'RFQ_SQLITE_BUSY_TIMEOUT_MS', 5000))}")
+        if getattr(settings, 'RFQ_SQLITE_WAL', True):
+            # WAL is persistent per database file; in-memory test databases keep 'memory'.
+            cursor.execute('PRAGMA journal_mode = WAL')
+            cursor.execute('PRAGMA synchronous = NORMAL')
+
+
+@receiver([post_save, post_delete], sender=UserCompanyProfile)
+def _profile_changed(sender, instance, **kwargs):
+    invalidate_actor_cache(instance.user_id)
+    # Again after commit, so a concurrent request cannot re-cache the old row.
+    transaction.on_commit(lambda: invalidate_actor_cache(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=Company)
+def _company_changed(sender, instance, **kwargs):
+    invalidate_actor_cache()
+    transaction.on_commit(invalidate_actor_cache)
+
+
+@receiver(post_save, sender=Quote)
+def _quote_saved(sender, instance, **kwargs):
+    index_quote(instance)
+
+
+@receiver(post_delete, sender=Quote)
+def _quote_deleted(sender, instance, **kwargs):
+    unindex(QuoteIndex.SOURCE_MANUAL, instance.pk)
+
+
+@receiver(post_save, sender=SupplierAccess)
+def _supplier_access_saved(sender, instance, update_fields=None, **kwargs):
+    index_supplier_access(instance)
+    if update_fields is None or 'status' in update_fields:
+        publish(
+            instance.company_id, ChangeEvent.KIND_SUPPLIER_ACCESS, instance.project_id,
+            access_id=instance.id, status=instance.status, round=instance.round,
+        )
+
+
+@receiver(post_delete, sender=SupplierAccess)
+def _supplier_access_deleted(sender, instance, **kwargs):
+    unindex(QuoteIndex.SOURCE_PORTAL, instance.pk)
+
+
+@receiver(post_delete, sender=SupplierInteractionFile)
+def _interaction_file_deleted(sender, instance, **kwargs):
+    if instance.blob_id:
+        release_blob(instance.blob_id)
+
+
+@receiver(post_save, sender=Project)
+def _project_saved(sender, instance, **kwargs):
+    publish(instance.company_id, ChangeEvent.KIND_PROJECT, instance.id, version=instance.updated_at.isoformat())
+
+
+@receiver(post_delete, sender=Project)
+def _project_deleted(sender, instance, **kwargs):
+    publish(instance.company_id, ChangeEvent.KIND_PROJECT_DELETED, instance.id)
+
+
+@receiver(post_save, sender=EditLock)
+def _lock_saved(sender, instance, update_fields=None, **kwargs):
+    # Heartbeats only move expires_at; owners do not change.
+    if update_fields is not None and 'locked_by' not in update_fields:
+        return
+    lock_event(instance, True)
+
+
+@receiver(post_delete, sender=EditLock)
+def _lock_deleted(sender, instance, **kwargs):
+    lock_event(instance, False)
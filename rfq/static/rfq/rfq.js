@@ -19672,6 +19672,28 @@ Best regards`)}</textarea>
                 };
             };
 
+            // Create an export job, poll its progress, then fetch the artifact.
+            // Returns a fetch Response like the synchronous /api/export call.
+            const runExportJob = async (opts) => {
+                const created = await fetch('/api/export/jobs', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCSRFToken() },
+                    body: JSON.stringify(opts),
+                    credentials: 'same-origin',
+                });
+                if (!created.ok) return created;
+                let job = (await created.json()).job || {};
+                while (job.status === 'queued' || job.status === 'running') {
+                    if (status) status.textContent = `Generating export… ${job.progress || 0}/${job.total || opts.project_ids.length} projects`;
+                    await new Promise(resolve => setTimeout(resolve, 1500));
+                    const polled = await fetch(`/api/export/jobs/${encodeURIComponent(job.id)}`, { credentials: 'same-origin' });
+                    if (!polled.ok) return polled;
+                    job = (await polled.json()).job || {};
+                }
+                if (job.status !== 'done') throw new Error(job.error || 'Export job failed');
+                return fetch(job.download_url, { credentials: 'same-origin' });
+            };
+
             if (!btn.dataset.bound) {
                 btn.dataset.bound = '1';
                 btn.addEventListener('click', async () => {
@@ -19682,12 +19704,15 @@ Best regards`)}</textarea>
                     }
                     if (status) status.textContent = 'Generating export…';
                     try {
-                        const r = await fetch('/api/export', {
-                            method: 'POST',
-                            headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCSRFToken() },
-                            body: JSON.stringify(opts),
-                            credentials: 'same-origin',
-                        });
+                        // Multi-project exports run as background jobs so they cannot hit proxy timeouts.
+                        const r = opts.project_ids.length > 1
+                            ? await runExportJob(opts)
+                            : await fetch('/api/export', {
+                                method: 'POST',
+                                headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCSRFToken() },
+                                body: JSON.stringify(opts),
+                                credentials: 'same-origin',
+                            });
                         if (!r.ok) {
                             const t = await r.text();
                             throw new Error(t || ('HTTP ' + r.status));
@@ -24473,13 +24498,24 @@ Best regards`)}</textarea>
 
         function ensureItemDetailLockWatcher() {
             if (!__itemDetailLockTimer) {
+                let lastPoll = 0;
                 __itemDetailLockTimer = setInterval(() => {
+                    // With the change stream connected, lock changes arrive as events; poll only as a slow fallback.
+                    const live = !!(window.RFQData && typeof window.RFQData.isChangeStreamLive === 'function' && window.RFQData.isChangeStreamLive());
+                    if (live && Date.now() - lastPoll < 30000) return;
+                    lastPoll = Date.now();
                     refreshItemDetailLockState().catch(() => { });
                 }, 2000);
             }
 
             if (!__itemDetailLockHooksBound) {
                 __itemDetailLockHooksBound = true;
+                window.addEventListener('rfq:lock-changed', (ev) => {
+                    const d = (ev && ev.detail) || {};
+                    if (currentProject && currentProject.id && String(d.project_id || '') === String(currentProject.id)) {
+                        refreshItemDetailLockState().catch(() => { });
+                    }
+                });
                 window.addEventListener('focus', () => {
                     refreshItemDetailLockState().catch(() => { });
                 });
@@ -41954,6 +41990,7 @@ window.renderSupplierInteraction = async function () {
                     <h2>Supplier Interaction</h2>
                     <div class="sim-header-actions">
                         <button class="btn-primary btn-sm" id="sim-bulk-btn" onclick="window.bulkGenerateLinks()" style="display:none;">Generate Selected</button>
+                        <button class="btn-primary btn-sm" id="sim-approve-all-btn" onclick="window.approveAllSubmittedQuotes()" style="display:none;">Approve All Quoted</button>
                         <span id="sim-sel-count" style="font-size:11px;color:#64748b;"></span>
                         <button class="btn-secondary btn-sm" onclick="window.renderSupplierInteraction()" style="display:flex;align-items:center;gap:4px;">
                             <span style="font-size:14px;">&#8635;</span> Refresh
@@ -41974,7 +42011,8 @@ window.renderSupplierInteraction = async function () {
     let accessList = [];
     const accessMap = {};
     try {
-        const res = await fetch(`/api/projects/${project.id}/supplier_access`);
+        // Round history is fetched on demand by the review modal.
+        const res = await fetch(`/api/projects/${project.id}/supplier_access?include_history=0`);
         if (res.ok) {
             const json = await res.json();
             accessList = json.accesses || [];
@@ -41987,6 +42025,12 @@ window.renderSupplierInteraction = async function () {
     } catch (e) {
         console.error("Failed to fetch access list", e);
     }
+    const approveAllBtn = document.getElementById('sim-approve-all-btn');
+    if (approveAllBtn) {
+        const pending = accessList.filter(acc => acc.status === 'submitted').length;
+        approveAllBtn.style.display = pending > 1 ? '' : 'none';
+        approveAllBtn.textContent = `Approve All Quoted (${pending})`;
+    }
 
     // Group items by supplier
     const suppliersMap = {};
@@ -42427,6 +42471,19 @@ window.reviewSupplierSubmission = function (tokenId) {
         alert("Submission data not found. Please refresh.");
         return;
     }
+    if (!Array.isArray(acc.round_history)) {
+        acc.round_history = [];
+        fetch(`/api/projects/${encodeURIComponent(acc.project_id)}/supplier_access?ids=${encodeURIComponent(tokenId)}&include_history=1`)
+            .then(r => (r.ok ? r.json() : null))
+            .then(json => {
+                const fresh = json && (json.accesses || [])[0];
+                if (!fresh || !(fresh.round_history || []).length) return;
+                acc.round_history = fresh.round_history;
+                // Re-render only while the review modal is still open.
+                if (document.querySelector('.rfq-modal-overlay')) window.reviewSupplierSubmission(tokenId);
+            })
+            .catch(e => console.error('Failed to load round history', e));
+    }
 
     const submission = acc.submission_data || {};
     const subItems = submission.items || [];
@@ -42922,6 +42979,56 @@ window.approveSupplierSubmission = async function (tokenId) {
     });
 };
 
+// Approves every submitted quote of the open project in one request
+// (the server writes the project once for the whole batch).
+window.approveAllSubmittedQuotes = function () {
+    const tokens = ((window.RFQData && window.RFQData.currentAccessList) || [])
+        .filter(acc => acc.status === 'submitted')
+        .map(acc => acc.id);
+    if (!tokens.length) return;
+    window.showConfirm(`Approve ${tokens.length} submitted quotes?\n\nEach quote is synced into Suppliers & Pricing for its matched items.`, async () => {
+        try {
+            const res = await fetch('/api/supplier_access/batch_approve', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCSRFToken() },
+                body: JSON.stringify({ tokens }),
+            });
+            if (!res.ok) {
+                window.showAlert("Error approving quotes.");
+                return;
+            }
+            const json = await res.json();
+            const results = json.results || [];
+            const approved = results.filter(r => r.ok);
+            const updated = approved.reduce((n, r) => n + (r.updated_items || 0), 0);
+            const failed = results.length - approved.length;
+            window.showAlert(`Approved ${approved.length} quotes, updated ${updated} items.${failed ? ' (' + failed + ' failed)' : ''}`);
+            const project = window.currentProject || (window.RFQData && window.RFQData.activeProject);
+            if (project && project.id) {
+                try {
+                    const freshRes = await fetch(`/api/projects/${project.id}`);
+                    if (freshRes.ok) {
+                        const freshJson = await freshRes.json();
+                        if (freshJson.project) {
+                            Object.assign(project, freshJson.project);
+                            if (window.RFQData) window.RFQData.activeProject = project;
+                            window.currentProject = project;
+                        }
+                    }
+                } catch (err) {
+                    console.error('Failed to refresh project after batch approve:', err);
+                }
+            }
+            if (typeof window.renderSupplierInteraction === 'function') {
+                window.renderSupplierInteraction();
+            }
+        } catch (e) {
+            console.error(e);
+            window.showAlert("Network error.");
+        }
+    });
+};
+
 // Custom Dialog Helpers
 window.showConfirm = function (message, onConfirm) {
     const backdrop = document.createElement('div');
@@ -43618,6 +43725,7 @@ function renderQuotes() {
     if (search) params.append('search', search);
     if (projectId) params.append('project_id', projectId);
     if (supplierFilter) params.append('supplier', supplierFilter);
+    if (numberFilter) params.append('quote_number', numberFilter);
     if (status === 'active') params.append('expired', 'false');
     else if (status === 'expired') params.append('expired', 'true');
     if (params.toString()) url += '?' + params.toString();
@@ -91,6 +91,7 @@ const nowIso = () => new Date().toISOString();
   const API = {
     PROJECTS: '/api/projects',
     BULK: '/api/projects/bulk',
+    SYNC: '/api/projects/sync',
     RESET: '/api/projects/reset',
   };
 
@@ -159,13 +160,43 @@ const nowIso = () => new Date().toISOString();
 
   const LOCK = {
     ACQUIRE: '/api/locks/acquire',
-    HEARTBEAT: '/api/locks/heartbeat',
+    HEARTBEAT: '/api/locks/heartbeat_batch',
     RELEASE: '/api/locks/release',
     STATUS: '/api/locks/status',
     TTL_SEC: 180,
   };
 
-  const _projectLockTimers = new Map();
+  // Every held lease is renewed by one shared timer with one batched request.
+  const _heldLockKeys = new Set();
+  let _lockHeartbeatTimer = null;
+
+  const _stopLockHeartbeat = () => {
+    if (_lockHeartbeatTimer) {
+      clearInterval(_lockHeartbeatTimer);
+      _lockHeartbeatTimer = null;
+    }
+  };
+
+  const _lockHeartbeat = async () => {
+    const resource_keys = Array.from(_heldLockKeys);
+    if (!resource_keys.length) {
+      _stopLockHeartbeat();
+      return;
+    }
+    try {
+      const res = await _fetchJson(LOCK.HEARTBEAT, {
+        method: 'POST',
+        body: JSON.stringify({ resource_keys, ttl_sec: LOCK.TTL_SEC }),
+      });
+      const results = (res && res.results) || {};
+      resource_keys.forEach((key) => {
+        if (!results[key] || !results[key].renewed) _heldLockKeys.delete(key);
+      });
+    } catch (e) {
+      _heldLockKeys.clear();
+    }
+    if (!_heldLockKeys.size) _stopLockHeartbeat();
+  };
 
   const _lockResourceKey = (projectId) => `project:${String(projectId)}:edit`;
 
@@ -182,22 +213,9 @@ const nowIso = () => new Date().toISOString();
     });
     if (!res || !res.acquired) return false;
 
-    if (!_projectLockTimers.has(resource_key)) {
-      const id = setInterval(async () => {
-        try {
-          await _fetchJson(LOCK.HEARTBEAT, {
-            method: 'POST',
-            body: JSON.stringify({ resource_key, ttl_sec: LOCK.TTL_SEC }),
-          });
-        } catch (e) {
-          const active = _projectLockTimers.get(resource_key);
-          if (active) {
-            clearInterval(active);
-            _projectLockTimers.delete(resource_key);
-          }
-        }
-      }, Math.max(30000, (LOCK.TTL_SEC * 1000) / 2));
-      _projectLockTimers.set(resource_key, id);
+    _heldLockKeys.add(resource_key);
+    if (!_lockHeartbeatTimer) {
+      _lockHeartbeatTimer = setInterval(_lockHeartbeat, Math.max(30000, (LOCK.TTL_SEC * 1000) / 2));
     }
     return true;
   };
@@ -218,11 +236,8 @@ const nowIso = () => new Date().toISOString();
         method: 'POST',
         body: JSON.stringify({ resource_key }),
       });
-      const t = _projectLockTimers.get(resource_key);
-      if (t) {
-        clearInterval(t);
-        _projectLockTimers.delete(resource_key);
-      }
+      _heldLockKeys.delete(resource_key);
+      if (!_heldLockKeys.size) _stopLockHeartbeat();
       return true;
     } catch (e) {
       return false;
@@ -255,6 +270,7 @@ const nowIso = () => new Date().toISOString();
     if (idx >= 0) projects[idx] = canonical;
     else projects.unshift(canonical);
     saveProjects(projects);
+    _rememberServerCopy(canonical);
 
     try {
       window.dispatchEvent(new CustomEvent('rfq:project-conflict', {
@@ -268,6 +284,58 @@ const nowIso = () => new Date().toISOString();
     } catch (e) {}
   };
 
+  // Last server-confirmed copy of each project (JSON string), used to build
+  // JSON-Patch deltas so autosave uploads only what changed.
+  const _serverSnapshots = new Map();
+  const _SERVER_ONLY_KEYS = ['server_updated_at', 'data_version', 'server_created_at', 'base_version'];
+
+  const _rememberServerCopy = (project) => {
+    if (!project || !project.id) return;
+    try { _serverSnapshots.set(String(project.id), JSON.stringify(project)); } catch (e) {}
+  };
+
+  // Project content without server bookkeeping, to tell whether a local copy
+  // still equals what a sync request sent.
+  const _contentKey = (project) => {
+    if (!project) return '';
+    const copy = { ...project };
+    _SERVER_ONLY_KEYS.forEach(k => { delete copy[k]; });
+    return JSON.stringify(copy);
+  };
+
+  const _localMatches = (projectId, sentKey) => {
+    const local = getProjects().find(p => String(p?.id) === String(projectId));
+    return _contentKey(local) === sentKey;
+  };
+
+  const _ptr = (key) => '/' + String(key).replace(/~/g, '~0').replace(/\//g, '~1');
+
+  const _diffProject = (before, after) => {
+    const ops = [];
+    const same = (a, b) => JSON.stringify(a) === JSON.stringify(b);
+    Object.keys(before).forEach(k => {
+      if (_SERVER_ONLY_KEYS.includes(k)) return;
+      if (!(k in after)) ops.push({ op: 'remove', path: _ptr(k) });
+    });
+    Object.keys(after).forEach(k => {
+      if (_SERVER_ONLY_KEYS.includes(k)) return;
+      const a = before[k];
+      const b = after[k];
+      if (!(k in before)) { ops.push({ op: 'add', path: _ptr(k), value: b }); return; }
+      if (k === 'items' && Array.isArray(a) && Array.isArray(b)) {
+        const n = Math.min(a.length, b.length);
+        for (let i = 0; i < n; i += 1) {
+          if (!same(a[i], b[i])) ops.push({ op: 'replace', path: `/items/${i}`, value: b[i] });
+        }
+        for (let i = n; i < b.length; i += 1) ops.push({ op: 'add', path: '/items/-', value: b[i] });
+        for (let i = a.length - 1; i >= b.length; i -= 1) ops.push({ op: 'remove', path: `/items/${i}` });
+        return;
+      }
+      if (!same(a, b)) ops.push({ op: 'replace', path: _ptr(k), value: b });
+    });
+    return ops;
+  };
+
   const _syncPayload = async () => {
     const allProjects = getProjects();
     const projects = allProjects.filter(p => _dirtyProjectIds.has(String(p && p.id)));
@@ -278,12 +346,117 @@ const nowIso = () => new Date().toISOString();
     return { projects: projects.map(_withBaseVersion), blocked: [] };
   };
 
+  // Try to push a dirty project as a delta. Resolves true when the server has it
+  // (or nothing changed), false when the caller should fall back to bulk upload.
+  const _pushProjectDelta = async (project) => {
+    const pid = String(project.id);
+    const snap = _serverSnapshots.get(pid);
+    const base = _currentVersion(project);
+    if (!snap || !base) return false;
+    const before = safeJsonParse(snap, null);
+    if (!before || _currentVersion(before) !== base) return false;
+    const ops = _diffProject(before, project);
+    if (!ops.length) return true;
+    const sent = JSON.parse(JSON.stringify(project));
+    try {
+      const res = await _fetchJson(`${API.PROJECTS}/${encodeURIComponent(pid)}/patch`, {
+        method: 'PATCH',
+        body: JSON.stringify({ base_version: base, ops }),
+      });
+      if (res && res.server_updated_at) {
+        const version = { server_updated_at: res.server_updated_at, data_version: res.data_version || res.server_updated_at };
+        // The server now holds exactly what was sent; the local copy may already
+        // carry newer edits, which the next delta must still include.
+        _rememberServerCopy({ ...sent, ...version });
+        const projects = getProjects();
+        const idx = projects.findIndex(p => String(p?.id) === pid);
+        if (idx >= 0) {
+          Object.assign(projects[idx], version);
+          saveProjects(projects);
+        }
+      }
+      return true;
+    } catch (err) {
+      if (err && err.status === 409 && err.body && err.body.code === 'version_conflict') {
+        _handleVersionConflict(err.body);
+        return true;
+      }
+      return false;
+    }
+  };
+
+  // Large uploads go through a sync session in fixed-size chunks: each chunk is
+  // its own request and transaction, and a failed chunk is retried on its own.
+  const SYNC_CHUNK_PROJECTS = 25;
+  const SYNC_CHUNK_RETRIES = 3;
+
+  const _postChunk = async (sid, seq, projects) => {
+    let lastErr = null;
+    for (let attempt = 0; attempt < SYNC_CHUNK_RETRIES; attempt += 1) {
+      try {
+        return await _fetchJson(`${API.SYNC}/${encodeURIComponent(sid)}/chunks/${seq}`, {
+          method: 'POST',
+          body: JSON.stringify({ projects }),
+        });
+      } catch (err) {
+        lastErr = err;
+        // 4xx other than a timeout will not change on retry.
+        if (err && err.status && err.status < 500 && err.status !== 408) break;
+        await new Promise(r => setTimeout(r, 500 * (attempt + 1)));
+      }
+    }
+    throw lastErr;
+  };
+
+  const _syncChunked = async (projects) => {
+    const chunks = [];
+    for (let i = 0; i < projects.length; i += SYNC_CHUNK_PROJECTS) chunks.push(projects.slice(i, i + SYNC_CHUNK_PROJECTS));
+    const begin = await _fetchJson(API.SYNC, { method: 'POST', body: JSON.stringify({ total_chunks: chunks.length }) });
+    const sid = begin && begin.session ? begin.session.id : '';
+    if (!sid) throw new Error('Sync session could not be started');
+    const sentKeys = new Map(projects.map(p => [String(p.id), _contentKey(p)]));
+    for (let seq = 0; seq < chunks.length; seq += 1) {
+      const res = await _postChunk(sid, seq, chunks[seq]);
+      (res && Array.isArray(res.results) ? res.results : []).forEach(row => {
+        const pid = String(row.id || '');
+        if (row.status === 'conflict') {
+          if (row.code === 'version_conflict') _handleVersionConflict(row);
+          return;
+        }
+        if (_localMatches(pid, sentKeys.get(pid))) _dirtyProjectIds.delete(pid);
+        _serverSnapshots.delete(pid);
+      });
+    }
+    const done = await _fetchJson(`${API.SYNC}/${encodeURIComponent(sid)}/commit`, { method: 'POST', body: '{}' });
+    return done && done.session ? done.session : done;
+  };
+
   const _syncNowCore = async () => {
     const payload = await _syncPayload();
     if (!payload.projects.length) return { ok: true, skipped: true, reason: 'no_dirty_projects' };
+    const bulk = [];
+    let patched = 0;
+    for (const p of payload.projects) {
+      const sentKey = _contentKey(p);
+      if (await _pushProjectDelta(p)) {
+        // Edits made while the request was in flight keep the project dirty.
+        if (_localMatches(p.id, sentKey)) _dirtyProjectIds.delete(String(p.id));
+        patched += 1;
+      } else {
+        bulk.push(p);
+      }
+    }
+    if (!bulk.length) return { ok: true, patched };
+    if (bulk.length > SYNC_CHUNK_PROJECTS) return _syncChunked(bulk);
+    const sentKeys = new Map(bulk.map(p => [String(p.id), _contentKey(p)]));
     try {
-      const res = await _fetchJson(API.BULK, { method: 'POST', body: JSON.stringify({ projects: payload.projects }) });
-      payload.projects.forEach(p => { if (p && p.id) _dirtyProjectIds.delete(String(p.id)); });
+      const res = await _fetchJson(API.BULK, { method: 'POST', body: JSON.stringify({ projects: bulk }) });
+      bulk.forEach(p => {
+        if (!p || !p.id) return;
+        if (_localMatches(p.id, sentKeys.get(String(p.id)))) _dirtyProjectIds.delete(String(p.id));
+        // Bulk sync does not return new versions; next change goes through bulk again.
+        _serverSnapshots.delete(String(p.id));
+      });
       return res;
     } catch (err) {
       if (err && err.status === 409 && err.body && err.body.code === 'version_conflict') {
@@ -342,12 +515,64 @@ const nowIso = () => new Date().toISOString();
     } catch (e) {}
   };
 
+  // Summary-first pull: list {id, data_version} page by page, then download the
+  // full blob only for projects whose version differs from the local copy.
+  const SUMMARY_PAGE_SIZE = 500;
+  const DETAIL_FETCH_CONCURRENCY = 4;
+
+  const _fetchProjectSummaries = async () => {
+    const out = [];
+    let cursor = null;
+    for (let guard = 0; guard < 1000; guard += 1) {
+      const qs = `view=summary&limit=${SUMMARY_PAGE_SIZE}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '');
+      const page = await _fetchJson(`${API.PROJECTS}?${qs}`);
+      if (!page || !Array.isArray(page.projects)) throw new Error('Invalid project summary page');
+      out.push(...page.projects);
+      cursor = page.next_cursor;
+      if (!cursor) return out;
+    }
+    throw new Error('Too many project summary pages');
+  };
+
+  const _fetchServerProjects = async () => {
+    try {
+      const summaries = await _fetchProjectSummaries();
+      const localById = new Map(getProjects().filter(p => p && p.id).map(p => [String(p.id), p]));
+      const byId = new Map();
+      const stale = [];
+      summaries.forEach(s => {
+        const local = localById.get(String(s.id));
+        const localVersion = local ? String(local.server_updated_at || local.data_version || '') : '';
+        if (localVersion && localVersion === String(s.data_version || '')) byId.set(String(s.id), local);
+        else stale.push(s);
+      });
+      const fresh = [];
+      for (let i = 0; i < stale.length; i += DETAIL_FETCH_CONCURRENCY) {
+        const chunk = stale.slice(i, i + DETAIL_FETCH_CONCURRENCY);
+        const full = await Promise.all(chunk.map(s => _fetchJson(`${API.PROJECTS}/${encodeURIComponent(s.id)}`)));
+        full.forEach(d => {
+          const p = d && d.project;
+          if (!p || !p.id) return;
+          byId.set(String(p.id), p);
+          fresh.push(p);
+        });
+      }
+      const projects = summaries.map(s => byId.get(String(s.id))).filter(Boolean);
+      // Only downloaded copies are known server state; reused local copies may hold unsynced edits.
+      return { projects, fresh };
+    } catch (e) {
+      // Older server (no summary view) or partial failure -> full list.
+      return _fetchJson(API.PROJECTS);
+    }
+  };
+
   const bootstrapFromServer = (preferServer = false) => {
     // 1) pull server projects
-    return _fetchJson(API.PROJECTS)
+    return _fetchServerProjects()
       .then(data => {
         const serverProjects = data && Array.isArray(data.projects) ? data.projects : [];
         const localProjects = getProjects();
+        (data && Array.isArray(data.fresh) ? data.fresh : serverProjects).forEach(_rememberServerCopy);
 
         if (serverProjects.length === 0 && localProjects.length > 0) {
           // Server empty -> push local up.
@@ -390,17 +615,72 @@ const nowIso = () => new Date().toISOString();
       });
   };
 
+  // Server-push change feed (SSE). Version bumps pull just the changed project;
+  // lock and supplier events are re-broadcast as window events for the UI.
+  const EVENTS_STREAM = '/api/events/stream';
+  let _changeStream = null;
+  let _changeStreamLive = false;
+
+  const _emit = (type, detail) => {
+    try { window.dispatchEvent(new CustomEvent(type, { detail })); } catch (e) {}
+  };
+
+  const _pullChangedProject = async (ev) => {
+    const pid = ev && ev.project_id ? String(ev.project_id) : '';
+    if (!pid || _dirtyProjectIds.has(pid)) return;
+    const local = getProjects().find(p => String(p?.id) === pid);
+    if (local && _currentVersion(local) === String(ev.version || '')) return;
+    const res = await _fetchJson(`${API.PROJECTS}/${encodeURIComponent(pid)}`);
+    const fresh = res && res.project;
+    if (!fresh || !fresh.id || _dirtyProjectIds.has(pid)) return;
+    const projects = getProjects();
+    const idx = projects.findIndex(p => String(p?.id) === pid);
+    if (idx >= 0) projects[idx] = fresh;
+    else projects.unshift(fresh);
+    saveProjects(projects);
+    _rememberServerCopy(fresh);
+    _emit('rfq:project-updated', { projectId: pid, project: fresh });
+  };
+
+  const _onStreamEvent = (type, handler) => (msg) => {
+    const ev = safeJsonParse(msg && msg.data, null);
+    if (!ev) return;
+    try { handler(ev); } catch (e) {}
+    _emit(type, ev);
+  };
+
+  const startChangeStream = () => {
+    if (_changeStream || typeof EventSource === 'undefined') return false;
+    try {
+      const es = new EventSource(EVENTS_STREAM);
+      es.onopen = () => { _changeStreamLive = true; };
+      // EventSource reconnects on its own (sending Last-Event-ID).
+      es.onerror = () => { _changeStreamLive = false; };
+      es.addEventListener('project', _onStreamEvent('rfq:project-changed', ev => { _pullChangedProject(ev).catch(() => {}); }));
+      es.addEventListener('project_deleted', _onStreamEvent('rfq:project-deleted', () => {}));
+      es.addEventListener('lock', _onStreamEvent('rfq:lock-changed', () => {}));
+      es.addEventListener('supplier_access', _onStreamEvent('rfq:supplier-access-changed', () => {}));
+      es.addEventListener('resync', () => { bootstrapFromServer(true); });
+      _changeStream = es;
+      return true;
+    } catch (e) {
+      return false;
+    }
+  };
+
+  const isChangeStreamLive = () => _changeStreamLive;
+
   // Periodic sync (covers imports that bypass RFQData helpers)
   try {
     setInterval(() => queueSync(500), 30000);
     window.addEventListener('beforeunload', () => {
       try { syncNow(); } catch (e) {}
       try {
-        _projectLockTimers.forEach((timerId, resource_key) => {
-          clearInterval(timerId);
+        _stopLockHeartbeat();
+        _heldLockKeys.forEach((resource_key) => {
           _fetchJson(LOCK.RELEASE, { method: 'POST', body: JSON.stringify({ resource_key }) }).catch(() => {});
         });
-        _projectLockTimers.clear();
+        _heldLockKeys.clear();
       } catch (e) {}
     });
   } catch (e) {}
@@ -725,6 +1005,7 @@ const nowIso = () => new Date().toISOString();
   } catch (e) {}
 
   try { bootstrapFromServer(); } catch (e) {}
+  try { startChangeStream(); } catch (e) {}
 
   window.RFQData = {
     uid,
@@ -757,6 +1038,8 @@ const nowIso = () => new Date().toISOString();
     ensureProjectLock,
     releaseProjectLock,
     getProjectLockStatus,
+    startChangeStream,
+    isChangeStreamLive,
     resetServer: function(){ return _fetchJson(API.RESET, { method: 'POST', body: '{}' }); },
     bootstrapFromServer,
   };
@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rfq.checks import actor_cache_backend_check
+from rfq.models import Company, UserCompanyProfile
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'], RFQ_ACTOR_CACHE_TTL=60)
+class ActorCacheTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Actor Cache Co')
+        self.user = get_user_model().objects.create_user(username='viewer_cache', password='pw12345')
+        self.profile = UserCompanyProfile.objects.create(user=self.user, company=self.company, role='viewer', is_active=True)
+        self.assertTrue(self.client.login(username='viewer_cache', password='pw12345'))
+
+    def _me(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get('/api/session/me')
+        self.assertEqual(res.status_code, 200)
+        profile_queries = [q for q in ctx.captured_queries if 'rfq_usercompanyprofile' in q['sql']]
+        return res.json(), len(profile_queries)
+
+    def test_profile_is_cached_across_requests(self):
+        _, first = self._me()
+        body, second = self._me()
+        self.assertEqual(first, 1)
+        self.assertEqual(second, 0)
+        self.assertEqual(body['role'], 'viewer')
+
+    def test_profile_change_invalidates_cache(self):
+        self._me()
+        self.profile.role = 'editor'
+        self.profile.save()
+        body, queries = self._me()
+        self.assertEqual(body['role'], 'editor')
+        self.assertEqual(queries, 1)
+
+    def test_company_change_invalidates_cache(self):
+        self._me()
+        self.company.name = 'Renamed Cache Co'
+        self.company.save()
+        body, _ = self._me()
+        self.assertEqual(body['company_name'], 'Renamed Cache Co')
+
+    def test_deactivated_profile_loses_access(self):
+        self._me()
+        self.profile.is_active = False
+        self.profile.save()
+        res = self.client.get('/api/projects')
+        self.assertEqual(res.status_code, 403)
+
+    def test_per_process_cache_is_flagged(self):
+        self.assertEqual([w.id for w in actor_cache_backend_check(None)], ['rfq.W001'])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache'}}):
+            self.assertEqual(actor_cache_backend_check(None), [])
+        with override_settings(RFQ_ACTOR_CACHE_TTL=0):
+            self.assertEqual(actor_cache_backend_check(None), [])
@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from rfq import audit_query
+from rfq.models import AuditLog, Company, Project, UserCompanyProfile
+
+T0 = datetime(2026, 3, 1, 12, 0, tzinfo=dt_timezone.utc)
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class AdminAuditLogTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.company = Company.objects.create(name='Audit Co')
+        other = Company.objects.create(name='Other Co')
+        self.admin = User.objects.create_user(username='admin_al', password='pw12345')
+        self.editor = User.objects.create_user(username='editor_al', password='pw12345')
+        UserCompanyProfile.objects.create(user=self.admin, company=self.company, role='admin', is_active=True)
+        UserCompanyProfile.objects.create(user=self.editor, company=self.company, role='editor', is_active=True)
+        Project.objects.create(id='al-p', company=self.company, name='P', data={'items': []})
+        actions = ['lock.acquire', 'lock.release', 'project.patch', 'supplier.approve']
+        rows = [
+            AuditLog(
+                company=self.company, actor=self.admin if n % 2 else self.editor, action=actions[n % 4], entity_type='lock' if n % 4 < 2 else 'project',
+                entity_id=f'e{n}', project_id='al-p' if n % 3 == 0 else None, created_at=T0 + timedelta(hours=n // 2),
+            )
+            for n in range(20)
+        ]
+        rows.append(AuditLog(company=other, action='lock.acquire', created_at=T0))
+        AuditLog.objects.bulk_create(rows)
+        self.assertTrue(self.client.login(username='admin_al', password='pw12345'))
+
+    def _logs(self, **params):
+        res = self.client.get('/api/admin/audit_logs', params)
+        self.assertEqual(res.status_code, 200)
+        return res.json()
+
+    def test_keyset_pages_cover_company_rows_in_order(self):
+        seen, cursor = [], None
+        while True:
+            body = self._logs(limit=6, **({'cursor': cursor} if cursor else {}))
+            seen.extend(body['logs'])
+            cursor = body['next_cursor']
+            if not cursor:
+                break
+        expected = list(AuditLog.objects.filter(company=self.company).order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual([r['id'] for r in seen], expected)
+        self.assertEqual(self.client.get('/api/admin/audit_logs', {'cursor': '!!'}).status_code, 400)
+
+    def test_exact_prefix_actor_project_and_date_filters(self):
+        self.assertEqual({r['action'] for r in self._logs(action='lock.*')['logs']}, {'lock.acquire', 'lock.release'})
+        self.assertEqual(len(self._logs(action='lock')['logs']), 0)
+        self.assertEqual(len(self._logs(action='lock.release')['logs']), 5)
+        self.assertEqual({r['actor'] for r in self._logs(actor='editor_al')['logs']}, {'editor_al'})
+        self.assertEqual(len(self._logs(actor=str(self.admin.id))['logs']), 10)
+        self.assertEqual(len(self._logs(actor='nobody')['logs']), 0)
+        self.assertEqual(len(self._logs(project_id='al-p')['logs']), 7)
+        self.assertEqual(self._logs(entity_type='project', entity_id='e2')['logs'][0]['action'], 'project.patch')
+        window = self._logs(since=(T0 + timedelta(hours=2)).isoformat(), until=(T0 + timedelta(hours=4)).isoformat())['logs']
+        self.assertEqual(len(window), 4)
+        self.assertEqual(len(self._logs(since='2026-03-01', until='2026-03-01')['logs']), 20)
+        res = self.client.get('/api/admin/audit_logs', {'since': 'yesterday'})
+        self.assertEqual((res.status_code, res.json()['error']), (400, 'Invalid since'))
+
+    def test_streaming_exports_walk_all_batches(self):
+        with mock.patch.object(audit_query, 'EXPORT_BATCH_SIZE', 3):
+            res = self.client.get('/api/admin/audit_logs/export', {'action': 'lock.*'})
+            lines = [json.loads(line) for line in b''.join(res.streaming_content).decode().splitlines()]
+            self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+            self.assertEqual(len(lines), 10)
+            self.assertEqual(len({r['id'] for r in lines}), 10)
+
+            res = self.client.get('/api/admin/audit_logs/export', {'format': 'csv', 'actor': 'editor_al'})
+            rows = list(csv.reader(io.StringIO(b''.join(res.streaming_content).decode('utf-8-sig'))))
+        self.assertEqual(rows[0][:3], ['id', 'time', 'action'])
+        self.assertEqual(len(rows), 11)
+        self.assertEqual(AuditLog.objects.get(action='audit.export', metadata_json__format='csv').metadata_json['filters'], {'actor': 'editor_al'})
+        self.assertEqual(self.client.get('/api/admin/audit_logs/export', {'format': 'xml'}).status_code, 400)
+
+        self.client.logout()
+        self.assertTrue(self.client.login(username='editor_al', password='pw12345'))
+        self.assertEqual(self.client.get('/api/admin/audit_logs/export').status_code, 403)
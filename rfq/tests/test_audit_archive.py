@@ -0,0 +1,95 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from rfq.models import AuditArchive, AuditLog, Company, Project, UserCompanyProfile
+
+MEDIA = tempfile.mkdtemp(prefix='rfq-audit-archive-')
+
+
+@override_settings(
+    DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'], MEDIA_ROOT=MEDIA,
+    RFQ_AUDIT_RETENTION_DAYS=365, RFQ_AUDIT_ARCHIVE_ROWS_PER_FILE=2,
+)
+class AuditArchiveTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA, ignore_errors=True)
+
+    def setUp(self):
+        self.short = Company.objects.create(name='Short Retention', audit_retention_days=30)
+        self.default = Company.objects.create(name='Default Retention')
+        Project.objects.create(id='ar-p', company=self.short, name='P', data={'items': []})
+        now = timezone.now()
+
+        def entries(company, days, n, **extra):
+            return [AuditLog(company=company, action='project.patch', entity_id=f'{days}-{i}', created_at=now - timedelta(days=days, minutes=i), **extra) for i in range(n)]
+
+        AuditLog.objects.bulk_create(
+            entries(self.short, 60, 5, project_id='ar-p', metadata_json={'ops': 3}) + entries(self.short, 1, 2)
+            + entries(self.default, 60, 3) + entries(self.default, 400, 2) + entries(None, 400, 1)
+        )
+
+    def _archive(self):
+        out = io.StringIO()
+        call_command('archive_audit_logs', stdout=out)
+        return out.getvalue()
+
+    def test_expired_entries_move_to_bounded_gzip_files(self):
+        self.assertIn('Archived 8 audit entries into 5 file(s)', self._archive())
+        self.assertEqual(AuditLog.objects.filter(company=self.short).count(), 2)
+        self.assertEqual(AuditLog.objects.filter(company=self.default).count(), 3)
+        self.assertFalse(AuditLog.objects.filter(company__isnull=True).exists())
+        archives = list(AuditArchive.objects.filter(company=self.short).order_by('first_at'))
+        self.assertEqual([a.row_count for a in archives], [2, 2, 1])
+        with gzip.open(os.path.join(MEDIA, archives[0].file.name)) as gz:
+            rows = [json.loads(line) for line in gz]
+        self.assertEqual((rows[0]['entity_id'], rows[0]['project_id'], rows[0]['metadata_json']), ('60-4', 'ar-p', {'ops': 3}))
+        self.assertIn('Archived 0 audit entries into 0 file(s)', self._archive())
+
+    def test_restore_puts_entries_back_and_removes_archive(self):
+        original = {a.id: a.entity_id for a in AuditLog.objects.filter(company=self.short, created_at__lt=timezone.now() - timedelta(days=30))}
+        self._archive()
+        archives = list(AuditArchive.objects.filter(company=self.short))
+        Project.objects.filter(id='ar-p').delete()
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('restore_audit_archive', *[a.id for a in archives], stdout=out)
+        self.assertIn('Restored 2 audit entries', out.getvalue())
+        restored = AuditLog.objects.filter(id__in=original)
+        self.assertEqual({a.id: a.entity_id for a in restored}, original)
+        self.assertFalse(restored.exclude(project__isnull=True).exists())
+        self.assertFalse(AuditArchive.objects.filter(company=self.short).exists())
+        self.assertFalse(any(os.path.exists(os.path.join(MEDIA, a.file.name)) for a in archives))
+
+    def test_corrupt_archive_is_not_restored(self):
+        self._archive()
+        archive = AuditArchive.objects.filter(company__isnull=True).get()
+        AuditArchive.objects.filter(id=archive.id).update(sha256='0' * 64)
+        with self.assertRaises(CommandError):
+            call_command('restore_audit_archive', archive.id, stdout=io.StringIO())
+        self.assertFalse(AuditLog.objects.filter(company__isnull=True).exists())
+
+    def test_superadmin_sets_company_retention(self):
+        user = get_user_model().objects.create_user(username='root_ar', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=self.default, role='superadmin', is_active=True)
+        self.assertTrue(self.client.login(username='root_ar', password='pw12345'))
+
+        def post(days):
+            return self.client.post(
+                '/api/admin/companies', data=json.dumps({'id': self.default.id, 'audit_retention_days': days}),
+                content_type='application/json', HTTP_ORIGIN='http://testserver',
+            )
+        self.assertEqual(post(90).json()['company']['audit_retention_days'], 90)
+        self.assertEqual(post(0).status_code, 400)
+        self.assertIsNone(post(None).json()['company']['audit_retention_days'])
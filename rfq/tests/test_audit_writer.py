@@ -0,0 +1,66 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rfq import audit_writer
+from rfq.models import AuditLog, Company, Project, UserCompanyProfile
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class AuditWriterTests(TestCase):
+    def setUp(self):
+        company = Company.objects.create(name='Audit Co')
+        user = get_user_model().objects.create_user(username='editor_aw', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=company, role='admin', is_active=True)
+        for n in range(3):
+            Project.objects.create(id=f'aw-{n}', company=company, name=f'P{n}', data={'items': []})
+        self.assertTrue(self.client.login(username='editor_aw', password='pw12345'))
+
+    def tearDown(self):
+        audit_writer.flush()
+
+    def _acquire(self, n):
+        res = self.client.post(
+            '/api/locks/acquire', data=json.dumps({'resource_key': f'project:aw-{n}:edit', 'project_id': f'aw-{n}'}),
+            content_type='application/json', HTTP_ORIGIN='http://testserver',
+        )
+        self.assertTrue(res.json()['acquired'])
+
+    @override_settings(RFQ_AUDIT_INLINE=False, RFQ_AUDIT_BATCH_SIZE=3, RFQ_AUDIT_FLUSH_SECONDS=60)
+    def test_entries_are_buffered_and_bulk_inserted(self):
+        self._acquire(0)
+        self._acquire(1)
+        self.assertFalse(AuditLog.objects.exists())
+        with CaptureQueriesContext(connection) as ctx:
+            self._acquire(2)
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "rfq_auditlog"')]
+        self.assertEqual(len(inserts), 1)
+        rows = list(AuditLog.objects.order_by('created_at'))
+        self.assertEqual([r.entity_id for r in rows], [f'project:aw-{n}:edit' for n in range(3)])
+        self.assertEqual(rows[0].project_id, 'aw-0')
+
+        self._acquire(0)
+        self.assertEqual(audit_writer.flush(), 1)
+        self.assertEqual(AuditLog.objects.count(), 4)
+
+    @override_settings(RFQ_AUDIT_INLINE=False, RFQ_AUDIT_BATCH_SIZE=10)
+    def test_entry_for_deleted_project_is_kept_without_project(self):
+        self._acquire(0)
+        Project.objects.filter(id='aw-0').delete()
+        audit_writer.flush()
+        entry = AuditLog.objects.get(action='lock.acquire')
+        self.assertIsNone(entry.project_id)
+
+    @override_settings(RFQ_AUDIT_EXCLUDE_ACTIONS=['lock.*'])
+    def test_excluded_actions_are_not_recorded(self):
+        self._acquire(0)
+        self.assertFalse(AuditLog.objects.exists())
+
+    @override_settings(RFQ_AUDIT_SAMPLE_RATES={'lock.acquire': 0.0})
+    def test_sampled_out_actions_are_not_recorded(self):
+        self._acquire(0)
+        self.assertFalse(AuditLog.objects.exists())
+        self.assertTrue(audit_writer.should_record('lock.release'))
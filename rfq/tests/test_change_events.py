@@ -0,0 +1,94 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from rfq.models import ChangeEvent, Company, EditLock, Project, ProjectAccess, SupplierAccess, UserCompanyProfile
+
+
+@override_settings(
+    DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'],
+    RFQ_EVENTS_WSGI_STREAM_SECONDS=0, RFQ_EVENTS_POLL_SECONDS=0,
+)
+class ChangeEventTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.company = Company.objects.create(name='Events Co')
+        self.other_company = Company.objects.create(name='Events Other')
+        self.user = User.objects.create_user(username='editor_events', password='pw12345')
+        self.other_user = User.objects.create_user(username='peer_events', password='pw12345')
+        UserCompanyProfile.objects.create(user=self.user, company=self.company, role='editor', is_active=True)
+        UserCompanyProfile.objects.create(user=self.other_user, company=self.company, role='editor', is_active=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project = Project.objects.create(id='ev-p', company=self.company, name='Events', data={})
+        self.assertTrue(self.client.login(username='editor_events', password='pw12345'))
+        self.start = self.client.get('/api/events').json()['last_id']
+
+    def _poll(self):
+        res = self.client.get('/api/events', {'after': self.start})
+        self.assertEqual(res.status_code, 200)
+        return res.json()['events']
+
+    def test_project_lock_and_supplier_changes_are_published(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.data = {'items': [{'id': 'a'}]}
+            self.project.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                '/api/locks/acquire', data=json.dumps({'resource_key': 'project:ev-p:edit', 'project_id': 'ev-p'}),
+                content_type='application/json', HTTP_ORIGIN='http://testserver',
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                '/api/locks/heartbeat', data=json.dumps({'resource_key': 'project:ev-p:edit'}),
+                content_type='application/json', HTTP_ORIGIN='http://testserver',
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            SupplierAccess.objects.create(id='ev-acc', company=self.company, project=self.project, supplier_name='S', status='submitted')
+        with self.captureOnCommitCallbacks(execute=True):
+            EditLock.objects.filter(resource_key='project:ev-p:edit').delete()
+        events = self._poll()
+        self.assertEqual([e['kind'] for e in events], ['project', 'lock', 'supplier_access', 'lock'])
+        self.project.refresh_from_db()
+        self.assertEqual(events[0]['version'], self.project.updated_at.isoformat())
+        self.assertEqual((events[1]['locked'], events[1]['owner']['display']), (True, 'editor_events'))
+        self.assertEqual((events[2]['access_id'], events[2]['status']), ('ev-acc', 'submitted'))
+        self.assertFalse(events[3]['locked'])
+
+    def test_events_are_scoped_to_company_and_project_acl(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.create(id='ev-foreign', company=self.other_company, name='Foreign', data={})
+            hidden = Project.objects.create(id='ev-hidden', company=self.company, name='Hidden', data={})
+            ProjectAccess.objects.create(project=hidden, user=self.other_user, can_view=True)
+            self.project.save()
+        self.assertEqual([e['project_id'] for e in self._poll()], ['ev-p'])
+
+    def test_readers_wait_at_a_recent_id_gap(self):
+        # An id whose insert has not committed yet: the reader must not move past it.
+        events = [ChangeEvent.objects.create(company=self.company, kind='project', project_id='ev-p', payload={}) for _ in range(3)]
+        events[1].delete()
+        res = self.client.get('/api/events', {'after': self.start}).json()
+        self.assertEqual(([e['id'] for e in res['events']], res['last_id']), ([events[0].id], events[0].id))
+        # Once the gap is older than the settle window it is skipped as a rolled-back insert.
+        ChangeEvent.objects.filter(id=events[2].id).update(created_at=timezone.now() - timedelta(minutes=1))
+        res = self.client.get('/api/events', {'after': events[0].id}).json()
+        self.assertEqual(res['last_id'], events[2].id)
+
+    def test_stream_replays_from_last_event_id(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()
+        res = self.client.get('/api/events/stream', HTTP_LAST_EVENT_ID=str(self.start))
+        self.assertEqual(res['Content-Type'], 'text/event-stream')
+        body = b''.join(res.streaming_content).decode('utf-8')
+        last = ChangeEvent.objects.latest('id')
+        self.assertIn(f'id: {last.id}\nevent: project\n', body)
+        self.assertTrue(body.startswith('retry: '))
+
+    @override_settings(RFQ_EVENTS_STREAM_SECONDS=0)
+    async def test_stream_under_asgi(self):
+        await self.async_client.alogin(username='editor_events', password='pw12345')
+        res = await self.async_client.get('/api/events/stream', {'after': '0'})
+        chunks = [c async for c in res.streaming_content]
+        self.assertTrue(b''.join(chunks).startswith(b'retry: '))
@@ -0,0 +1,20 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+
+class DatabaseProfileTests(TestCase):
+    def _fetch(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite tuning')
+    def test_sqlite_connections_are_tuned(self):
+        self.assertEqual(self._fetch('PRAGMA busy_timeout')[0][0], 5000)
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL JSONB indexes')
+    def test_json_columns_have_gin_indexes(self):
+        names = {r[0] for r in self._fetch("SELECT indexname FROM pg_indexes WHERE indexdef ILIKE '%% USING gin %%'")}
+        self.assertTrue({'rfq_project_data_gin', 'rfq_supplieraccess_subm_gin', 'rfq_auditlog_metadata_gin'} <= names)
@@ -0,0 +1,82 @@
+import io
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from rfq.models import Company, ExportJob, Project, UserCompanyProfile
+
+MEDIA = tempfile.mkdtemp(prefix='rfq-export-jobs-')
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'], MEDIA_ROOT=MEDIA, RFQ_EXPORT_JOBS_INLINE=True)
+class ExportJobTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA, ignore_errors=True)
+
+    def setUp(self):
+        self.company = Company.objects.create(name='Export Jobs Co')
+        User = get_user_model()
+        user = User.objects.create_user(username='viewer_jobs', password='pw12345')
+        other = User.objects.create_user(username='other_jobs', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=self.company, role='viewer', is_active=True)
+        UserCompanyProfile.objects.create(user=other, company=self.company, role='viewer', is_active=True)
+        for n in range(7):
+            Project.objects.create(id=f'job-{n}', company=self.company, name=f'Job {n}', data={'items': [{'id': f'i{n}', 'item_drawing_no': f'D-{n}'}]})
+        self.assertTrue(self.client.login(username='viewer_jobs', password='pw12345'))
+
+    def _create(self, **payload):
+        payload.setdefault('project_ids', [f'job-{n}' for n in range(7)])
+        return self.client.post('/api/export/jobs', data=json.dumps(payload), content_type='application/json', HTTP_ORIGIN='http://testserver')
+
+    def test_job_renders_and_downloads(self):
+        res = self._create(format='xlsx')
+        self.assertEqual(res.status_code, 202)
+        job = res.json()['job']
+        status = self.client.get(f"/api/export/jobs/{job['id']}").json()['job']
+        self.assertEqual((status['status'], status['progress'], status['total']), ('done', 7, 7))
+        self.assertTrue(ExportJob.objects.get(id=job['id']).file.name.startswith('exports/'))
+        download = self.client.get(status['download_url'])
+        self.assertEqual(download.status_code, 200)
+        self.assertIn('rfq_export.xlsx', download['Content-Disposition'])
+        wb = load_workbook(io.BytesIO(b''.join(download.streaming_content)), read_only=True)
+        self.assertEqual(len(list(wb['Items'].values)), 1 + 7)
+
+    def test_jobs_are_private_and_scope_checked(self):
+        job_id = self._create(format='csv').json()['job']['id']
+        self.assertEqual(self._create(project_ids=['job-0', 'job-missing']).status_code, 403)
+        self.client.logout()
+        self.assertTrue(self.client.login(username='other_jobs', password='pw12345'))
+        self.assertEqual(self.client.get(f'/api/export/jobs/{job_id}').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/export/jobs/{job_id}/download').status_code, 404)
+
+    def test_superadmin_without_company_files_job_under_project_company(self):
+        admin = get_user_model().objects.create_user(username='super_jobs', password='pw12345')
+        UserCompanyProfile.objects.create(user=admin, company=None, role='superadmin', is_active=True)
+        other = Company.objects.create(name='Other Export Co')
+        Project.objects.create(id='job-other', company=other, name='Other', data={'items': []})
+        self.client.logout()
+        self.assertTrue(self.client.login(username='super_jobs', password='pw12345'))
+        res = self._create(format='csv', project_ids=['job-0', 'job-1'])
+        self.assertEqual(res.status_code, 202)
+        self.assertEqual(ExportJob.objects.get(id=res.json()['job']['id']).company_id, self.company.id)
+        res = self._create(format='csv', project_ids=['job-0', 'job-other'])
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(ExportJob.objects.filter(created_by=admin).count(), 1)
+
+    def test_cleanup_removes_expired_jobs_and_files(self):
+        job = ExportJob.objects.get(id=self._create(format='csv').json()['job']['id'])
+        storage, name = job.file.storage, job.file.name
+        self.assertTrue(storage.exists(name))
+        ExportJob.objects.filter(id=job.id).update(expires_at=timezone.now() - timedelta(minutes=1))
+        call_command('cleanup_export_jobs', stdout=io.StringIO())
+        self.assertFalse(ExportJob.objects.filter(id=job.id).exists())
+        self.assertFalse(storage.exists(name))
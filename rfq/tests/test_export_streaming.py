@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.http import FileResponse, StreamingHttpResponse
+from django.test import TestCase, override_settings
+from openpyxl import load_workbook
+
+from rfq.models import Company, Project, UserCompanyProfile
+
+
+def _data(n):
+    return {'project_status': 'Open', 'items': [
+        {'id': f'i{n}', 'item_drawing_no': f'DRW-{n}', 'mpn': f'M-{n}', 'supplier': 'Acme', 'qty_1': 10, 'qty_12': 99,
+         'suppliers': [{'name': 'Acme', 'price_1': 2.5, 'currency': 'USD'}, {'name': 'Beta', 'price_1': 0}]},
+        'not-an-item',
+    ], 'rfqBatches': [{'id': f'b{n}', 'supplier_name': 'Acme', 'items': [1, 2]}]}
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class StreamingExportTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Export Co')
+        user = get_user_model().objects.create_user(username='viewer_export', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=self.company, role='viewer', is_active=True)
+        for n in range(3):
+            Project.objects.create(id=f'exp-{n}', company=self.company, name=f'Export {n}', data=_data(n))
+        self.assertTrue(self.client.login(username='viewer_export', password='pw12345'))
+
+    def _export(self, **payload):
+        payload.setdefault('project_ids', ['exp-2', 'exp-0', 'exp-1'])
+        return self.client.post('/api/export', data=json.dumps(payload), content_type='application/json', HTTP_ORIGIN='http://testserver')
+
+    def test_csv_streams_items_in_request_order(self):
+        res = self._export(format='csv')
+        self.assertEqual(res.status_code, 200)
+        self.assertIsInstance(res, StreamingHttpResponse)
+        self.assertEqual(res['Content-Disposition'], 'attachment; filename="rfq_export.csv"')
+        body = b''.join(res.streaming_content).decode('utf-8')
+        self.assertTrue(body.startswith('\ufeffproject_id,'))
+        rows = list(csv.DictReader(io.StringIO(body.lstrip('\ufeff'))))
+        self.assertEqual([r['project_id'] for r in rows], ['exp-2', 'exp-0', 'exp-1'])
+        self.assertEqual((rows[0]['price_1'], rows[0]['qty_1'], rows[0]['qty_next']), ('2.5', '10', 'qty_12=99'))
+
+    def test_xlsx_is_written_with_all_sheets(self):
+        res = self._export(format='xlsx', include_attachments=True)
+        self.assertEqual(res.status_code, 200)
+        self.assertIsInstance(res, FileResponse)
+        wb = load_workbook(io.BytesIO(b''.join(res.streaming_content)), read_only=True)
+        self.assertEqual(wb.sheetnames, ['Projects', 'Items', 'ItemSuppliers', 'RFQs', 'Suppliers', 'Attachments'])
+        projects = list(wb['Projects'].values)
+        self.assertEqual([r[projects[0].index('project_id')] for r in projects[1:]], ['exp-2', 'exp-0', 'exp-1'])
+        suppliers = list(wb['Suppliers'].values)
+        head = suppliers[0]
+        acme = next(r for r in suppliers[1:] if r[head.index('project_id')] == 'exp-0' and r[head.index('supplier')] == 'Acme')
+        self.assertEqual((acme[head.index('main_items')], acme[head.index('quoted_items')], acme[head.index('avg_price')]), (1, 1, 2.5))
+        self.assertEqual(len(list(wb['ItemSuppliers'].values)), 1 + 3 * 2)
+        self.assertEqual(list(wb['Attachments'].values), [('(no data)',)])
+
+    def test_main_supplier_mode_and_missing_projects(self):
+        res = self._export(format='xlsx', suppliers_mode='main')
+        wb = load_workbook(io.BytesIO(b''.join(res.streaming_content)), read_only=True)
+        self.assertEqual(len(list(wb['ItemSuppliers'].values)), 1 + 3)
+        pdf = self._export(format='pdf')
+        self.assertEqual((pdf.status_code, pdf['Content-Type']), (200, 'application/pdf'))
+        missing = self._export(project_ids=['exp-missing'])
+        self.assertEqual(missing.status_code, 403)
@@ -0,0 +1,59 @@
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from rfq.models import Attachment, Company, Project, UserCompanyProfile
+
+MEDIA = tempfile.mkdtemp(prefix='rfq-file-delivery-')
+BODY = b'drawing ' * 500
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'], MEDIA_ROOT=MEDIA)
+class AttachmentDeliveryTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA, ignore_errors=True)
+
+    def setUp(self):
+        User = get_user_model()
+        company = Company.objects.create(name='Delivery Co')
+        other = Company.objects.create(name='Other Co')
+        UserCompanyProfile.objects.create(user=User.objects.create_user(username='viewer_fd', password='pw12345'), company=company, role='viewer', is_active=True)
+        UserCompanyProfile.objects.create(user=User.objects.create_user(username='outsider_fd', password='pw12345'), company=other, role='admin', is_active=True)
+        project = Project.objects.create(id='fd-p', company=company, name='Delivery', data={'items': []})
+        self.att = Attachment.objects.create(id='att-1', company=company, project=project, file=ContentFile(BODY, name='housing.pdf'))
+        self.url = '/api/projects/fd-p/attachments/att-1'
+        self.assertTrue(self.client.login(username='viewer_fd', password='pw12345'))
+
+    def test_django_backend_streams_with_ranges_and_permission_check(self):
+        self.assertEqual(self.att.as_dict()['url'], self.url)
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['Content-Type'], 'application/pdf')
+        self.assertTrue(res['Content-Disposition'].startswith('inline'))
+        self.assertEqual(b''.join(res.streaming_content), BODY)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=res['ETag']).status_code, 304)
+        part = self.client.get(self.url, HTTP_RANGE='bytes=0-6')
+        self.assertEqual((part.status_code, b''.join(part.streaming_content)), (206, b'drawing'))
+
+        self.client.logout()
+        self.assertTrue(self.client.login(username='outsider_fd', password='pw12345'))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    @override_settings(RFQ_FILE_DELIVERY='x-accel-redirect', RFQ_FILE_DELIVERY_ACCEL_PREFIX='/internal-media/')
+    def test_accel_redirect_hands_transfer_to_proxy(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['X-Accel-Redirect'], f'/internal-media/{self.att.file.name}')
+        self.assertEqual(res.content, b'')
+        self.assertEqual(res['Content-Type'], 'application/pdf')
+
+    @override_settings(RFQ_FILE_DELIVERY='x-sendfile')
+    def test_sendfile_uses_absolute_path(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res['X-Sendfile'], self.att.file.path)
+        self.assertEqual(res.content, b'')
@@ -0,0 +1,87 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from rfq.api_projects import _merge_preserve_supplier_quotes
+from rfq.item_index import matching_item_positions, quoted_item_positions, supplier_item_positions
+from rfq.models import Company, ItemSupplierQuote, Project, ProjectItem, UserCompanyProfile
+
+
+def _items():
+    return [
+        {'id': 'i1', 'item_drawing_no': 'DRW-1', 'mpn': 'M-1', 'supplier': 'Main Co', 'suppliers': [
+            {'name': 'Other Co', 'price_1': 5, 'status': 'Quoted'},
+        ]},
+        {'id': 'i2', 'drawing_no': ' drw-2 ', 'mpn': 'M-2', 'suppliers': [{'name': 'Main Co'}]},
+        {'id': 'i3', 'item_drawing_no': 'DRW-3', 'mpn': 'M-3'},
+    ]
+
+
+class ProjectItemSyncTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Index Co')
+        self.project = Project.objects.create(id='idx-1', company=self.company, name='Idx', data={'items': _items()})
+
+    def test_rows_follow_blob_on_save(self):
+        rows = list(ProjectItem.objects.filter(project=self.project).values_list('position', 'item_id', 'drawing_no_norm'))
+        self.assertEqual(rows, [(0, 'i1', 'drw-1'), (1, 'i2', 'drw-2'), (2, 'i3', 'drw-3')])
+        self.assertEqual(ItemSupplierQuote.objects.filter(project=self.project).count(), 2)
+        self.assertEqual(supplier_item_positions(self.project, 'main  co'), [0, 1])
+        self.assertEqual(quoted_item_positions(self.project), [0])
+
+        data = self.project.data
+        data['items'][0]['suppliers'] = []
+        data['items'].pop(1)
+        self.project.save()
+        rows = list(ProjectItem.objects.filter(project=self.project).values_list('position', 'item_id'))
+        self.assertEqual(rows, [(0, 'i1'), (1, 'i3')])
+        self.assertEqual(ItemSupplierQuote.objects.filter(project=self.project).count(), 0)
+        self.assertEqual(quoted_item_positions(self.project), [])
+
+    def test_merge_with_index_positions_matches_full_scan(self):
+        incoming = {'items': [{'id': 'i1', 'suppliers': [{'name': 'Other Co', 'price_1': 0}]}, {'id': 'i3'}]}
+        full = _merge_preserve_supplier_quotes(self.project.data, json.loads(json.dumps(incoming)))
+        indexed = _merge_preserve_supplier_quotes(
+            self.project.data, json.loads(json.dumps(incoming)), quoted_item_positions(self.project),
+        )
+        self.assertEqual(indexed['items'][0], full['items'][0])
+        self.assertEqual(indexed['items'][0]['suppliers'][0]['price_1'], 5)
+
+    def test_identifiers_longer_than_the_columns_still_match(self):
+        long_id, long_dn, long_mpn, long_supplier = 'i' * 300, 'D' * 300, 'M' * 300, 'S' * 300
+        self.project.data = {'items': [{'id': long_id, 'item_drawing_no': long_dn, 'mpn': long_mpn, 'supplier': long_supplier}]}
+        self.project.save()
+        self.assertEqual(matching_item_positions(self.project, item_ids=[long_id]), [0])
+        self.assertEqual(matching_item_positions(self.project, drawing_nos=[long_dn]), [0])
+        self.assertEqual(matching_item_positions(self.project, mpns=[long_mpn]), [0])
+        self.assertEqual(supplier_item_positions(self.project, long_supplier), [0])
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class ItemIndexApiTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Index Api Co')
+        other = Company.objects.create(name='Index Other Co')
+        user = get_user_model().objects.create_user(username='editor_idx', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=self.company, role='editor', is_active=True)
+        Project.objects.create(id='idx-a', company=self.company, name='A', data={'items': _items()})
+        Project.objects.create(id='idx-b', company=self.company, name='B', data={'items': [{'id': 'x', 'item_drawing_no': 'drw-1'}]})
+        Project.objects.create(id='idx-c', company=other, name='C', data={'items': [{'id': 'y', 'item_drawing_no': 'DRW-1'}]})
+        self.assertTrue(self.client.login(username='editor_idx', password='pw12345'))
+
+    def test_lookup_is_scoped_and_normalized(self):
+        res = self.client.get('/api/items/lookup', {'drawing_no': ' DRW-1', 'exclude_project': 'idx-a'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([(m['project_id'], m['item_id']) for m in res.json()['items']], [('idx-b', 'x')])
+
+    def test_generate_uses_indexed_supplier_items(self):
+        res = self.client.post(
+            '/api/supplier_access/generate',
+            data=json.dumps({'project_id': 'idx-a', 'supplier_name': 'Main Co'}),
+            content_type='application/json',
+            HTTP_ORIGIN='http://testserver',
+        )
+        self.assertEqual(res.status_code, 200)
+        requested = res.json()['access']['requested_items']
+        self.assertEqual([r['id'] for r in requested], ['i1', 'i2'])
@@ -0,0 +1,35 @@
+from django.test import SimpleTestCase
+
+from rfq.item_matching import MatchIndex, drawing_no, find_supplier
+
+
+class MatchIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.rows = [
+            {'id': 'a', 'mpn': 'M-1'},
+            {'item_drawing_no': ' DRW  1 ', 'mpn': 'M-2'},
+            {'id': 'null', 'drawing_no': 'drw 1', 'mpn': 'm-1'},
+        ]
+
+    def test_first_row_wins_and_earliest_of_drawing_or_mpn(self):
+        index = MatchIndex(self.rows)
+        self.assertIs(index.by_id('a'), self.rows[0])
+        self.assertIsNone(index.by_id('null'))
+        # Drawing hits row 1, MPN hits row 0: the earlier row wins, like the old linear scan.
+        self.assertIs(index.by_drawing_or_mpn('DRW 1', ' m-1'), self.rows[0])
+        self.assertIs(index.by_drawing_or_mpn('drw 1', ''), self.rows[1])
+        self.assertIsNone(index.by_drawing_or_mpn('', ''))
+
+    def test_last_wins_lookup_chain(self):
+        index = MatchIndex(self.rows, last_wins=True)
+        self.assertIs(index.lookup('missing', 'drw 1', 'M-2'), self.rows[2])
+        self.assertIs(index.lookup('', '', 'M-1'), self.rows[2])
+        self.assertIs(index.lookup('a', 'drw 1'), self.rows[0])
+
+    def test_drawing_fields_and_supplier_lookup(self):
+        row = {'drawing_no': 'X', 'item_drawing_no': 'Y'}
+        self.assertEqual(drawing_no(row), 'Y')
+        self.assertEqual(drawing_no(row, ('drawing_no', 'item_drawing_no')), 'X')
+        sups = ['junk', {'name': 'Acme  Parts'}, {'supplier_name': 'acme parts'}]
+        self.assertIs(find_supplier(sups, ' ACME parts'), sups[1])
+        self.assertIsNone(find_supplier(sups, ''))
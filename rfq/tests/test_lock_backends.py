@@ -0,0 +1,94 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rfq import locks
+from rfq.models import AuditLog, Company, EditLock, Project, UserCompanyProfile
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class LockBackendTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.company = Company.objects.create(name='Lock Co')
+        for name in ('editor_lk', 'other_lk'):
+            UserCompanyProfile.objects.create(user=User.objects.create_user(username=name, password='pw12345'), company=self.company, role='admin', is_active=True)
+        for n in range(3):
+            Project.objects.create(id=f'lk-{n}', company=self.company, name=f'P{n}', data={'items': []})
+        self.assertTrue(self.client.login(username='editor_lk', password='pw12345'))
+
+    def _post(self, url, payload):
+        res = self.client.post(url, data=json.dumps(payload), content_type='application/json', HTTP_ORIGIN='http://testserver')
+        self.assertEqual(res.status_code, 200)
+        return res.json()
+
+    def _acquire(self, n):
+        return self._post('/api/locks/acquire', {'resource_key': f'project:lk-{n}:edit', 'project_id': f'lk-{n}'})
+
+    def _exercise_backend(self):
+        for n in range(3):
+            self.assertTrue(self._acquire(n)['acquired'])
+        self.client.logout()
+        self.assertTrue(self.client.login(username='other_lk', password='pw12345'))
+        self.assertFalse(self._acquire(0)['acquired'])
+        self.assertEqual(self.client.put('/api/projects/lk-0', data=json.dumps({'name': 'x'}), content_type='application/json', HTTP_ORIGIN='http://testserver').status_code, 409)
+        self.client.logout()
+        self.assertTrue(self.client.login(username='editor_lk', password='pw12345'))
+
+        keys = [f'project:lk-{n}:edit' for n in range(3)] + ['project:missing:edit']
+        results = self._post('/api/locks/heartbeat_batch', {'resource_keys': keys, 'ttl_sec': 120})['results']
+        self.assertTrue(all(results[k]['renewed'] for k in keys[:3]))
+        self.assertEqual(results['project:missing:edit'], {'renewed': False, 'reason': 'missing'})
+        self.assertTrue(self._post('/api/locks/heartbeat', {'resource_key': keys[0]})['renewed'])
+        status = self.client.get('/api/locks/status', {'resource_key': keys[1]}).json()
+        self.assertEqual((status['locked'], status['is_owner'], status['project_id']), (True, True, 'lk-1'))
+        self.assertEqual(len(self.client.get('/api/admin/locks').json()['locks']), 3)
+        self.assertTrue(self._post('/api/locks/release', {'resource_key': keys[2]})['released'])
+        self.assertFalse(self.client.get('/api/locks/status', {'resource_key': keys[2]}).json()['locked'])
+        self.assertFalse(AuditLog.objects.filter(action='lock.heartbeat').exists())
+        self.assertEqual(AuditLog.objects.filter(action='lock.release').count(), 1)
+
+    def test_db_backend_renews_batch_with_one_update(self):
+        self._exercise_backend()
+        self.assertEqual(EditLock.objects.count(), 2)
+        keys = [f'project:lk-{n}:edit' for n in range(2)]
+        with CaptureQueriesContext(connection) as ctx:
+            self._post('/api/locks/heartbeat_batch', {'resource_keys': keys})
+        writes = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "rfq_editlock"')]
+        self.assertEqual(len(writes), 1)
+        self.assertNotIn('rfq_auditlog', ' '.join(q['sql'] for q in ctx.captured_queries))
+
+    def test_db_backend_reports_leases_lost_before_the_update(self):
+        for n in range(2):
+            self.assertTrue(self._acquire(n)['acquired'])
+        other_id = get_user_model().objects.get(username='other_lk').id
+        real = locks._renew_result
+
+        def take_over(lease, user_id, now):
+            # Another user takes lk-0 over between the read and the conditional UPDATE.
+            if lease is not None and lease.resource_key == 'project:lk-0:edit':
+                EditLock.objects.filter(resource_key=lease.resource_key).update(locked_by_id=other_id)
+            return real(lease, user_id, now)
+
+        with mock.patch.object(locks, '_renew_result', side_effect=take_over):
+            results = self._post('/api/locks/heartbeat_batch', {'resource_keys': ['project:lk-0:edit', 'project:lk-1:edit']})['results']
+        self.assertEqual(results['project:lk-0:edit'], {'renewed': False, 'reason': 'owner_mismatch'})
+        self.assertTrue(results['project:lk-1:edit']['renewed'])
+
+    @override_settings(RFQ_LOCK_BACKEND='memory')
+    def test_memory_backend_keeps_leases_out_of_the_database(self):
+        self._exercise_backend()
+        self.assertFalse(EditLock.objects.exists())
+        self._post('/api/locks/release', {'resource_key': 'project:lk-0:edit'})
+        self._post('/api/locks/release', {'resource_key': 'project:lk-1:edit'})
+
+    def test_batch_rejects_bad_payloads(self):
+        res = self.client.post('/api/locks/heartbeat_batch', data=json.dumps({'resource_keys': 'x'}), content_type='application/json', HTTP_ORIGIN='http://testserver')
+        self.assertEqual(res.status_code, 400)
+        too_many = {'resource_keys': [f'k{n}' for n in range(101)]}
+        res = self.client.post('/api/locks/heartbeat_batch', data=json.dumps(too_many), content_type='application/json', HTTP_ORIGIN='http://testserver')
+        self.assertEqual(res.status_code, 400)
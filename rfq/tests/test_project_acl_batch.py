@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rfq.api_common import annotate_project_permissions, can_edit_project, can_view_project
+from rfq.models import Company, Project, ProjectAccess, UserCompanyProfile
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class BatchProjectAclTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.company = Company.objects.create(name='ACL Co')
+        self.user = User.objects.create_user(username='editor_acl', password='pw12345')
+        self.other = User.objects.create_user(username='other_acl', password='pw12345')
+        self.profile = UserCompanyProfile.objects.create(user=self.user, company=self.company, role='editor', is_active=True)
+        UserCompanyProfile.objects.create(user=self.other, company=self.company, role='editor', is_active=True)
+        self.open = Project.objects.create(id='acl-open', company=self.company, name='Open', data={})
+        self.granted = Project.objects.create(id='acl-granted', company=self.company, name='Granted', data={})
+        self.hidden = Project.objects.create(id='acl-hidden', company=self.company, name='Hidden', data={})
+        ProjectAccess.objects.create(project=self.granted, user=self.user, can_view=True, can_edit=False)
+        ProjectAccess.objects.create(project=self.hidden, user=self.other, can_view=True, can_edit=True)
+        self.assertTrue(self.client.login(username='editor_acl', password='pw12345'))
+
+    def _actor(self):
+        return {'user': self.user, 'company': self.company, 'role': 'editor', 'is_management': False, 'is_superadmin': False}
+
+    def test_annotated_checks_match_per_project_checks(self):
+        actor = self._actor()
+        annotated = {p.id: p for p in annotate_project_permissions(Project.objects.all(), actor)}
+        with self.assertNumQueries(0):
+            batch = {pid: (can_view_project(actor, p), can_edit_project(actor, p)) for pid, p in annotated.items()}
+        single = {p.id: (can_view_project(actor, p), can_edit_project(actor, p)) for p in Project.objects.all()}
+        self.assertEqual(batch, single)
+        self.assertEqual(batch['acl-open'], (True, True))
+        self.assertEqual(batch['acl-granted'], (True, False))
+        self.assertEqual(batch['acl-hidden'], (False, False))
+
+    def test_list_query_count_does_not_grow_with_projects(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.get('/api/projects')
+            self.assertEqual(res.status_code, 200)
+            return len(ctx.captured_queries), sorted(p['id'] for p in res.json()['projects'])
+
+        count_queries()  # warm the actor cache
+        before, ids = count_queries()
+        self.assertEqual(ids, ['acl-granted', 'acl-open'])
+        for i in range(10):
+            p = Project.objects.create(id=f'acl-extra-{i}', company=self.company, name=f'Extra {i}', data={})
+            ProjectAccess.objects.create(project=p, user=self.other, can_view=True)
+        after, ids = count_queries()
+        self.assertEqual(ids, ['acl-granted', 'acl-open'])
+        self.assertEqual(before, after)
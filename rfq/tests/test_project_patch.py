@@ -0,0 +1,90 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from rfq.json_patch import JsonPatchError, apply_patch
+from rfq.models import Company, Project, UserCompanyProfile
+
+
+class JsonPatchApplyTests(SimpleTestCase):
+    def test_basic_ops(self):
+        doc = {'items': [{'id': 'a'}, {'id': 'b'}], 'name': 'X', 'a/b': 1}
+        apply_patch(doc, [
+            {'op': 'replace', 'path': '/items/1/id', 'value': 'bb'},
+            {'op': 'add', 'path': '/items/-', 'value': {'id': 'c'}},
+            {'op': 'remove', 'path': '/items/0'},
+            {'op': 'test', 'path': '/name', 'value': 'X'},
+            {'op': 'copy', 'from': '/name', 'path': '/title'},
+            {'op': 'move', 'from': '/a~1b', 'path': '/ab'},
+        ])
+        self.assertEqual(doc, {'items': [{'id': 'bb'}, {'id': 'c'}], 'name': 'X', 'title': 'X', 'ab': 1})
+
+    def test_invalid_ops_raise(self):
+        with self.assertRaises(JsonPatchError):
+            apply_patch({'items': []}, [{'op': 'replace', 'path': '/items/0', 'value': 1}])
+        with self.assertRaises(JsonPatchError):
+            apply_patch({'name': 'X'}, [{'op': 'test', 'path': '/name', 'value': 'Y'}])
+        with self.assertRaises(JsonPatchError):
+            apply_patch({}, [{'op': 'replace', 'path': '', 'value': {}}])
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class ProjectPatchEndpointTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Patch Co')
+        user = get_user_model().objects.create_user(username='editor_patch', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=self.company, role='editor', is_active=True)
+        self.project = Project.objects.create(
+            id='proj-patch-1',
+            company=self.company,
+            name='Patched',
+            data={'id': 'proj-patch-1', 'name': 'Patched', 'items': [{'id': 'a', 'price_1': 1}, {'id': 'b', 'price_1': 2}]},
+        )
+        self.assertTrue(self.client.login(username='editor_patch', password='pw12345'))
+
+    def _patch(self, body):
+        return self.client.patch(
+            '/api/projects/proj-patch-1/patch',
+            data=json.dumps(body),
+            content_type='application/json',
+            HTTP_ORIGIN='http://testserver',
+        )
+
+    def test_patch_applies_delta_and_bumps_version(self):
+        base = self.project.updated_at.isoformat()
+        res = self._patch({'base_version': base, 'ops': [
+            {'op': 'replace', 'path': '/items/1/price_1', 'value': 9.5},
+            {'op': 'replace', 'path': '/name', 'value': 'Renamed'},
+        ]})
+        self.assertEqual(res.status_code, 200)
+        body = res.json()
+        self.assertEqual(body.get('applied'), 2)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.data['items'][1]['price_1'], 9.5)
+        self.assertEqual(self.project.data['items'][0]['price_1'], 1)
+        self.assertEqual(self.project.name, 'Renamed')
+        self.assertEqual(body.get('server_updated_at'), self.project.updated_at.isoformat())
+        self.assertNotEqual(body.get('server_updated_at'), base)
+
+    def test_stale_base_version_is_rejected(self):
+        base = self.project.updated_at.isoformat()
+        ok = self._patch({'base_version': base, 'ops': [{'op': 'replace', 'path': '/name', 'value': 'First'}]})
+        self.assertEqual(ok.status_code, 200)
+        stale = self._patch({'base_version': base, 'ops': [{'op': 'replace', 'path': '/name', 'value': 'Stale'}]})
+        self.assertEqual(stale.status_code, 409)
+        self.assertEqual(stale.json().get('code'), 'version_conflict')
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.name, 'First')
+
+    def test_failed_op_leaves_project_untouched(self):
+        base = self.project.updated_at.isoformat()
+        res = self._patch({'base_version': base, 'ops': [
+            {'op': 'replace', 'path': '/name', 'value': 'Partial'},
+            {'op': 'remove', 'path': '/items/7'},
+        ]})
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json().get('code'), 'invalid_patch')
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.name, 'Patched')
+        self.assertEqual(self.project.updated_at.isoformat(), base)
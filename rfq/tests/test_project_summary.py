@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from rfq.models import Company, Project, UserCompanyProfile
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class ProjectSummaryListTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Summary Co')
+        user = get_user_model().objects.create_user(username='viewer_summary', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=self.company, role='viewer', is_active=True)
+        for i in range(5):
+            Project.objects.create(
+                id=f'sum-{i}',
+                company=self.company,
+                name=f'Summary {i}',
+                data={'project_status': 'Open', 'items': [
+                    {'id': 'a', 'supplier': 'Acme', 'suppliers': [{'name': 'Beta'}, {'name': 'acme'}]},
+                    {'id': 'b'},
+                ]},
+            )
+        other = Company.objects.create(name='Summary Other')
+        Project.objects.create(id='sum-other', company=other, name='Other', data={})
+        self.assertTrue(self.client.login(username='viewer_summary', password='pw12345'))
+
+    def test_cursor_pages_cover_all_visible_projects(self):
+        seen = []
+        cursor = None
+        for _ in range(5):
+            params = {'view': 'summary', 'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            res = self.client.get('/api/projects', params)
+            self.assertEqual(res.status_code, 200)
+            body = res.json()
+            seen.extend(body['projects'])
+            cursor = body['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(sorted(p['id'] for p in seen), [f'sum-{i}' for i in range(5)])
+        row = seen[0]
+        self.assertEqual(row['project_status'], 'Open')
+        self.assertEqual(row['item_count'], 2)
+        self.assertEqual(row['supplier_count'], 2)
+        self.assertNotIn('items', row)
+        self.assertEqual(row['data_version'], Project.objects.get(id=row['id']).updated_at.isoformat())
+
+    def test_etag_round_trip_and_invalidation(self):
+        for params in ({'view': 'summary'}, {}):
+            first = self.client.get('/api/projects', params)
+            etag = first['ETag']
+            self.assertTrue(etag.startswith('W/"'))
+            again = self.client.get('/api/projects', params, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(again.status_code, 304)
+            Project.objects.get(id='sum-0').save()
+            changed = self.client.get('/api/projects', params, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(changed.status_code, 200)
+
+    def test_invalid_cursor_is_rejected(self):
+        res = self.client.get('/api/projects', {'view': 'summary', 'cursor': 'not-a-cursor'})
+        self.assertEqual(res.status_code, 400)
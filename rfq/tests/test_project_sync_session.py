@@ -0,0 +1,70 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from rfq.models import AuditLog, Company, Project, UserCompanyProfile
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'], RFQ_SYNC_CHUNK_MAX_PROJECTS=3)
+class ProjectSyncSessionTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.company = Company.objects.create(name='Sync Co')
+        user = User.objects.create_user(username='editor_sync', password='pw12345')
+        peer = User.objects.create_user(username='peer_sync', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=self.company, role='editor', is_active=True)
+        UserCompanyProfile.objects.create(user=peer, company=self.company, role='editor', is_active=True)
+        self.existing = Project.objects.create(id='sync-old', company=self.company, name='Old', data={'items': []})
+        self.stale = Project.objects.create(id='sync-stale', company=self.company, name='Stale', data={'items': []})
+        self.assertTrue(self.client.login(username='editor_sync', password='pw12345'))
+
+    def _post(self, url, body=None):
+        return self.client.post(url, data=json.dumps(body or {}), content_type='application/json', HTTP_ORIGIN='http://testserver')
+
+    def _begin(self, **body):
+        res = self._post('/api/projects/sync', body)
+        self.assertEqual(res.status_code, 201)
+        return res.json()['session']['id']
+
+    def test_chunks_report_per_project_results_and_commit_prunes(self):
+        sid = self._begin(full_replace=True, total_chunks=2)
+        chunk0 = {'projects': [
+            {'id': 'sync-new', 'name': 'New', 'items': [{'id': 'a'}]},
+            {'id': 'sync-stale', 'name': 'Overwrite', 'items': [], 'base_version': '2000-01-01T00:00:00+00:00'},
+        ]}
+        res = self._post(f'/api/projects/sync/{sid}/chunks/0', chunk0)
+        self.assertEqual(res.status_code, 200)
+        body = res.json()
+        self.assertEqual([(r['id'], r['status']) for r in body['results']], [('sync-new', 'upserted'), ('sync-stale', 'conflict')])
+        self.assertEqual(body['results'][1]['code'], 'version_conflict')
+        self.assertEqual(Project.objects.get(id='sync-stale').name, 'Stale')
+        self.assertEqual(Project.objects.get(id='sync-new').name, 'New')
+
+        # Resume: a retried chunk replays its recorded results instead of writing again.
+        Project.objects.filter(id='sync-new').update(name='Edited meanwhile')
+        replay = self._post(f'/api/projects/sync/{sid}/chunks/0', chunk0).json()
+        self.assertTrue(replay['replayed'])
+        self.assertEqual(Project.objects.get(id='sync-new').name, 'Edited meanwhile')
+
+        self.assertEqual(self._post(f'/api/projects/sync/{sid}/commit').json()['missing'], [1])
+        status = self.client.get(f'/api/projects/sync/{sid}').json()['session']
+        self.assertEqual(status['received_chunks'], [0])
+
+        self._post(f'/api/projects/sync/{sid}/chunks/1', {'projects': [{'id': 'sync-third', 'name': 'Third'}]})
+        res = self._post(f'/api/projects/sync/{sid}/commit')
+        self.assertEqual(res.status_code, 200)
+        session = res.json()['session']
+        self.assertEqual((session['status'], session['upserted'], session['conflicts'], session['deleted']), ('committed', 2, 1, 1))
+        self.assertEqual(set(Project.objects.values_list('id', flat=True)), {'sync-new', 'sync-stale', 'sync-third'})
+        self.assertEqual(AuditLog.objects.filter(action='project.bulk_sync').count(), 1)
+        self.assertEqual(self._post(f'/api/projects/sync/{sid}/chunks/2', {'projects': []}).status_code, 409)
+
+    def test_chunk_limits_and_session_ownership(self):
+        sid = self._begin()
+        too_many = {'projects': [{'id': f'p{i}'} for i in range(4)]}
+        self.assertEqual(self._post(f'/api/projects/sync/{sid}/chunks/0', too_many).status_code, 413)
+        self.client.logout()
+        self.assertTrue(self.client.login(username='peer_sync', password='pw12345'))
+        self.assertEqual(self.client.get(f'/api/projects/sync/{sid}').status_code, 404)
+        self.assertEqual(self._post(f'/api/projects/sync/{sid}/chunks/0', {'projects': []}).status_code, 404)
@@ -0,0 +1,82 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rfq.models import Company, Project, Quote, QuoteIndex, QuoteLine, UserCompanyProfile
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class QuoteBulkImportTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.company = Company.objects.create(name='Ingest Co')
+        self.other_company = Company.objects.create(name='Ingest Other')
+        user = User.objects.create_user(username='editor_ingest', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=self.company, role='editor', is_active=True)
+        self.project = Project.objects.create(id='ing-p', company=self.company, name='Ingest', data={})
+        Project.objects.create(id='ing-foreign', company=self.other_company, name='Foreign', data={})
+        self.assertTrue(self.client.login(username='editor_ingest', password='pw12345'))
+
+    def _import(self, rows):
+        res = self.client.post(
+            '/api/quotes/bulk_import/', data=json.dumps(rows), content_type='application/json', HTTP_ORIGIN='http://testserver',
+        )
+        self.assertEqual(res.status_code, 200)
+        return res.json()
+
+    def _rows(self, n, prefix='Q'):
+        return [
+            {
+                'supplier_name': f'Supplier {i}', 'quote_number': f'{prefix}-{i}', 'project_id': 'ing-p', 'currency': 'USD',
+                'items': [{'mpn': f'M{i}-{k}', 'qty': '10', 'price': '1,5', 'moq': '5', 'lead_time': '2 weeks'} for k in range(3)],
+            }
+            for i in range(n)
+        ]
+
+    def test_import_creates_quotes_lines_and_index_rows(self):
+        data = self._import(self._rows(2) + [
+            {'supplier_name': '', 'items': []},
+            {'supplier_name': 'X', 'project_id': 'ing-foreign', 'items': []},
+            {'supplier_name': 'No Number', 'items': [{'mpn': 'N1'}]},
+        ])
+        self.assertEqual((data['imported_quotes'], data['imported_lines']), (3, 7))
+        self.assertEqual(data['errors'], ['Row 3: Missing supplier name', 'Row 4: invalid project_id or access denied'])
+        quote = Quote.objects.get(quote_number='Q-1')
+        self.assertEqual((quote.company_id, quote.project_id, quote.currency, quote.source), (self.company.id, 'ing-p', 'USD', 'import'))
+        line = quote.lines.get(line_number=2)
+        self.assertEqual((line.mpn, line.price_1, line.moq, line.manufacturing_lead_time), ('M1-1', Decimal('1.5'), 5, '2 weeks'))
+        auto = Quote.objects.get(supplier_name='No Number')
+        self.assertTrue(auto.quote_number.startswith('NO_NUMBER_'))
+        self.assertEqual(auto.company_id, self.company.id)
+        self.assertEqual(QuoteIndex.objects.filter(source_type=QuoteIndex.SOURCE_MANUAL).count(), 3)
+        res = self.client.get('/api/quotes/', {'search': 'Supplier 1'})
+        self.assertEqual([q['quote_number'] for q in res.json()['quotes']], ['Q-1'])
+
+    def test_reimport_appends_lines_and_updates_header(self):
+        self._import(self._rows(1))
+        rows = self._rows(1)
+        rows[0]['supplier_name'] = 'Renamed'
+        data = self._import(rows + [dict(rows[0], items=[{'mpn': 'extra'}])])
+        self.assertEqual(data['imported_lines'], 4)
+        quote = Quote.objects.get(quote_number='Q-0')
+        self.assertEqual(quote.supplier_name, 'Renamed')
+        self.assertEqual(list(quote.lines.order_by('line_number').values_list('line_number', flat=True)), list(range(1, 8)))
+        self.assertEqual(QuoteIndex.objects.get(source_pk=quote.pk).supplier_name, 'Renamed')
+
+    def test_foreign_quote_number_is_reported(self):
+        Quote.objects.create(id='foreign-q', company=self.other_company, supplier_name='F', quote_number='Q-0', expire_date='2030-01-01')
+        data = self._import(self._rows(1))
+        self.assertEqual(data['errors'], ['Row 1: quote_number already in use'])
+        self.assertEqual(QuoteLine.objects.count(), 0)
+
+    def test_query_count_does_not_grow_per_row(self):
+        self._import(self._rows(1, prefix='warm'))
+        with CaptureQueriesContext(connection) as ctx:
+            self._import(self._rows(40, prefix='B'))
+        # Only the database's bulk-insert batch limit adds statements, never each row.
+        self.assertLess(len(ctx.captured_queries), 20)
+        self.assertEqual(QuoteLine.objects.filter(quote__quote_number__startswith='B-').count(), 120)
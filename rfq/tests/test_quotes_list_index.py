@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rfq.models import Company, Project, Quote, QuoteIndex, QuoteLine, SupplierAccess, UserCompanyProfile
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class QuotesListIndexTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Quotes Index Co')
+        user = get_user_model().objects.create_user(username='viewer_qidx', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=self.company, role='viewer', is_active=True)
+        self.project = Project.objects.create(id='qidx-p', company=self.company, name='Gearbox', data={})
+        today = date.today()
+        for i in range(4):
+            q = Quote.objects.create(
+                id=f'qidx-{i}', company=self.company, project=self.project, supplier_name=f'Supplier {i}',
+                quote_number=f'QN-{i}', expire_date=today + timedelta(days=-1 if i == 0 else 30),
+            )
+            QuoteLine.objects.create(quote=q, line_number=1)
+        SupplierAccess.objects.create(
+            id='qidx-portal', company=self.company, project=self.project, supplier_name='Portal Supplier',
+            status='submitted', submission_data={'quote_number': 'PQ-1', 'items': [{'id': 'a'}, {'id': 'b'}]},
+        )
+        SupplierAccess.objects.create(
+            id='qidx-sent', company=self.company, project=self.project, supplier_name='Not Listed', status='sent',
+        )
+        self.assertTrue(self.client.login(username='viewer_qidx', password='pw12345'))
+
+    def _list(self, **params):
+        res = self.client.get('/api/quotes/', params)
+        self.assertEqual(res.status_code, 200)
+        return res.json()
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(QuoteIndex.objects.filter(source_type='manual').count(), 4)
+        access = SupplierAccess.objects.get(id='qidx-sent')
+        access.status = 'submitted'
+        access.save()
+        self.assertEqual(self._list()['total'], 6)
+        Quote.objects.get(id='qidx-3').delete()
+        self.assertFalse(QuoteIndex.objects.filter(source_pk='qidx-3').exists())
+        self.assertEqual(self._list()['total'], 5)
+
+    def test_filters_and_shape(self):
+        body = self._list()
+        self.assertEqual(body['total'], 5)
+        portal = next(q for q in body['quotes'] if q['source_type'] == 'portal')
+        self.assertEqual((portal['quote_number'], portal['lines_count'], portal['project_name']), ('PQ-1', 2, 'Gearbox'))
+        manual = next(q for q in body['quotes'] if q['id'] == 'qidx-1')
+        self.assertEqual((manual['lines_count'], manual['status']), (1, 'active'))
+        self.assertEqual({q['id'] for q in self._list(expired='true')['quotes']}, {'qidx-0'})
+        self.assertEqual(self._list(expired='false')['total'], 4)
+        self.assertEqual({q['id'] for q in self._list(search='gearbox')['quotes']}, {'qidx-0', 'qidx-1', 'qidx-2', 'qidx-3', 'qidx-portal'})
+        self.assertEqual({q['id'] for q in self._list(quote_number='qn-2')['quotes']}, {'qidx-2'})
+
+    def test_cursor_pages_in_create_date_order(self):
+        ordered = [q['id'] for q in self._list()['quotes']]
+        seen = []
+        params = {'limit': 2}
+        while True:
+            body = self._list(**params)
+            seen.extend(q['id'] for q in body['quotes'])
+            if not body['next_cursor']:
+                break
+            params = {'limit': 2, 'cursor': body['next_cursor']}
+        self.assertEqual(seen, ordered)
+        created = [Quote.objects.filter(id=i).values_list('create_date', flat=True).first() or SupplierAccess.objects.get(id=i).created_at for i in ordered]
+        self.assertEqual(created, sorted(created, reverse=True))
+
+    def test_page_query_count_is_flat(self):
+        self._list()
+
+        def count():
+            with CaptureQueriesContext(connection) as ctx:
+                self._list(limit=3)
+            return len(ctx.captured_queries)
+
+        # session + user + count + page + one hydration query per source type
+        self.assertLessEqual(count(), 6)
+        for i in range(10):
+            Quote.objects.create(
+                id=f'qidx-extra-{i}', company=self.company, project=self.project, supplier_name='Extra',
+                quote_number=f'QX-{i}', expire_date=timezone.now().date(),
+            )
+        self.assertLessEqual(count(), 6)
@@ -0,0 +1,105 @@
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+const assert = require('assert');
+
+function makeLocalStorage(seed = {}) {
+  const map = new Map(Object.entries(seed));
+  return {
+    getItem: (k) => (map.has(k) ? map.get(k) : null),
+    setItem: (k, v) => { map.set(String(k), String(v)); },
+    removeItem: (k) => { map.delete(String(k)); },
+    key: (i) => Array.from(map.keys())[i] || null,
+    get length() { return map.size; },
+  };
+}
+
+function makeWindow() {
+  const listeners = new Map();
+  return {
+    __RFQ_AUTH_INVALID__: false,
+    addEventListener(type, cb) {
+      if (!listeners.has(type)) listeners.set(type, []);
+      listeners.get(type).push(cb);
+    },
+    dispatchEvent(ev) {
+      const arr = listeners.get(ev.type) || [];
+      arr.forEach((cb) => cb(ev));
+      return true;
+    },
+  };
+}
+
+const ok = (body) => ({ ok: true, clone() { return { json: async () => body }; }, json: async () => body });
+
+async function run() {
+  const file = path.resolve(__dirname, '../static/rfq/rfq_data.js');
+  const code = fs.readFileSync(file, 'utf8');
+
+  const server = { id: 'p1', name: 'Server', updated_at: '2026-02-16T10:00:00Z', server_updated_at: 'v1', data_version: 'v1', items: [{ id: 'a', qty: 1 }] };
+  const localStorage = makeLocalStorage({ rfq_projects_v1: JSON.stringify([server]) });
+  const window = makeWindow();
+
+  const patches = [];
+  let releasePatch = null;
+  const fetch = async (url, opts = {}) => {
+    if (url === '/api/projects' && (!opts.method || opts.method === 'GET')) return ok({ projects: [server] });
+    if (url === '/api/projects/p1/patch' && opts.method === 'PATCH') {
+      const body = JSON.parse(opts.body);
+      patches.push(body);
+      const version = `v${patches.length + 1}`;
+      if (patches.length === 1) await new Promise((r) => { releasePatch = r; });
+      return ok({ ok: true, server_updated_at: version, data_version: version });
+    }
+    return { ok: false, status: 404, clone() { return { json: async () => ({}) }; }, text: async () => 'not found' };
+  };
+
+  const context = {
+    window,
+    localStorage,
+    fetch,
+    console,
+    // Debounced background syncs are driven by the test instead.
+    setTimeout: (cb, ms) => (ms >= 500 ? 0 : setTimeout(cb, ms)),
+    clearTimeout: (id) => { if (id) clearTimeout(id); },
+    setInterval: (cb, ms) => (ms >= 1000 ? 0 : setInterval(cb, ms)),
+    clearInterval: (id) => { if (id) clearInterval(id); },
+    Date,
+    Math,
+    JSON,
+    CustomEvent: function(type, init) { this.type = type; this.detail = (init && init.detail) || {}; },
+  };
+
+  vm.createContext(context);
+  vm.runInContext(code, context);
+  await new Promise((r) => setTimeout(r, 20));
+
+  const RFQData = window.RFQData;
+  RFQData.updateProject({ ...RFQData.getProjects()[0], name: 'First edit' });
+  const firstSync = RFQData.syncNowAsync();
+  await new Promise((r) => setTimeout(r, 20));
+  assert.strictEqual(patches.length, 1, 'first edit goes out as a delta');
+
+  // Edit while the PATCH is still in flight.
+  const local = RFQData.getProjects()[0];
+  RFQData.updateProject({ ...local, items: [{ id: 'a', qty: 5 }] });
+  releasePatch();
+  await firstSync;
+
+  assert.strictEqual(RFQData.getProjects()[0].server_updated_at, 'v2');
+  await RFQData.syncNowAsync();
+  assert.strictEqual(patches.length, 2, 'edit made during the request must still be synced');
+  assert.strictEqual(patches[1].base_version, 'v2');
+  assert.ok(
+    patches[1].ops.some((op) => op.path === '/items/0' && op.value.qty === 5),
+    'second delta must carry the in-flight edit',
+  );
+  assert.ok(!patches[1].ops.some((op) => op.path === '/name'), 'already-sent edits are not resent');
+
+  console.log('PASS test_rfq_delta_sync_inflight_edit');
+}
+
+run().catch((err) => {
+  console.error('FAIL test_rfq_delta_sync_inflight_edit', err);
+  process.exit(1);
+});
@@ -46,7 +46,7 @@ async function run() {
     if (url === '/api/locks/acquire' && opts.method === 'POST') {
       return { ok: true, json: async () => ({ ok: true, acquired: true }) };
     }
-    if (url === '/api/locks/heartbeat' && opts.method === 'POST') {
+    if (url === '/api/locks/heartbeat_batch' && opts.method === 'POST') {
       return { ok: false, status: 409, text: async () => 'lost lock' };
     }
     if (url === '/api/projects' && (!opts.method || opts.method === 'GET')) {
@@ -0,0 +1,71 @@
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from rfq.models import Company, Project, RoundSnapshot, SupplierAccess, SupplierAccessRound, UserCompanyProfile
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class RoundSnapshotTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Snapshot Co')
+        user = get_user_model().objects.create_user(username='admin_snap', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=self.company, role='admin', is_active=True)
+        self.project = Project.objects.create(id='snap-p', company=self.company, name='Snap', data={'items': []})
+        self.requested = [{'id': f'i{n}', 'item_drawing_no': f'DRW-{n}', 'description': 'Bracket ' * 20} for n in range(50)]
+        self.assertTrue(self.client.login(username='admin_snap', password='pw12345'))
+
+    def _access(self, n):
+        return SupplierAccess.objects.create(
+            id=f'snap-{n}', company=self.company, project=self.project, supplier_name=f'Supplier {n}',
+            requested_items=self.requested,
+        )
+
+    def _submit(self, access, price):
+        payload = {'currency': 'EUR', 'items': [{'id': 'i0', 'price': price}]}
+        res = self.client.post(f'/api/supplier_access/{access.id}/submit', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+        return payload
+
+    def test_rounds_share_compressed_snapshots_and_history_is_unchanged(self):
+        accesses = [self._access(n) for n in range(3)]
+        payloads = [self._submit(a, '4.50') for a in accesses]
+        rounds = list(SupplierAccessRound.objects.select_related('requested_snapshot'))
+        self.assertEqual(len(rounds), 3)
+        # Same requested items and same submission everywhere: two stored snapshots in total.
+        self.assertEqual(RoundSnapshot.objects.count(), 2)
+        self.assertEqual(len({r.requested_snapshot_id for r in rounds}), 1)
+        self.assertEqual((rounds[0].requested_items, rounds[0].submission_data), ([], {}))
+        snapshot = rounds[0].requested_snapshot
+        self.assertLess(len(bytes(snapshot.data)), snapshot.raw_size / 5)
+        self.assertEqual(rounds[0].get_requested_items(), self.requested)
+
+        res = self.client.post(
+            f'/api/supplier_access/{accesses[0].id}/reject', data=json.dumps({'action': 'reject', 'reason': 'too high'}),
+            content_type='application/json', HTTP_ORIGIN='http://testserver',
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(RoundSnapshot.objects.count(), 2)
+        rows = self.client.get('/api/projects/snap-p/supplier_access').json()['accesses']
+        history = {r['id']: r['round_history'] for r in rows}
+        self.assertEqual(history['snap-0'][0]['submission_data'], SupplierAccess.objects.get(id='snap-0').submission_data)
+        self.assertEqual(history['snap-0'][0]['submission_data']['items'], payloads[0]['items'])
+        self.assertEqual(history['snap-0'][0]['buyer_decision'], 'rejected')
+
+    def test_compact_command_moves_legacy_rows_and_prunes_orphans(self):
+        legacy = [self._access(n) for n in range(2)]
+        for access in legacy:
+            SupplierAccessRound.objects.create(
+                company=self.company, supplier_access=access, round=1,
+                requested_items=self.requested, submission_data={'items': [{'id': 'i0', 'price': '1'}]},
+            )
+        self._submit(self._access(9), '7')
+        SupplierAccess.objects.filter(id='snap-9').delete()
+        call_command('compact_round_snapshots', stdout=io.StringIO())
+        self.assertFalse(SupplierAccessRound.objects.filter(requested_snapshot__isnull=True).exists())
+        self.assertEqual(RoundSnapshot.objects.count(), 2)
+        rnd = SupplierAccessRound.objects.get(supplier_access_id='snap-1')
+        self.assertEqual(rnd.get_submission_data(), {'items': [{'id': 'i0', 'price': '1'}]})
@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rfq.models import Company, Project, SupplierAccess, SupplierAccessRound, SupplierInteractionFile, UserCompanyProfile
+
+MEDIA = tempfile.mkdtemp(prefix='rfq-access-list-')
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'], MEDIA_ROOT=MEDIA)
+class SupplierAccessListTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA, ignore_errors=True)
+
+    def setUp(self):
+        self.company = Company.objects.create(name='Access List Co')
+        user = get_user_model().objects.create_user(username='viewer_sal', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=self.company, role='viewer', is_active=True)
+        self.project = Project.objects.create(id='sal-p', company=self.company, name='SAL', data={'items': [{'id': 'a'}]})
+        for n in range(3):
+            self._add_access(n)
+        self.assertTrue(self.client.login(username='viewer_sal', password='pw12345'))
+
+    def _add_access(self, n):
+        acc = SupplierAccess.objects.create(
+            id=f'sal-{n}', company=self.company, project=self.project, supplier_name=f'Supplier {n}',
+            requested_items=[{'id': 'a'}], submission_data={'items': [{'id': 'a', 'price': '3'}], 'notes': 'ok'},
+            status='submitted', round=2,
+        )
+        for r in (1, 2):
+            SupplierAccessRound.objects.create(
+                company=self.company, supplier_access=acc, round=r,
+                requested_items=[{'id': 'a'}], submission_data={'items': [{'id': 'a', 'price': str(r)}]},
+            )
+        SupplierInteractionFile.objects.create(
+            company=self.company, supplier_access=acc, round=1, file=SimpleUploadedFile(f'sal-{n}.txt', b'x'),
+            original_name=f'sal-{n}.txt', size=1, uploaded_by='supplier',
+        )
+
+    def _list(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get('/api/projects/sal-p/supplier_access', params)
+        self.assertEqual(res.status_code, 200)
+        return res.json()['accesses'], len(ctx.captured_queries)
+
+    def test_full_list_keeps_shape_with_flat_query_count(self):
+        self._list()
+        rows, before = self._list()
+        row = rows[0]
+        self.assertEqual([h['round'] for h in row['round_history']], [1, 2])
+        self.assertEqual(len(row['files']), 1)
+        self.assertEqual(row['validation'], {'is_complete': True, 'rejection_reason': None})
+        self.assertEqual(row['submission_summary'], {'notes': 'ok', 'items_count': 1})
+        for n in range(3, 8):
+            self._add_access(n)
+        rows, after = self._list()
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(before, after)
+
+    def test_summary_and_history_options(self):
+        rows, _ = self._list(fields='summary')
+        row = rows[0]
+        self.assertNotIn('requested_items', row)
+        self.assertNotIn('submission_data', row)
+        self.assertNotIn('round_history', row)
+        self.assertEqual((row['files_count'], row['rounds_count'], row['is_complete']), (1, 2, True))
+        rows, _ = self._list(include_history='0')
+        self.assertNotIn('round_history', rows[0])
+        self.assertIn('requested_items', rows[0])
+        rows, _ = self._list(ids='sal-1', fields='summary', include_history='1')
+        self.assertEqual([r['id'] for r in rows], ['sal-1'])
+        self.assertEqual(len(rows[0]['round_history']), 2)
@@ -0,0 +1,99 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rfq import api_supplier
+from rfq.models import AuditLog, Company, Project, Quote, QuoteIndex, SupplierAccess, SupplierAccessRound, UserCompanyProfile
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class SupplierBatchApproveTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Batch Co')
+        user = get_user_model().objects.create_user(username='admin_batch', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=self.company, role='admin', is_active=True)
+        items = [{'id': f'i{n}', 'item_drawing_no': f'DRW-{n}', 'mpn': f'M-{n}', 'qty_1': '10'} for n in range(3)]
+        self.project = Project.objects.create(id='batch-p', company=self.company, name='Batch', data={'items': items})
+        self.assertTrue(self.client.login(username='admin_batch', password='pw12345'))
+
+    def _access(self, n, **submission):
+        sub = {'currency': 'EUR', 'items': [{'id': 'i0', 'price': str(10 + n)}, {'item_drawing_no': 'drw-1', 'price_1': '5'}]}
+        sub.update(submission)
+        return SupplierAccess.objects.create(
+            id=f'batch-{n}', company=self.company, project=self.project, supplier_name=f'Supplier {n}',
+            requested_items=[{'id': 'i0', 'item_drawing_no': 'DRW-0'}, {'id': 'i1', 'item_drawing_no': 'DRW-1'}],
+            status='submitted', round=1, submission_data=sub,
+        )
+
+    def _batch(self, tokens):
+        return self.client.post(
+            '/api/supplier_access/batch_approve', data=json.dumps({'tokens': tokens}),
+            content_type='application/json', HTTP_ORIGIN='http://testserver',
+        )
+
+    def test_batch_applies_every_submission_with_one_project_write(self):
+        accesses = [self._access(n, quote_number=f'BQ-{n}') for n in range(4)]
+        SupplierAccessRound.objects.create(company=self.company, supplier_access=accesses[0], round=1)
+        res = self._batch([a.id for a in accesses] + ['nope'])
+        self.assertEqual(res.status_code, 200)
+        results = res.json()['results']
+        self.assertEqual([r['token'] for r in results], ['batch-0', 'batch-1', 'batch-2', 'batch-3', 'nope'])
+        self.assertEqual(results[-1], {'token': 'nope', 'ok': False, 'error': 'Invalid token'})
+        self.assertEqual([r['updated_items'] for r in results[:4]], [2, 2, 2, 2])
+        self.assertEqual(results[0]['unmatched_items'][0]['id'], 'i2')
+        self.assertEqual(results[2]['quote_number'], 'BQ-2')
+
+        self.project.refresh_from_db()
+        sups = {s['name']: s for s in self.project.data['items'][0]['suppliers']}
+        self.assertEqual(sorted(sups), ['Supplier 0', 'Supplier 1', 'Supplier 2', 'Supplier 3'])
+        self.assertEqual(sups['Supplier 3']['price'], 13.0)
+        self.assertEqual(sups['Supplier 3']['quote_number'], 'BQ-3')
+        self.assertEqual(Quote.objects.filter(project=self.project).count(), 4)
+        self.assertEqual(Quote.objects.get(quote_number='BQ-1').lines.count(), 2)
+        self.assertEqual(QuoteIndex.objects.filter(source_type=QuoteIndex.SOURCE_MANUAL).count(), 4)
+        self.assertEqual(SupplierAccessRound.objects.filter(buyer_decision='approved').count(), 4)
+        self.assertEqual(SupplierAccess.objects.filter(status='approved').count(), 4)
+        self.assertEqual(AuditLog.objects.filter(action='supplier.approve').count(), 4)
+
+    def test_project_blob_is_written_once_per_batch(self):
+        accesses = [self._access(n) for n in range(5)]
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._batch([a.id for a in accesses]).status_code, 200)
+        blob_writes = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "rfq_project"')]
+        self.assertEqual(len(blob_writes), 1)
+
+    def test_failing_project_is_reported_per_token(self):
+        accesses = [self._access(n) for n in range(2)]
+        other = Project.objects.create(id='batch-q', company=self.company, name='Other', data={'items': [{'id': 'i0', 'item_drawing_no': 'DRW-0'}]})
+        broken = SupplierAccess.objects.create(
+            id='batch-x', company=self.company, project=other, supplier_name='Broken',
+            requested_items=[{'id': 'i0'}], status='submitted', round=1, submission_data={'items': [{'id': 'i0', 'price': '1'}]},
+        )
+        real = api_supplier._approve_into_project
+
+        def approve(actor, proj, accs, now, user):
+            if proj.id == other.id:
+                raise RuntimeError('boom')
+            return real(actor, proj, accs, now, user)
+
+        with mock.patch.object(api_supplier, '_approve_into_project', side_effect=approve), self.assertLogs(api_supplier.logger, 'ERROR'):
+            res = self._batch([broken.id] + [a.id for a in accesses])
+        self.assertEqual(res.status_code, 200)
+        results = res.json()['results']
+        self.assertEqual(results[0], {'token': 'batch-x', 'ok': False, 'error': 'Approval failed'})
+        self.assertEqual([r['ok'] for r in results[1:]], [True, True])
+        self.assertEqual(SupplierAccess.objects.get(id='batch-x').status, 'submitted')
+        self.assertEqual(SupplierAccess.objects.filter(status='approved').count(), 2)
+
+    def test_single_approve_keeps_response_shape(self):
+        access = self._access(0, quote_number='SINGLE-1')
+        res = self.client.post(
+            f'/api/supplier_access/{access.id}/approve', data='{}', content_type='application/json', HTTP_ORIGIN='http://testserver',
+        )
+        body = res.json()
+        self.assertEqual((body['ok'], body['updated_items'], body['quote_number']), (True, 2, 'SINGLE-1'))
+        self.assertEqual(len(body['unmatched_items']), 1)
@@ -0,0 +1,56 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rfq.models import ChangeEvent, Company, Project, QuoteIndex, SupplierAccess, UserCompanyProfile
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class SupplierBulkGenerateTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Bulk Gen Co')
+        user = get_user_model().objects.create_user(username='editor_bulkgen', password='pw12345')
+        UserCompanyProfile.objects.create(user=user, company=self.company, role='editor', is_active=True)
+        items = [
+            {'id': 'a', 'item_drawing_no': 'DRW-A', 'qty': '5', 'supplier': 'Acme  Parts'},
+            {'id': 'b', 'item_drawing_no': 'DRW-B', 'suppliers': [{'name': 'acme parts'}, {'supplier': 'Beta'}]},
+            {'id': 'c', 'item_drawing_no': 'DRW-C', 'suppliers': [{'name': 'Gamma'}]},
+        ]
+        items += [{'id': f'x{n}', 'suppliers': [{'name': f'S{n % 20}'}]} for n in range(200)]
+        self.project = Project.objects.create(id='bg-p', company=self.company, name='Bulk Gen', data={'items': items})
+        self.assertTrue(self.client.login(username='editor_bulkgen', password='pw12345'))
+
+    def _generate(self, names):
+        res = self.client.post(
+            '/api/supplier_access/bulk_generate', data=json.dumps({'project_id': 'bg-p', 'supplier_names': names}),
+            content_type='application/json', HTTP_ORIGIN='http://testserver',
+        )
+        self.assertEqual(res.status_code, 200)
+        return res.json()
+
+    def test_requested_items_index_rows_and_events(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            data = self._generate(['ACME parts', 'Beta', 'Nobody', ' '])
+        self.assertEqual(data['count'], 3)
+        by_name = {a['supplier_name']: a for a in data['accesses']}
+        self.assertEqual([i['id'] for i in by_name['ACME parts']['requested_items']], ['a', 'b'])
+        self.assertEqual(by_name['ACME parts']['requested_items'][0]['qty_1'], '5')
+        self.assertEqual([i['id'] for i in by_name['Beta']['requested_items']], ['b'])
+        self.assertEqual(by_name['Nobody']['requested_items'], [])
+        access = SupplierAccess.objects.get(supplier_name='Beta')
+        self.assertEqual((access.company_id, access.status, access.round), (self.company.id, 'sent', 1))
+        self.assertEqual(QuoteIndex.objects.filter(source_type=QuoteIndex.SOURCE_PORTAL).count(), 3)
+        events = ChangeEvent.objects.filter(kind=ChangeEvent.KIND_SUPPLIER_ACCESS)
+        self.assertEqual(sorted(e.payload['access_id'] for e in events), sorted(by_name[n]['id'] for n in by_name))
+
+    def test_query_count_does_not_depend_on_supplier_count(self):
+        self._generate(['S0'])
+        with CaptureQueriesContext(connection) as few:
+            self._generate(['S1', 'S2'])
+        with CaptureQueriesContext(connection) as many:
+            self._generate([f'S{n}' for n in range(3, 20)])
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+        self.assertEqual(len(SupplierAccess.objects.get(supplier_name='S7').requested_items), 10)
@@ -0,0 +1,98 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from rfq.models import Company, Project, StoredBlob, SupplierAccess, SupplierInteractionFile
+
+MEDIA = tempfile.mkdtemp(prefix='rfq-file-store-')
+BODY = b'%PDF-1.4 datasheet ' + bytes(range(256)) * 40
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'], MEDIA_ROOT=MEDIA)
+class SupplierFileStoreTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA, ignore_errors=True)
+
+    def setUp(self):
+        company = Company.objects.create(name='File Store Co')
+        project = Project.objects.create(id='fs-p', company=company, name='FS', data={'items': []})
+        self.accesses = [
+            SupplierAccess.objects.create(
+                id=f'fs-{n}', company=company, project=project, supplier_name=f'Supplier {n}', requested_items=[{'id': 'a'}],
+            )
+            for n in range(2)
+        ]
+
+    def _submit(self, access, body=BODY, name='datasheet.pdf'):
+        res = self.client.post(f'/api/supplier_access/{access.id}/submit', {
+            'data': json.dumps({'items': [{'id': 'a', 'price': '1'}]}),
+            'files': SimpleUploadedFile(name, body, content_type='application/pdf'),
+        })
+        self.assertEqual(res.status_code, 200)
+        return SupplierInteractionFile.objects.filter(supplier_access=access).latest('id')
+
+    def _download(self, f, **headers):
+        return self.client.get(f'/api/supplier_interaction/file/{f.id}', {'token': f.supplier_access_id}, **headers)
+
+    def test_identical_uploads_share_one_blob_until_last_reference_goes(self):
+        first = self._submit(self.accesses[0])
+        second = self._submit(self.accesses[1], name='same-bytes.pdf')
+        blob = StoredBlob.objects.get()
+        self.assertEqual((blob.sha256, blob.size, blob.ref_count), (hashlib.sha256(BODY).hexdigest(), len(BODY), 2))
+        self.assertEqual((first.blob_id, second.blob_id), (blob.id, blob.id))
+        self.assertEqual(second.as_dict()['name'], 'same-bytes.pdf')
+        path = blob.file.path
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.accesses[0].delete()
+        self.assertEqual(StoredBlob.objects.get().ref_count, 1)
+        self.assertTrue(os.path.exists(path))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(StoredBlob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_download_supports_etag_and_ranges(self):
+        f = self._submit(self.accesses[0])
+        full = self._download(f)
+        self.assertEqual(full.status_code, 200)
+        self.assertEqual(b''.join(full.streaming_content), BODY)
+        self.assertEqual(full['Accept-Ranges'], 'bytes')
+        self.assertIn('datasheet.pdf', full['Content-Disposition'])
+        etag = full['ETag']
+        self.assertEqual(self._download(f, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        part = self._download(f, HTTP_RANGE='bytes=4-11')
+        self.assertEqual(part.status_code, 206)
+        self.assertEqual(part['Content-Range'], f'bytes 4-11/{len(BODY)}')
+        self.assertEqual(b''.join(part.streaming_content), BODY[4:12])
+        tail = self._download(f, HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(tail.streaming_content), BODY[-5:])
+        self.assertEqual(self._download(f, HTTP_RANGE=f'bytes={len(BODY)}-').status_code, 416)
+        stale = self._download(f, HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE='"other"')
+        self.assertEqual(stale.status_code, 200)
+
+    def test_dedupe_command_moves_legacy_copies_onto_one_blob(self):
+        for access in self.accesses:
+            SupplierInteractionFile.objects.create(
+                supplier_access=access, round=1, file=ContentFile(BODY, name='legacy.pdf'),
+                original_name='legacy.pdf', size=len(BODY), uploaded_by='supplier',
+            )
+        legacy_paths = [f.file.path for f in SupplierInteractionFile.objects.all()]
+        call_command('dedupe_interaction_files', stdout=io.StringIO())
+        self.assertEqual(StoredBlob.objects.get().ref_count, 2)
+        self.assertFalse(SupplierInteractionFile.objects.filter(blob__isnull=True).exists())
+        self.assertFalse(any(os.path.exists(p) for p in legacy_paths))
+        f = SupplierInteractionFile.objects.first()
+        self.assertEqual(b''.join(self._download(f).streaming_content), BODY)
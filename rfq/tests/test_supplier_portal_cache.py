@@ -0,0 +1,58 @@
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from rfq.models import Company, Project, SupplierAccess
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class SupplierPortalCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name='Portal Co')
+        self.project = Project.objects.create(id='portal-p', company=self.company, name='Pump Housing', data={'items': []})
+        self.access = SupplierAccess.objects.create(
+            id='portal-tok', company=self.company, project=self.project, supplier_name='Acme',
+            requested_items=[{'id': 'i1', 'item_drawing_no': 'DRW-1', 'drawing_no': 'DRW-1', 'qty_1': '10', 'qty_2': '50'}],
+        )
+        self.url = f'/portal/{self.access.id}/'
+
+    def test_repeat_visit_is_not_modified_and_save_changes_version(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('Pump Housing', first.content.decode())
+        self.assertEqual(first['Cache-Control'], 'private, no-cache')
+        second = self.client.get(self.url)
+        etag = second['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        res = self.client.post(
+            f'/api/supplier_access/{self.access.id}/save_draft',
+            data=json.dumps({'items': [{'id': 'i1', 'price': '4.25'}]}), content_type='application/json',
+        )
+        self.assertEqual(res.status_code, 200)
+        fresh = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh['ETag'], etag)
+        self.assertIn('4.25', fresh.content.decode())
+
+    def test_cached_page_carries_each_visitors_csrf_token(self):
+        pages = []
+        for _ in range(2):
+            client = Client(enforce_csrf_checks=True)
+            html = client.get(self.url).content.decode()
+            token = client.cookies['csrftoken'].value
+            pages.append((html, token))
+        self.assertNotIn('__rfq_portal_csrf_token__', pages[0][0])
+        self.assertNotEqual(pages[0][1], pages[1][1])
+        for html, _ in pages:
+            self.assertIn('name="csrfmiddlewaretoken"', html)
+
+    def test_partial_save_bumps_updated_at(self):
+        before = self.access.updated_at
+        self.access.status = 'expired'
+        self.access.save(update_fields=['status'])
+        self.access.refresh_from_db()
+        self.assertGreater(self.access.updated_at, before)
+        self.assertIn('has been cancelled', self.client.get(self.url).content.decode())
@@ -0,0 +1,59 @@
+import json
+
+from django.test import TestCase, override_settings
+
+from rfq.models import Company, Project, SupplierAccess
+
+
+@override_settings(DEBUG=False, SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=['testserver'])
+class SupplierPortalItemsTests(TestCase):
+    def setUp(self):
+        company = Company.objects.create(name='Portal Items Co')
+        project = Project.objects.create(id='pi-p', company=company, name='Large RFQ', data={'items': []})
+        items = [{'id': f'i{n}', 'item_drawing_no': f'DRW-{n}', 'mpn': f'M-{n}', 'qty_1': '10'} for n in range(25)]
+        items.append({'id': 'late', 'item_drawing_no': 'DRW-LATE', 'description': 'Gasket', 'added_at': '2026-01-01T00:00:00'})
+        self.access = SupplierAccess.objects.create(
+            id='pi-tok', company=company, project=project, supplier_name='Acme', requested_items=items,
+            submission_data={'currency': 'EUR', 'items': [{'id': 'i1', 'price': '3.10'}]},
+        )
+
+    def _items(self, **params):
+        res = self.client.get(f'/api/supplier_access/{self.access.id}/items', params)
+        self.assertEqual(res.status_code, 200)
+        return res.json()
+
+    def _patch(self, body):
+        return self.client.post(
+            f'/api/supplier_access/{self.access.id}/draft_items', data=json.dumps(body), content_type='application/json',
+        )
+
+    def test_paging_filtering_and_prefilled_values(self):
+        page = self._items(offset=0, limit=10)
+        self.assertEqual((page['total'], len(page['items']), page['next_offset']), (26, 10, 10))
+        self.assertEqual(page['items'][1]['submitted_price'], '3.10')
+        last = self._items(offset=20, limit=10)
+        self.assertEqual((len(last['items']), last['next_offset']), (6, None))
+        self.assertEqual([i['id'] for i in self._items(section='updated')['items']], ['late'])
+        self.assertEqual([i['id'] for i in self._items(q='gasket')['items']], ['late'])
+        self.assertEqual(self._items(q='drw-2', limit=5)['total'], 6)
+        self.assertNotIn('submitted_price', self.access.requested_items[1])
+
+    def test_patch_merges_only_sent_rows(self):
+        res = self._patch({'currency': 'USD', 'items': [
+            {'id': 'i1', 'price': '3.50'},
+            {'item_drawing_no': 'DRW-7', 'price': '9', 'moq': '100'},
+            {'id': 'ghost', 'price': '1'},
+        ]})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual((res.json()['patched'], res.json()['unmatched'][0]['id']), (2, 'ghost'))
+        self.access.refresh_from_db()
+        draft = self.access.submission_data
+        self.assertEqual((draft['currency'], draft['is_draft'], self.access.status), ('USD', True, 'viewed'))
+        self.assertEqual([(i.get('id'), i['price']) for i in draft['items']], [('i1', '3.50'), (None, '9')])
+        self.assertEqual(self._items(offset=7, limit=1)['items'][0]['submitted_moq'], '100')
+
+        self.assertEqual(self._patch({'items': [{'id': 'i2', 'price': 'abc'}]}).status_code, 400)
+        self.access.status = 'submitted'
+        self.access.save(update_fields=['status'])
+        self.assertEqual(self._patch({'items': [{'id': 'i2', 'price': '1'}]}).status_code, 403)
+        self.assertEqual(self.client.get('/api/supplier_access/nope/items').status_code, 404)
@@ -3,6 +3,7 @@ from . import views
 from . import api_projects
 from . import api_supplier
 from . import api_quotes
+from . import api_events
 
 urlpatterns = [
     path('', views.app, name='rfq_app'),
@@ -18,29 +19,45 @@ urlpatterns = [
     path('api/projects', api_projects.projects_collection, name='api_projects_collection'),
     path('api/projects/bulk', api_projects.projects_bulk, name='api_projects_bulk'),
     path('api/projects/reset', api_projects.projects_reset, name='api_projects_reset'),
+    path('api/projects/sync', api_projects.projects_sync_begin, name='api_projects_sync_begin'),
+    path('api/projects/sync/<str:session_id>', api_projects.projects_sync_status, name='api_projects_sync_status'),
+    path('api/projects/sync/<str:session_id>/chunks/<int:seq>', api_projects.projects_sync_chunk, name='api_projects_sync_chunk'),
+    path('api/projects/sync/<str:session_id>/commit', api_projects.projects_sync_commit, name='api_projects_sync_commit'),
     path('api/projects/<str:project_id>', api_projects.project_detail, name='api_project_detail'),
+    path('api/projects/<str:project_id>/patch', api_projects.project_patch, name='api_project_patch'),
     path('api/projects/<str:project_id>/attachments', api_projects.project_attachments, name='api_project_attachments'),
     path('api/projects/<str:project_id>/access', api_projects.project_access, name='api_project_access'),
     path('api/projects/<str:project_id>/attachments/<str:attachment_id>', api_projects.project_attachment_detail, name='api_project_attachment_detail'),
+    path('api/items/lookup', api_projects.items_lookup, name='api_items_lookup'),
     path('api/export', api_projects.export_data, name='api_export'),
+    path('api/export/jobs', api_projects.export_jobs_create, name='api_export_jobs_create'),
+    path('api/export/jobs/<str:job_id>', api_projects.export_job_status, name='api_export_job_status'),
+    path('api/export/jobs/<str:job_id>/download', api_projects.export_job_download, name='api_export_job_download'),
 
     # Edit locks API
     path('api/locks/acquire', api_projects.locks_acquire, name='api_locks_acquire'),
     path('api/locks/heartbeat', api_projects.locks_heartbeat, name='api_locks_heartbeat'),
+    path('api/locks/heartbeat_batch', api_projects.locks_heartbeat_batch, name='api_locks_heartbeat_batch'),
     path('api/locks/release', api_projects.locks_release, name='api_locks_release'),
     path('api/locks/status', api_projects.locks_status, name='api_locks_status'),
     path('api/locks/force_unlock', api_projects.locks_force_unlock, name='api_locks_force_unlock'),
+    # Change notifications (JSON poll + Server-Sent Events)
+    path('api/events', api_events.events_poll, name='api_events_poll'),
+    path('api/events/stream', api_events.events_stream, name='api_events_stream'),
 
     # Admin management API (in-app admin page backend)
     path('api/admin/users', api_projects.admin_users, name='api_admin_users'),
     path('api/admin/companies', api_projects.admin_companies, name='api_admin_companies'),
     path('api/admin/audit_logs', api_projects.admin_audit_logs, name='api_admin_audit_logs'),
+    path('api/admin/audit_logs/export', api_projects.admin_audit_logs_export, name='api_admin_audit_logs_export'),
     path('api/admin/locks', api_projects.admin_locks, name='api_admin_locks'),
 
     # Supplier Interaction API
     path('api/supplier_access/generate', api_supplier.supplier_access_generate, name='api_supplier_access_generate'),
     path('api/supplier_access/<str:token>/submit', api_supplier.supplier_portal_submit, name='api_supplier_portal_submit'),
     path('api/supplier_access/<str:token>/save_draft', api_supplier.supplier_portal_save_draft, name='api_supplier_portal_save_draft'),
+    path('api/supplier_access/<str:token>/items', api_supplier.supplier_portal_items, name='api_supplier_portal_items'),
+    path('api/supplier_access/<str:token>/draft_items', api_supplier.supplier_portal_patch_draft, name='api_supplier_portal_patch_draft'),
     path('api/supplier_access/<str:token>/approve', api_supplier.supplier_access_approve, name='api_supplier_access_approve'),
     path('api/projects/<str:project_id>/supplier_access', api_supplier.project_supplier_access_list, name='api_project_supplier_access_list'),
     path('api/supplier_access/<str:token>/viewed', api_supplier.supplier_access_viewed, name='api_supplier_access_viewed'),
@@ -50,6 +67,7 @@ urlpatterns = [
     path('api/supplier_access/<str:token>/cancel', api_supplier.supplier_access_cancel, name='api_supplier_access_cancel'),
     path('api/supplier_access/<str:token>/reopen', api_supplier.supplier_access_reopen_buyer, name='api_supplier_access_reopen_buyer'),
     path('api/supplier_access/bulk_generate', api_supplier.supplier_access_bulk_generate, name='api_supplier_access_bulk_generate'),
+    path('api/supplier_access/batch_approve', api_supplier.supplier_access_batch_approve, name='api_supplier_access_batch_approve'),
     path('api/supplier_interaction/file/<str:file_id>', api_supplier.supplier_interaction_file_download, name='api_supplier_interaction_file_download'),
 
     # Quotes API
@@ -56,13 +56,44 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'rfq_django.wsgi.application'
 
-DATABASES = {
-    'default': {
-        # SQLite is convenient for local/dev use; for production prefer PostgreSQL/MySQL.
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DJANGO_DB_ENGINE=postgresql selects the production profile (needs
+# requirements-postgres.txt); anything else keeps SQLite for local/small installs.
+DB_ENGINE = os.environ.get('DJANGO_DB_ENGINE', 'sqlite').strip().lower()
+if DB_ENGINE in ('postgres', 'postgresql'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DJANGO_DB_NAME', 'rfq'),
+            'USER': os.environ.get('DJANGO_DB_USER', 'rfq'),
+            'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', ''),
+            'HOST': os.environ.get('DJANGO_DB_HOST', '127.0.0.1'),
+            'PORT': os.environ.get('DJANGO_DB_PORT', '5432'),
+            # Persistent connections, re-checked before reuse after a DB restart.
+            'CONN_MAX_AGE': int(os.environ.get('DJANGO_DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
     }
-}
+    if os.environ.get('DJANGO_DB_POOL', '0') == '1':
+        # psycopg connection pool (psycopg_pool); Django requires CONN_MAX_AGE=0 with it.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DJANGO_DB_POOL_MIN', '2')),
+            'max_size': int(os.environ.get('DJANGO_DB_POOL_MAX', '10')),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DJANGO_DB_NAME') or BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+# SQLite tuning applied to every new connection (rfq.signals): WAL lets readers
+# run while one request writes, and writers wait up to the busy timeout
+# instead of failing with "database is locked".
+RFQ_SQLITE_WAL = os.environ.get('RFQ_SQLITE_WAL', '1') == '1'
+RFQ_SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('RFQ_SQLITE_BUSY_TIMEOUT_MS', '5000'))
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -96,6 +127,65 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Increase max upload size for large project data sync
 DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
 
+# Seconds an API actor's profile stays cached between requests (0 disables).
+# Invalidation only reaches other workers through a shared CACHES backend; with
+# the default local-memory cache they serve a changed profile for up to this long
+# (system check rfq.W001 warns about it outside DEBUG).
+RFQ_ACTOR_CACHE_TTL = int(os.environ.get('RFQ_ACTOR_CACHE_TTL', '30'))
+
+# Background exports (/api/export/jobs): worker threads per process, hours an
+# artifact stays downloadable, and inline mode (render during the POST).
+RFQ_EXPORT_JOB_WORKERS = int(os.environ.get('RFQ_EXPORT_JOB_WORKERS', '2'))
+RFQ_EXPORT_JOB_TTL_HOURS = int(os.environ.get('RFQ_EXPORT_JOB_TTL_HOURS', '24'))
+RFQ_EXPORT_JOBS_INLINE = os.environ.get('RFQ_EXPORT_JOBS_INLINE', '0') == '1'
+
+# Change events (/api/events/stream): stream length under ASGI / WSGI (clients
+# reconnect with Last-Event-ID), DB poll interval, how long rows are kept, and
+# how long readers wait at an id gap for an insert that has not committed yet.
+RFQ_EVENTS_STREAM_SECONDS = int(os.environ.get('RFQ_EVENTS_STREAM_SECONDS', '300'))
+RFQ_EVENTS_WSGI_STREAM_SECONDS = int(os.environ.get('RFQ_EVENTS_WSGI_STREAM_SECONDS', '25'))
+RFQ_EVENTS_POLL_SECONDS = float(os.environ.get('RFQ_EVENTS_POLL_SECONDS', '1'))
+RFQ_EVENTS_RETENTION_MINUTES = int(os.environ.get('RFQ_EVENTS_RETENTION_MINUTES', '60'))
+RFQ_EVENTS_SETTLE_SECONDS = float(os.environ.get('RFQ_EVENTS_SETTLE_SECONDS', '2'))
+
+# Chunked project sync (/api/projects/sync): max projects and bytes per chunk,
+# and minutes an unfinished session can be resumed.
+RFQ_SYNC_CHUNK_MAX_PROJECTS = int(os.environ.get('RFQ_SYNC_CHUNK_MAX_PROJECTS', '50'))
+RFQ_SYNC_CHUNK_MAX_BYTES = int(os.environ.get('RFQ_SYNC_CHUNK_MAX_BYTES', str(8 * 1024 * 1024)))
+RFQ_SYNC_SESSION_TTL_MINUTES = int(os.environ.get('RFQ_SYNC_SESSION_TTL_MINUTES', '60'))
+
+# Seconds a rendered supplier portal page stays cached. Entries are keyed by the
+# access's updated_at, so edits never serve a stale page; this only bounds memory.
+RFQ_PORTAL_CACHE_TTL = int(os.environ.get('RFQ_PORTAL_CACHE_TTL', '3600'))
+
+# Attachment / supplier file downloads: 'django' streams from the worker,
+# 'x-accel-redirect' (nginx, internal location at the prefix below mapped to
+# MEDIA_ROOT) or 'x-sendfile' (Apache/lighttpd) hand the transfer to the proxy.
+RFQ_FILE_DELIVERY = os.environ.get('RFQ_FILE_DELIVERY', 'django')
+RFQ_FILE_DELIVERY_ACCEL_PREFIX = os.environ.get('RFQ_FILE_DELIVERY_ACCEL_PREFIX', '/protected-media/')
+
+# Edit-lock leases: 'db' keeps them in the EditLock table (any number of
+# workers); 'memory' keeps them in the process and suits a single worker only.
+RFQ_LOCK_BACKEND = os.environ.get('RFQ_LOCK_BACKEND', 'db')
+
+# Audit log: entries are buffered per process and bulk-inserted every
+# RFQ_AUDIT_BATCH_SIZE entries or RFQ_AUDIT_FLUSH_SECONDS; RFQ_AUDIT_INLINE=1
+# (default with DJANGO_DEBUG) writes each one immediately. Excluded actions are
+# a comma list ('lock.*' matches a prefix); sample rates are 'action=0.1,...'.
+RFQ_AUDIT_INLINE = os.environ.get('RFQ_AUDIT_INLINE', '1' if DEBUG else '0') == '1'
+RFQ_AUDIT_BATCH_SIZE = int(os.environ.get('RFQ_AUDIT_BATCH_SIZE', '100'))
+RFQ_AUDIT_FLUSH_SECONDS = float(os.environ.get('RFQ_AUDIT_FLUSH_SECONDS', '2'))
+RFQ_AUDIT_EXCLUDE_ACTIONS = [a.strip() for a in os.environ.get('RFQ_AUDIT_EXCLUDE_ACTIONS', '').split(',') if a.strip()]
+RFQ_AUDIT_SAMPLE_RATES = {
+    k.strip(): float(v) for k, _, v in (p.partition('=') for p in os.environ.get('RFQ_AUDIT_SAMPLE_RATES', '').split(',')) if k.strip() and v.strip()
+}
+
+# Audit retention: entries older than this many days (per company override:
+# Company.audit_retention_days) are moved by `manage.py archive_audit_logs`
+# into gzipped NDJSON files of at most RFQ_AUDIT_ARCHIVE_ROWS_PER_FILE rows.
+RFQ_AUDIT_RETENTION_DAYS = int(os.environ.get('RFQ_AUDIT_RETENTION_DAYS', '365'))
+RFQ_AUDIT_ARCHIVE_ROWS_PER_FILE = int(os.environ.get('RFQ_AUDIT_ARCHIVE_ROWS_PER_FILE', '50000'))
+
 # --- Security hardening defaults ---
 SESSION_COOKIE_HTTPONLY = True
 CSRF_COOKIE_HTTPONLY = False